@@ -0,0 +1,74 @@
+import json
+import sys
+import tracemalloc
+
+from v2.nacos.naming.model.instance import Instance
+
+
+class DictInstance:
+    """与原先Instance相同的布局：属性保存在__dict__中，字符串和metadata不共享"""
+
+    def __init__(self, service_name=None, ip=None, port=None, cluster_name=None, weight=1.0, healthy=True, enable=True,
+                 ephemeral=True, metadata=None, instance_id=None):
+        self.instance_id = instance_id
+        self.ip = ip
+        self.port = port
+        self.weight = weight
+        self.healthy = healthy
+        self.enable = enable
+        self.ephemeral = ephemeral
+        self.cluster_name = cluster_name
+        self.service_name = service_name
+        self.metadata = metadata if metadata is not None else {}
+
+
+def build_payload(count):
+    hosts = []
+    for i in range(count):
+        ip = f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+        hosts.append({
+            "instanceId": f"{ip}#8080#DEFAULT#DEFAULT_GROUP@@gateway-backend",
+            "ip": ip,
+            "port": 8080,
+            "weight": 1.0,
+            "healthy": True,
+            "enabled": True,
+            "ephemeral": True,
+            "clusterName": "DEFAULT",
+            "serviceName": "DEFAULT_GROUP@@gateway-backend",
+            "metadata": {"version": "1.0.%d" % (i % 4), "zone": "zone-%d" % (i % 3)},
+        })
+    # 经过一次json编解码，与从服务端收到的数据一样每个字符串都是独立的对象
+    return json.dumps({"hosts": hosts})
+
+
+def measure(build, payload):
+    # 统计解析payload并构造实例后，丢弃原始数据时仍然保留的内存
+    tracemalloc.start()
+    hosts = json.loads(payload)["hosts"]
+    instances = [build(host) for host in hosts]
+    del hosts
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return retained / len(instances)
+
+
+def build_dict_instance(host):
+    return DictInstance(service_name=host["serviceName"], ip=host["ip"], port=host["port"],
+                        cluster_name=host["clusterName"], weight=host["weight"], healthy=host["healthy"],
+                        enable=host["enabled"], ephemeral=host["ephemeral"], metadata=host["metadata"],
+                        instance_id=host["instanceId"])
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    payload = build_payload(count)
+    dict_bytes = measure(build_dict_instance, payload)
+    slots_bytes = measure(Instance.from_server_dict, payload)
+    print(f"instances: {count}")
+    print(f"__dict__ instance: {dict_bytes:.1f} bytes/instance")
+    print(f"__slots__ instance: {slots_bytes:.1f} bytes/instance")
+
+
+if __name__ == "__main__":
+    main()
@@ -55,10 +55,40 @@ class ClientConfig:
         self.log_rotation_backup_count = 7 if log_rotation_backup_count is None else log_rotation_backup_count
         self.timeout_ms = 10 * 1000  # timeout for requesting Nacos server, default value is 10000ms
         self.heart_beat_interval = 5 * 1000  # the time interval for sending beat to server,default value is 5000ms
+        self.heart_beat_thread_num = 2  # the number of threads used to send beats
+        self.heart_beat_jitter_ratio = 0.1  # each beat is delayed by a random +/- ratio of the beat interval
+        self.heart_beat_max_backoff = 60  # the max delay in seconds between beats after consecutive failures
+        self.heart_beat_batch_enabled = False  # send beats due in the same window together, grouped by group name
+        self.heart_beat_batch_window = 0.2  # the window in seconds used to collect beats in batch mode
         self.kms_config = None
         self.tls_config = None
         self.not_load_cache_at_start = False
+        self.naming_load_cache_lazy = False  # only read the naming cache index at start, parse a service on first use
+        self.naming_cache_prewarm = False  # parse the rest of the lazily loaded naming cache in background
+        self.naming_push_coalesce_window = 0.1  # changes of a service within this seconds are notified together
+        self.naming_subscriber_queue_size = 64  # the max services with pending changes for each subscriber
+        self.naming_notify_thread_num = 2  # the number of threads used to run subscribe callbacks
+        self.config_listen_thread_num = 4  # the number of listen tasks that are sent to server concurrently
+        self.config_refresh_thread_num = 8  # the max concurrent queries for changed configs
+        self.config_batch_query_max_in_flight = 16  # the max in-flight ConfigQueryRequests of get_configs
+        self.config_read_cache_max_size = 1000  # the max number of cached configs that are not listened
+        self.config_read_cache_expire_time = 0  # seconds a config that is not listened is cached, 0 means disabled
+        self.config_failover_check_interval = 5  # the interval in seconds to check failover files in the cache dir
+        self.snapshot_store_enabled = False  # keep config and naming snapshots in a single log-structured file
         self.disable_use_snap_shot = disable_use_snap_shot
+        self.http_pool_max_size = 8  # the max idle keep-alive connections kept for each server
+        self.http_pool_idle_timeout = 30  # idle keep-alive connections will be closed after this seconds
+        self.http_max_concurrency_per_host = 32  # the max in-flight async http requests for each server
+        self.server_selector_strategy = "latency"  # how to choose a server: "latency" or "round_robin"
+        self.server_eject_base_time = 5  # seconds a failing server is ejected for, doubled on each ejection
+        self.server_eject_max_time = 300  # the max seconds a failing server is ejected for
+        self.grpc_max_in_flight_requests = 256  # the max in-flight requests multiplexed on one grpc connection
+        self.grpc_standby_enabled = False  # keep a warm connection to another server for fast failover
+        self.grpc_hedge_enabled = False  # resend read-only requests to a second server when the first one is slow
+        # the idempotent request types that can be hedged
+        self.grpc_hedge_request_types = ["ConfigQueryRequest", "ServiceQueryRequest", "ServiceListRequest"]
+        self.grpc_hedge_budget_ratio = 0.1  # the max ratio of hedged requests to all requests of the same type
+        self.grpc_hedge_quantile = 0.95  # a request is hedged after this latency quantile of its type
 
     def set_log_level(self, log_level):
         self.log_level = log_level
@@ -80,6 +110,26 @@ class ClientConfig:
         self.heart_beat_interval = heart_beat_interval
         return self
 
+    def set_heart_beat_thread_num(self, heart_beat_thread_num):
+        self.heart_beat_thread_num = heart_beat_thread_num
+        return self
+
+    def set_heart_beat_jitter_ratio(self, heart_beat_jitter_ratio):
+        self.heart_beat_jitter_ratio = heart_beat_jitter_ratio
+        return self
+
+    def set_heart_beat_max_backoff(self, heart_beat_max_backoff):
+        self.heart_beat_max_backoff = heart_beat_max_backoff
+        return self
+
+    def set_heart_beat_batch_enabled(self, heart_beat_batch_enabled):
+        self.heart_beat_batch_enabled = heart_beat_batch_enabled
+        return self
+
+    def set_heart_beat_batch_window(self, heart_beat_batch_window):
+        self.heart_beat_batch_window = heart_beat_batch_window
+        return self
+
     def set_tls_config(self, tls_config: TLSConfig):
         self.tls_config = tls_config
         return self
@@ -92,10 +142,106 @@ class ClientConfig:
         self.kms_version = kms_version
         return self
 
+    def set_config_listen_thread_num(self, config_listen_thread_num):
+        self.config_listen_thread_num = config_listen_thread_num
+        return self
+
+    def set_config_refresh_thread_num(self, config_refresh_thread_num):
+        self.config_refresh_thread_num = config_refresh_thread_num
+        return self
+
+    def set_config_batch_query_max_in_flight(self, config_batch_query_max_in_flight):
+        self.config_batch_query_max_in_flight = config_batch_query_max_in_flight
+        return self
+
+    def set_config_read_cache_max_size(self, config_read_cache_max_size):
+        self.config_read_cache_max_size = config_read_cache_max_size
+        return self
+
+    def set_config_read_cache_expire_time(self, config_read_cache_expire_time):
+        self.config_read_cache_expire_time = config_read_cache_expire_time
+        return self
+
+    def set_config_failover_check_interval(self, config_failover_check_interval):
+        self.config_failover_check_interval = config_failover_check_interval
+        return self
+
+    def set_snapshot_store_enabled(self, snapshot_store_enabled):
+        self.snapshot_store_enabled = snapshot_store_enabled
+        return self
+
     def set_not_load_cache_at_start(self, not_load_cache_at_start):
         self.not_load_cache_at_start = not_load_cache_at_start
         return self
 
+    def set_naming_load_cache_lazy(self, naming_load_cache_lazy):
+        self.naming_load_cache_lazy = naming_load_cache_lazy
+        return self
+
+    def set_naming_cache_prewarm(self, naming_cache_prewarm):
+        self.naming_cache_prewarm = naming_cache_prewarm
+        return self
+
+    def set_naming_push_coalesce_window(self, naming_push_coalesce_window):
+        self.naming_push_coalesce_window = naming_push_coalesce_window
+        return self
+
+    def set_naming_subscriber_queue_size(self, naming_subscriber_queue_size):
+        self.naming_subscriber_queue_size = naming_subscriber_queue_size
+        return self
+
+    def set_naming_notify_thread_num(self, naming_notify_thread_num):
+        self.naming_notify_thread_num = naming_notify_thread_num
+        return self
+
+    def set_http_pool_max_size(self, http_pool_max_size):
+        self.http_pool_max_size = http_pool_max_size
+        return self
+
+    def set_http_pool_idle_timeout(self, http_pool_idle_timeout):
+        self.http_pool_idle_timeout = http_pool_idle_timeout
+        return self
+
+    def set_http_max_concurrency_per_host(self, http_max_concurrency_per_host):
+        self.http_max_concurrency_per_host = http_max_concurrency_per_host
+        return self
+
+    def set_server_selector_strategy(self, server_selector_strategy):
+        self.server_selector_strategy = server_selector_strategy
+        return self
+
+    def set_server_eject_base_time(self, server_eject_base_time):
+        self.server_eject_base_time = server_eject_base_time
+        return self
+
+    def set_server_eject_max_time(self, server_eject_max_time):
+        self.server_eject_max_time = server_eject_max_time
+        return self
+
+    def set_grpc_max_in_flight_requests(self, grpc_max_in_flight_requests):
+        self.grpc_max_in_flight_requests = grpc_max_in_flight_requests
+        return self
+
+    def set_grpc_standby_enabled(self, grpc_standby_enabled):
+        self.grpc_standby_enabled = grpc_standby_enabled
+        return self
+
+    def set_grpc_hedge_enabled(self, grpc_hedge_enabled):
+        self.grpc_hedge_enabled = grpc_hedge_enabled
+        return self
+
+    def set_grpc_hedge_request_types(self, grpc_hedge_request_types):
+        self.grpc_hedge_request_types = grpc_hedge_request_types
+        return self
+
+    def set_grpc_hedge_budget_ratio(self, grpc_hedge_budget_ratio):
+        self.grpc_hedge_budget_ratio = grpc_hedge_budget_ratio
+        return self
+
+    def set_grpc_hedge_quantile(self, grpc_hedge_quantile):
+        self.grpc_hedge_quantile = grpc_hedge_quantile
+        return self
+
     def set_endpoint_context_path(self, endpoint_context_path):
         self.endpoint_context_path = endpoint_context_path
         return self
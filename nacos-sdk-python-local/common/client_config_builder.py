@@ -27,6 +27,26 @@ class ClientConfigBuilder:
         self._config.heart_beat_interval = heart_beat_interval
         return self
 
+    def heart_beat_thread_num(self, heart_beat_thread_num) -> "ClientConfigBuilder":
+        self._config.heart_beat_thread_num = heart_beat_thread_num
+        return self
+
+    def heart_beat_jitter_ratio(self, heart_beat_jitter_ratio) -> "ClientConfigBuilder":
+        self._config.heart_beat_jitter_ratio = heart_beat_jitter_ratio
+        return self
+
+    def heart_beat_max_backoff(self, heart_beat_max_backoff) -> "ClientConfigBuilder":
+        self._config.heart_beat_max_backoff = heart_beat_max_backoff
+        return self
+
+    def heart_beat_batch_enabled(self, heart_beat_batch_enabled: bool) -> "ClientConfigBuilder":
+        self._config.heart_beat_batch_enabled = heart_beat_batch_enabled
+        return self
+
+    def heart_beat_batch_window(self, heart_beat_batch_window) -> "ClientConfigBuilder":
+        self._config.heart_beat_batch_window = heart_beat_batch_window
+        return self
+
     def log_level(self, log_level) -> "ClientConfigBuilder":
         self._config.log_level = log_level
         return self
@@ -67,5 +87,101 @@ class ClientConfigBuilder:
         self._config.not_load_cache_at_start = not_load_cache_at_start
         return self
 
+    def naming_load_cache_lazy(self, naming_load_cache_lazy: bool) -> "ClientConfigBuilder":
+        self._config.naming_load_cache_lazy = naming_load_cache_lazy
+        return self
+
+    def naming_cache_prewarm(self, naming_cache_prewarm: bool) -> "ClientConfigBuilder":
+        self._config.naming_cache_prewarm = naming_cache_prewarm
+        return self
+
+    def naming_push_coalesce_window(self, naming_push_coalesce_window) -> "ClientConfigBuilder":
+        self._config.naming_push_coalesce_window = naming_push_coalesce_window
+        return self
+
+    def naming_subscriber_queue_size(self, naming_subscriber_queue_size: int) -> "ClientConfigBuilder":
+        self._config.naming_subscriber_queue_size = naming_subscriber_queue_size
+        return self
+
+    def naming_notify_thread_num(self, naming_notify_thread_num: int) -> "ClientConfigBuilder":
+        self._config.naming_notify_thread_num = naming_notify_thread_num
+        return self
+
+    def http_pool_max_size(self, http_pool_max_size: int) -> "ClientConfigBuilder":
+        self._config.http_pool_max_size = http_pool_max_size
+        return self
+
+    def http_pool_idle_timeout(self, http_pool_idle_timeout: int) -> "ClientConfigBuilder":
+        self._config.http_pool_idle_timeout = http_pool_idle_timeout
+        return self
+
+    def http_max_concurrency_per_host(self, http_max_concurrency_per_host: int) -> "ClientConfigBuilder":
+        self._config.http_max_concurrency_per_host = http_max_concurrency_per_host
+        return self
+
+    def config_listen_thread_num(self, config_listen_thread_num: int) -> "ClientConfigBuilder":
+        self._config.config_listen_thread_num = config_listen_thread_num
+        return self
+
+    def config_refresh_thread_num(self, config_refresh_thread_num: int) -> "ClientConfigBuilder":
+        self._config.config_refresh_thread_num = config_refresh_thread_num
+        return self
+
+    def config_batch_query_max_in_flight(self, config_batch_query_max_in_flight: int) -> "ClientConfigBuilder":
+        self._config.config_batch_query_max_in_flight = config_batch_query_max_in_flight
+        return self
+
+    def config_read_cache_max_size(self, config_read_cache_max_size: int) -> "ClientConfigBuilder":
+        self._config.config_read_cache_max_size = config_read_cache_max_size
+        return self
+
+    def config_read_cache_expire_time(self, config_read_cache_expire_time) -> "ClientConfigBuilder":
+        self._config.config_read_cache_expire_time = config_read_cache_expire_time
+        return self
+
+    def config_failover_check_interval(self, config_failover_check_interval) -> "ClientConfigBuilder":
+        self._config.config_failover_check_interval = config_failover_check_interval
+        return self
+
+    def snapshot_store_enabled(self, snapshot_store_enabled: bool) -> "ClientConfigBuilder":
+        self._config.snapshot_store_enabled = snapshot_store_enabled
+        return self
+
+    def server_selector_strategy(self, server_selector_strategy: str) -> "ClientConfigBuilder":
+        self._config.server_selector_strategy = server_selector_strategy
+        return self
+
+    def server_eject_base_time(self, server_eject_base_time) -> "ClientConfigBuilder":
+        self._config.server_eject_base_time = server_eject_base_time
+        return self
+
+    def server_eject_max_time(self, server_eject_max_time) -> "ClientConfigBuilder":
+        self._config.server_eject_max_time = server_eject_max_time
+        return self
+
+    def grpc_max_in_flight_requests(self, grpc_max_in_flight_requests: int) -> "ClientConfigBuilder":
+        self._config.grpc_max_in_flight_requests = grpc_max_in_flight_requests
+        return self
+
+    def grpc_standby_enabled(self, grpc_standby_enabled: bool) -> "ClientConfigBuilder":
+        self._config.grpc_standby_enabled = grpc_standby_enabled
+        return self
+
+    def grpc_hedge_enabled(self, grpc_hedge_enabled: bool) -> "ClientConfigBuilder":
+        self._config.grpc_hedge_enabled = grpc_hedge_enabled
+        return self
+
+    def grpc_hedge_request_types(self, grpc_hedge_request_types) -> "ClientConfigBuilder":
+        self._config.grpc_hedge_request_types = grpc_hedge_request_types
+        return self
+
+    def grpc_hedge_budget_ratio(self, grpc_hedge_budget_ratio) -> "ClientConfigBuilder":
+        self._config.grpc_hedge_budget_ratio = grpc_hedge_budget_ratio
+        return self
+
+    def grpc_hedge_quantile(self, grpc_hedge_quantile) -> "ClientConfigBuilder":
+        self._config.grpc_hedge_quantile = grpc_hedge_quantile
+        return self
+
     def build(self):
         return self._config
@@ -97,6 +97,9 @@ class Constants:
   # millisecond.
   CONFIG_RETRY_TIME = 2000
 
+  # second.
+  ALL_SYNC_INTERNAL = 5 * 60
+
   # Maximum number of retries.
   MAX_RETRY = 3
 
@@ -135,6 +138,12 @@ class Constants:
 
   NAMING_HTTP_HEADER_SPLITTER = "\\|"
 
+  CLIENT_BEAT_INTERVAL_FIELD = "clientBeatInterval"
+
+  LIGHT_BEAT_ENABLED = "lightBeatEnabled"
+
+  NAMING_RESOURCE_NOT_FOUND_CODE = 20404
+
   DEFAULT_CLUSTER_NAME = "DEFAULT"
 
   DEFAULT_HEART_BEAT_TIMEOUT = 15000
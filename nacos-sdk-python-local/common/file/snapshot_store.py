@@ -0,0 +1,261 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DATA_FILE_NAME = "snapshot.dat"
+
+INDEX_FILE_NAME = "snapshot.idx"
+
+# 数据文件头：魔数, 代数。每次压缩代数加一，索引记录其对应的代数，不一致的索引不使用
+FILE_HEADER = struct.Struct("<8sQ")
+
+FILE_MAGIC = b"NACOSSNP"
+
+# 记录头：crc32, key长度, value长度, 标记
+RECORD_HEADER = struct.Struct("<IIIB")
+
+FLAG_PUT = 0
+
+FLAG_DELETE = 1
+
+DEFAULT_COMPACT_MIN_SIZE = 4 * 1024 * 1024
+
+DEFAULT_COMPACT_GARBAGE_RATIO = 0.5
+
+
+class SnapshotStore:
+    """
+    单文件、追加写的快照存储，替代每个key一个文件的目录结构。
+    数据文件只追加记录，索引文件保存 key -> (value偏移, value长度) 以及索引覆盖到的数据文件长度；
+    启动时只读索引文件并回放其后追加的记录，value通过mmap按需读取。
+    失效的记录超过一定比例后重写数据文件（压缩），数据文件和索引都带有代数，压缩中途退出时旧索引会被忽略
+    """
+
+    def __init__(self, store_dir, logger=None, compact_min_size=DEFAULT_COMPACT_MIN_SIZE,
+                 compact_garbage_ratio=DEFAULT_COMPACT_GARBAGE_RATIO):
+        self.store_dir = store_dir
+        self.logger = logger or logging.getLogger(__name__)
+        self.compact_min_size = compact_min_size
+        self.compact_garbage_ratio = compact_garbage_ratio
+        self.data_file_path = os.path.join(store_dir, DATA_FILE_NAME)
+        self.index_file_path = os.path.join(store_dir, INDEX_FILE_NAME)
+        self.lock = threading.RLock()
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.generation = 0
+        self.data_size = 0
+        self.live_size = 0
+        self.data_file = None
+        self.mmap: Optional[mmap.mmap] = None
+        self.mmap_size = 0
+        self._open()
+
+    def _open(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.data_file = open(self.data_file_path, "a+b")
+        file_size = os.fstat(self.data_file.fileno()).st_size
+        file_size = self._read_file_header(file_size)
+        indexed_size = self._load_index(file_size)
+        self.data_size = self._replay(indexed_size, file_size)
+        if self.data_size < file_size:
+            # 末尾有写了一半的记录，截断
+            self.logger.warning(f"truncate torn records of {self.data_file_path} from {self.data_size} to {file_size}")
+            self.data_file.truncate(self.data_size)
+        self.live_size = sum(RECORD_HEADER.size + len(key.encode("utf-8")) + length
+                             for key, (_, length) in self.index.items())
+
+    def _read_file_header(self, file_size) -> int:
+        if file_size >= FILE_HEADER.size:
+            self.data_file.seek(0)
+            magic, generation = FILE_HEADER.unpack(self.data_file.read(FILE_HEADER.size))
+            if magic == FILE_MAGIC:
+                self.generation = generation
+                return file_size
+            self.logger.warning(f"unknown snapshot data file {self.data_file_path}, discard it")
+        # 新建的、无法识别的或者头部都没写完的数据文件，从第一代开始
+        self.data_file.truncate(0)
+        self.generation = 1
+        self.data_file.write(FILE_HEADER.pack(FILE_MAGIC, self.generation))
+        self.data_file.flush()
+        return FILE_HEADER.size
+
+    def _load_index(self, file_size) -> int:
+        try:
+            with open(self.index_file_path, "r", encoding="utf-8") as f:
+                index_data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (ValueError, OSError) as e:
+            self.logger.warning(f"read snapshot index {self.index_file_path} failed, rebuild from data file, err:{e}")
+            return 0
+        if index_data.get("generation") != self.generation:
+            # 压缩替换了数据文件但没来得及写索引，旧索引的偏移不再有效，整体回放
+            return 0
+        indexed_size = index_data.get("size", 0)
+        if indexed_size > file_size:
+            # 索引比数据文件新，说明数据文件被截断或损坏，整体回放
+            return 0
+        self.index = {key: (offset, length) for key, (offset, length) in index_data.get("entries", {}).items()}
+        return indexed_size
+
+    def _replay(self, start, file_size) -> int:
+        if start < FILE_HEADER.size:
+            self.index = {}
+            start = FILE_HEADER.size
+        if start >= file_size:
+            return start
+        self.data_file.seek(start)
+        data = self.data_file.read(file_size - start)
+        position = 0
+        while position + RECORD_HEADER.size <= len(data):
+            crc, key_len, value_len, flag = RECORD_HEADER.unpack_from(data, position)
+            body_start = position + RECORD_HEADER.size
+            body_end = body_start + key_len + value_len
+            if body_end > len(data) or zlib.crc32(data[body_start:body_end]) != crc:
+                break
+            key = data[body_start:body_start + key_len].decode("utf-8")
+            if flag == FLAG_DELETE:
+                self.index.pop(key, None)
+            else:
+                self.index[key] = (start + body_start + key_len, value_len)
+            position = body_end
+        return start + position
+
+    def _get_mmap(self) -> Optional[mmap.mmap]:
+        if self.mmap is None or self.mmap_size < self.data_size:
+            self.data_file.flush()
+            if self.mmap is not None:
+                self.mmap.close()
+            self.mmap = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mmap_size = len(self.mmap)
+        return self.mmap
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            location = self.index.get(key)
+            if location is None:
+                return None
+            offset, length = location
+            return self._get_mmap()[offset:offset + length]
+
+    def keys(self) -> List[str]:
+        with self.lock:
+            return list(self.index.keys())
+
+    def items(self) -> Iterator[Tuple[str, bytes]]:
+        for key in self.keys():
+            value = self.get(key)
+            if value is not None:
+                yield key, value
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def put(self, key: str, value):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self._append(key, value or b"", FLAG_PUT)
+
+    def delete(self, key: str):
+        with self.lock:
+            if key not in self.index:
+                return
+            self._append(key, b"", FLAG_DELETE)
+
+    def _append(self, key: str, value: bytes, flag):
+        key_bytes = key.encode("utf-8")
+        body = key_bytes + value
+        record = RECORD_HEADER.pack(zlib.crc32(body), len(key_bytes), len(value), flag) + body
+        with self.lock:
+            old = self.index.get(key)
+            if old is not None:
+                self.live_size -= RECORD_HEADER.size + len(key_bytes) + old[1]
+            self.data_file.write(record)
+            if flag == FLAG_DELETE:
+                self.index.pop(key, None)
+            else:
+                self.index[key] = (self.data_size + RECORD_HEADER.size + len(key_bytes), len(value))
+                self.live_size += len(record)
+            self.data_size += len(record)
+            self.maybe_compact()
+
+    def maybe_compact(self):
+        with self.lock:
+            garbage = self.data_size - FILE_HEADER.size - self.live_size
+            if self.data_size >= self.compact_min_size and garbage >= self.data_size * self.compact_garbage_ratio:
+                self.compact()
+
+    def compact(self):
+        """只保留每个key的最新记录重写数据文件，并写出完整的索引"""
+        with self.lock:
+            self.data_file.flush()
+            mm = self._get_mmap()
+            temp_path = self.data_file_path + ".compact"
+            new_index = {}
+            generation = self.generation + 1
+            size = FILE_HEADER.size
+            with open(temp_path, "wb") as f:
+                f.write(FILE_HEADER.pack(FILE_MAGIC, generation))
+                for key, (offset, length) in self.index.items():
+                    key_bytes = key.encode("utf-8")
+                    body = key_bytes + mm[offset:offset + length]
+                    f.write(RECORD_HEADER.pack(zlib.crc32(body), len(key_bytes), length, FLAG_PUT))
+                    f.write(body)
+                    new_index[key] = (size + RECORD_HEADER.size + len(key_bytes), length)
+                    size += RECORD_HEADER.size + len(body)
+                f.flush()
+                os.fsync(f.fileno())
+
+            if self.mmap is not None:
+                self.mmap.close()
+                self.mmap = None
+                self.mmap_size = 0
+            self.data_file.close()
+            os.replace(temp_path, self.data_file_path)
+            self.data_file = open(self.data_file_path, "a+b")
+            self.generation = generation
+            self.index = new_index
+            self.data_size = size
+            self.live_size = size - FILE_HEADER.size
+            self._write_index()
+
+    def _write_index(self):
+        temp_path = self.index_file_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"generation": self.generation, "size": self.data_size, "entries": self.index}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.index_file_path)
+
+    def flush(self):
+        """将已追加的记录交给操作系统，进程退出不会丢失，但不保证落盘"""
+        with self.lock:
+            if self.data_file is not None:
+                self.data_file.flush()
+
+    def sync(self):
+        """将已追加的记录和当前索引落盘"""
+        with self.lock:
+            if self.data_file is None:
+                return
+            self.data_file.flush()
+            os.fsync(self.data_file.fileno())
+            self._write_index()
+
+    def close(self):
+        with self.lock:
+            if self.data_file is None:
+                return
+            self.sync()
+            if self.mmap is not None:
+                self.mmap.close()
+                self.mmap = None
+            self.data_file.close()
+            self.data_file = None
@@ -0,0 +1,83 @@
+import os
+import shutil
+
+from v2.nacos.common.file.snapshot_store import INDEX_FILE_NAME, SnapshotStore
+
+
+def test_put_get_delete_survive_reopen(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.put("a", "1")
+    store.put("b", b"2")
+    store.put("a", "3")
+    store.delete("b")
+    store.close()
+
+    store = SnapshotStore(str(tmp_path))
+    try:
+        assert store.get("a") == b"3"
+        assert store.get("b") is None
+        assert store.keys() == ["a"]
+    finally:
+        store.close()
+
+
+def test_records_appended_after_index_are_replayed(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.put("a", "1")
+    store.sync()
+    store.put("b", "2")
+    # 不调用close，模拟进程退出时索引只覆盖到a
+    store.data_file.flush()
+
+    reopened = SnapshotStore(str(tmp_path))
+    try:
+        assert reopened.get("a") == b"1"
+        assert reopened.get("b") == b"2"
+    finally:
+        reopened.close()
+        store.close()
+
+
+def test_compact_keeps_latest_values(tmp_path):
+    store = SnapshotStore(str(tmp_path), compact_min_size=0, compact_garbage_ratio=0.5)
+    for i in range(20):
+        store.put("key", f"value-{i}")
+    store.put("other", "x")
+    assert store.generation > 1
+    assert store.get("key") == b"value-19"
+    store.close()
+
+    store = SnapshotStore(str(tmp_path))
+    try:
+        assert store.get("key") == b"value-19"
+        assert store.get("other") == b"x"
+    finally:
+        store.close()
+
+
+def test_stale_index_from_interrupted_compact_is_ignored(tmp_path):
+    store_dir = str(tmp_path)
+    index_path = os.path.join(store_dir, INDEX_FILE_NAME)
+    store = SnapshotStore(store_dir)
+    store.put("a", "old-a")
+    store.put("padding", "p" * 64)
+    store.put("a", "new-a")
+    store.put("b", "b")
+    store.sync()
+    shutil.copy(index_path, index_path + ".bak")
+
+    store.compact()
+    # 压缩后的文件不比旧索引覆盖的长度短，仅凭长度无法发现旧索引已失效
+    store.put("c", "c" * 128)
+    store.data_file.flush()
+    # 模拟数据文件已被替换、新索引还没写出时进程退出
+    os.replace(index_path + ".bak", index_path)
+
+    reopened = SnapshotStore(store_dir)
+    try:
+        assert reopened.get("a") == b"new-a"
+        assert reopened.get("padding") == b"p" * 64
+        assert reopened.get("b") == b"b"
+        assert reopened.get("c") == b"c" * 128
+    finally:
+        reopened.close()
@@ -0,0 +1,203 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict
+
+DEFAULT_BATCH_SIZE = 128
+
+DEFAULT_FLUSH_INTERVAL = 0.5  # second
+
+DEFAULT_STORE_SYNC_INTERVAL = 30  # second
+
+
+class SnapshotWriter:
+    """
+    后台单线程写快照文件，调用方只需将内容放入队列，不会在请求路径上等待磁盘IO。
+    同一文件在写入前的多次更新只保留最后一次；每个文件先写临时文件，
+    一批临时文件统一fsync后再rename覆盖目标文件，进程崩溃时不会留下写了一半的快照。
+    写入SnapshotStore的记录同样在写线程中追加，store每隔store_sync_interval才fsync并写出索引
+    """
+
+    def __init__(self, logger=None, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 store_sync_interval=DEFAULT_STORE_SYNC_INTERVAL):
+        self.logger = logger or logging.getLogger(__name__)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.store_sync_interval = store_sync_interval
+        # 文件路径或(store, key) -> 内容，None表示删除
+        self.pending: Dict[object, object] = {}
+        # 有未同步记录的store -> 第一条未同步记录写入的时间，只在写线程中访问
+        self.dirty_stores: Dict[object, float] = {}
+        self.condition = threading.Condition()
+        self.writing = False
+        self.closed = False
+        self.writer_thread = None
+
+    def start(self):
+        with self.condition:
+            if self.writer_thread is not None:
+                return
+            self.writer_thread = threading.Thread(target=self._run, name="nacos-snapshot-writer", daemon=True)
+            self.writer_thread.start()
+
+    def write(self, file_path: str, content):
+        """content可以是str、bytes，或者返回二者之一的函数；函数在写线程中执行，合并掉的写入不会被执行"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._enqueue(file_path, content if callable(content) else content or b"")
+
+    def delete(self, file_path: str):
+        self._enqueue(file_path, None)
+
+    def put_to_store(self, store, key: str, content):
+        """在写线程中把content追加到store，content的类型与write相同"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._enqueue((store, key), content if callable(content) else content or b"")
+
+    def delete_from_store(self, store, key: str):
+        self._enqueue((store, key), None)
+
+    def _enqueue(self, file_path, content):
+        self.start()
+        with self.condition:
+            if self.closed:
+                self.logger.warning(f"snapshot writer is closed, drop snapshot of {file_path}")
+                return
+            self.pending[file_path] = content
+            if len(self.pending) >= self.batch_size:
+                self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                # 攒一个间隔内的写入，期间同一文件的多次更新被合并
+                if len(self.pending) < self.batch_size and not self.closed:
+                    self.condition.wait(self.flush_interval)
+                if not self.pending and not self.dirty_stores:
+                    if self.closed:
+                        return
+                    continue
+                batch = self.pending
+                self.pending = {}
+                self.writing = True
+            try:
+                if batch:
+                    self._write_batch(batch)
+                self._sync_stores(self.closed)
+            except Exception as e:
+                self.logger.error(f"write snapshot batch failed, err:{e}")
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+
+    def _write_batch(self, batch: Dict[object, object]):
+        temp_files = []
+        for file_path, content in batch.items():
+            if isinstance(file_path, tuple):
+                self._write_to_store(file_path[0], file_path[1], content)
+                continue
+            if content is None:
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.logger.error(f"delete snapshot {file_path} failed, err:{e}")
+                continue
+            if callable(content):
+                try:
+                    content = content()
+                except Exception as e:
+                    self.logger.error(f"build snapshot of {file_path} failed, err:{e}")
+                    continue
+                if isinstance(content, str):
+                    content = content.encode("utf-8")
+                content = content or b""
+            temp_path = f"{file_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            except OSError as e:
+                self.logger.error(f"create snapshot {temp_path} failed, err:{e}")
+                continue
+            try:
+                os.write(fd, content)
+            except OSError as e:
+                os.close(fd)
+                self.logger.error(f"write snapshot {temp_path} failed, err:{e}")
+                continue
+            temp_files.append((fd, temp_path, file_path))
+
+        # 整批写完后再统一fsync和rename
+        dirs = set()
+        for fd, temp_path, file_path in temp_files:
+            try:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                os.replace(temp_path, file_path)
+                dirs.add(os.path.dirname(file_path))
+            except OSError as e:
+                self.logger.error(f"commit snapshot {file_path} failed, err:{e}")
+        for dir_path in dirs:
+            self._fsync_dir(dir_path)
+
+    def _write_to_store(self, store, key, content):
+        try:
+            if content is None:
+                store.delete(key)
+            else:
+                store.put(key, content() if callable(content) else content)
+        except Exception as e:
+            self.logger.error(f"write snapshot {key} to {store.store_dir} failed, err:{e}")
+            return
+        if store not in self.dirty_stores:
+            self.dirty_stores[store] = time.monotonic()
+        store.flush()
+
+    def _sync_stores(self, force=False):
+        now = time.monotonic()
+        for store, since in list(self.dirty_stores.items()):
+            if not force and now - since < self.store_sync_interval:
+                continue
+            del self.dirty_stores[store]
+            try:
+                store.sync()
+            except Exception as e:
+                self.logger.error(f"sync snapshot store {store.store_dir} failed, err:{e}")
+
+    @staticmethod
+    def _fsync_dir(dir_path):
+        # 确保rename本身落盘，Windows不支持打开目录
+        if os.name == "nt":
+            return
+        try:
+            fd = os.open(dir_path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def flush(self, timeout=None) -> bool:
+        """等待已放入队列的快照全部写入磁盘"""
+        with self.condition:
+            if self.writer_thread is None:
+                return True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+
+    def shutdown(self, timeout=None):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.flush(timeout)
+        if self.writer_thread is not None:
+            self.writer_thread.join(timeout)
@@ -0,0 +1,53 @@
+import json
+import os
+
+from v2.nacos.common.file.snapshot_store import INDEX_FILE_NAME, SnapshotStore
+from v2.nacos.common.file.snapshot_writer import SnapshotWriter
+
+
+def test_write_and_delete_files(tmp_path):
+    writer = SnapshotWriter(flush_interval=0.01)
+    path = os.path.join(str(tmp_path), "sub", "snapshot")
+    writer.write(path, "v1")
+    writer.write(path, lambda: "v2")
+    assert writer.flush(5)
+    with open(path, "rb") as f:
+        assert f.read() == b"v2"
+
+    writer.delete(path)
+    writer.shutdown(5)
+    assert not os.path.exists(path)
+
+
+def test_store_writes_go_through_writer_thread(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    writer = SnapshotWriter(flush_interval=0.01, store_sync_interval=3600)
+    writer.put_to_store(store, "a", "1")
+    writer.put_to_store(store, "b", lambda: "2")
+    writer.delete_from_store(store, "b")
+    assert writer.flush(5)
+
+    assert store.get("a") == b"1"
+    assert store.get("b") is None
+    # 还没到同步间隔，索引未写出
+    assert not os.path.exists(os.path.join(str(tmp_path), INDEX_FILE_NAME))
+
+    writer.shutdown(5)
+    with open(os.path.join(str(tmp_path), INDEX_FILE_NAME), encoding="utf-8") as f:
+        assert "a" in json.load(f)["entries"]
+    store.close()
+
+
+def test_store_index_is_synced_periodically(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    writer = SnapshotWriter(flush_interval=0.01, store_sync_interval=0)
+    try:
+        writer.put_to_store(store, "a", "1")
+        assert writer.flush(5)
+        writer.put_to_store(store, "b", "2")
+        assert writer.flush(5)
+        with open(os.path.join(str(tmp_path), INDEX_FILE_NAME), encoding="utf-8") as f:
+            assert set(json.load(f)["entries"]) == {"a", "b"}
+    finally:
+        writer.shutdown(5)
+        store.close()
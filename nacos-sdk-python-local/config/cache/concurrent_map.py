@@ -1,58 +1,93 @@
 import threading
 import json
-import fnvhash
 
 SHARD_COUNT = 32
 
 
 class Shard:
+    """写时复制的分片：写操作在锁内复制并替换整个dict，读操作直接读取当前dict引用，无需加锁"""
+
     def __init__(self):
         self._items = {}
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()
 
-    def set(self, key, value):
+    def set(self, key, value) -> int:
         with self._lock:
-            self._items[key] = value
+            items = dict(self._items)
+            added = 0 if key in items else 1
+            items[key] = value
+            self._items = items
+            return added
 
     def get(self, key):
-        with self._lock:
-            return self._items.get(key)
+        return self._items.get(key)
 
-    def delete(self, key):
+    def has(self, key):
+        return key in self._items
+
+    def delete(self, key) -> int:
         with self._lock:
-            if key in self._items:
-                del self._items[key]
+            if key not in self._items:
+                return 0
+            items = dict(self._items)
+            del items[key]
+            self._items = items
+            return 1
+
+    def snapshot(self) -> dict:
+        # 当前dict发布后不会再被修改，直接作为一致性快照返回
+        return self._items
 
     def __iter__(self):
-        with self._lock:
-            return ((key, self._items[key]) for key in self._items)
+        return iter(self._items.items())
 
 
 class ConcurrentMap:
-    def __init__(self):
-        self._shards = [Shard() for _ in range(SHARD_COUNT)]
+    def __init__(self, shard_count=SHARD_COUNT):
+        self._shard_count = shard_count
+        self._shards = [Shard() for _ in range(shard_count)]
+        self._size = 0
+        self._size_lock = threading.Lock()
 
-    def _get_shard(self, key):
-        # Use FNV-1a hash to determine the shard
-        shard_index = fnvhash.fnv1a_32(key.encode('utf-8')) % SHARD_COUNT
-        return self._shards[shard_index]
+    def _get_shard(self, key) -> Shard:
+        return self._shards[hash(key) % self._shard_count]
+
+    def _add_size(self, delta):
+        if delta:
+            with self._size_lock:
+                self._size += delta
 
     def set(self, key, value):
         shard = self._get_shard(key)
-        shard.set(key, value)
+        self._add_size(shard.set(key, value))
 
     def get(self, key):
-        shard = self._get_shard(key)
-        return shard.get(key)
+        return self._get_shard(key).get(key)
 
     def delete(self, key):
         shard = self._get_shard(key)
-        shard.delete(key)
+        self._add_size(-shard.delete(key))
 
     def __iter__(self):
         for shard in self._shards:
             for key, value in shard:
-                yield (key, value)
+                yield key, value
+
+    def __contains__(self, key):
+        return self.has(key)
+
+    def __getitem__(self, key):
+        items = self._get_shard(key).snapshot()
+        return items[key]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        self.delete(key)
+
+    def __len__(self):
+        return self._size
 
     def items(self):
         return list(self)
@@ -64,24 +99,21 @@ class ConcurrentMap:
         return [value for _, value in self]
 
     def count(self):
-        count = 0
-        for shard in self._shards:
-            with shard._lock:
-                count += len(shard._items)
-        return count
+        return self._size
 
     def has(self, key):
-        shard = self._get_shard(key)
-        with shard._lock:
-            return key in shard._items
+        return self._get_shard(key).has(key)
 
     def set_if_absent(self, key, value):
         shard = self._get_shard(key)
         with shard._lock:
-            if key not in shard._items:
-                shard._items[key] = value
-            return True
-        return False
+            if key in shard._items:
+                return False
+            items = dict(shard._items)
+            items[key] = value
+            shard._items = items
+        self._add_size(1)
+        return True
 
     def upsert(self, key, value, func):
         shard = self._get_shard(key)
@@ -89,37 +121,53 @@ class ConcurrentMap:
             exist = key in shard._items
             current_value = shard._items.get(key)
             new_value = func(exist, current_value, value)
-            shard._items[key] = new_value
-            return new_value
+            items = dict(shard._items)
+            items[key] = new_value
+            shard._items = items
+        if not exist:
+            self._add_size(1)
+        return new_value
 
     def mset(self, data):
+        grouped = {}
         for key, value in data.items():
-            self.set(key, value)
+            grouped.setdefault(self._get_shard(key), {})[key] = value
+        # 每个分片只复制一次
+        for shard, shard_data in grouped.items():
+            with shard._lock:
+                items = dict(shard._items)
+                added = sum(1 for key in shard_data if key not in items)
+                items.update(shard_data)
+                shard._items = items
+            self._add_size(added)
 
     def pop(self, key):
         shard = self._get_shard(key)
         with shard._lock:
-            if key in shard._items:
-                value = shard._items.pop(key)
-                return value
-            return None
+            if key not in shard._items:
+                return None
+            items = dict(shard._items)
+            value = items.pop(key)
+            shard._items = items
+        self._add_size(-1)
+        return value
 
     def is_empty(self):
         return self.count() == 0
 
     def iter_buffered(self):
-        # This method would need to be implemented to provide an efficient buffered iterator.
-        pass
+        # 先取得所有分片的快照，再逐个遍历，每个分片内的数据都是一致的
+        snapshots = [shard.snapshot() for shard in self._shards]
+        for items in snapshots:
+            for key, value in items.items():
+                yield key, value
 
     def iter_cb(self, func):
-        for key, value in self:
+        for key, value in self.iter_buffered():
             func(key, value)
 
     def marshal_json(self):
         tmp = {}
-        for key, value in self:
+        for key, value in self.iter_buffered():
             tmp[key] = value
         return json.dumps(tmp).encode('utf-8')
-
-
-
@@ -0,0 +1,63 @@
+import json
+import threading
+
+from v2.nacos.config.cache.concurrent_map import ConcurrentMap
+
+
+def test_basic_operations_track_size():
+    m = ConcurrentMap(shard_count=4)
+    m.set("a", 1)
+    m["b"] = 2
+    m.set("a", 3)
+    assert len(m) == 2
+    assert m.get("a") == 3
+    assert m["b"] == 2
+    assert "a" in m
+
+    assert m.pop("a") == 3
+    assert m.pop("a") is None
+    del m["b"]
+    m.delete("missing")
+    assert m.is_empty()
+
+
+def test_set_if_absent_upsert_and_mset():
+    m = ConcurrentMap(shard_count=4)
+    assert m.set_if_absent("a", 1)
+    assert not m.set_if_absent("a", 2)
+    assert m.upsert("a", 10, lambda exist, current, value: current + value if exist else value) == 11
+    assert m.upsert("b", 5, lambda exist, current, value: current + value if exist else value) == 5
+    m.mset({"b": 6, "c": 7, "d": 8})
+    assert m.count() == 4
+    assert dict(m.items()) == {"a": 11, "b": 6, "c": 7, "d": 8}
+    assert json.loads(m.marshal_json()) == {"a": 11, "b": 6, "c": 7, "d": 8}
+
+
+def test_iteration_is_not_affected_by_concurrent_writes():
+    m = ConcurrentMap(shard_count=1)
+    m.mset({i: i for i in range(100)})
+    seen = []
+    for key, value in m.iter_buffered():
+        # 遍历的是快照，写入不会影响本次遍历
+        m.set(key + 1000, value)
+        seen.append(key)
+    assert sorted(seen) == list(range(100))
+    assert m.count() == 200
+
+
+def test_concurrent_writers_keep_size_consistent():
+    m = ConcurrentMap(shard_count=8)
+
+    def write(start):
+        for i in range(start, start + 500):
+            m.set(i, i)
+            m.set_if_absent(i, -1)
+
+    threads = [threading.Thread(target=write, args=(i * 250,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 各线程写入的区间有重叠，总共覆盖0~1249
+    assert m.count() == 1250
+    assert len(m.keys()) == 1250
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAX_SIZE = 1000
+
+DEFAULT_EXPIRE_TIME = 0  # second
+
+
+class ConfigReadCache:
+    """
+    get_config的进程内读缓存：
+    被监听的配置由监听循环保证md5是最新的，过滤后的结果按md5记忆，md5变化即失效；
+    未被监听的配置按过期时间判断新鲜度，超过容量时按LRU淘汰，expire_time为0时不缓存
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, expire_time=DEFAULT_EXPIRE_TIME):
+        self.max_size = max_size
+        self.expire_time = expire_time
+        self.lock = threading.Lock()
+        self.listened: Dict[str, Tuple[str, str]] = {}
+        self.unlistened: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get_listened(self, cache_key: str, md5_str: str) -> Optional[str]:
+        entry = self.listened.get(cache_key)
+        if entry is None or entry[0] != md5_str:
+            return None
+        return entry[1]
+
+    def put_listened(self, cache_key: str, md5_str: str, content: str):
+        self.listened[cache_key] = (md5_str, content)
+
+    def get(self, cache_key: str) -> Optional[str]:
+        if self.expire_time <= 0:
+            return None
+        with self.lock:
+            entry = self.unlistened.get(cache_key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.expire_time:
+                del self.unlistened[cache_key]
+                return None
+            self.unlistened.move_to_end(cache_key)
+            return entry[1]
+
+    def put(self, cache_key: str, content: str):
+        if self.expire_time <= 0 or self.max_size <= 0:
+            return
+        with self.lock:
+            self.unlistened[cache_key] = (time.monotonic(), content)
+            self.unlistened.move_to_end(cache_key)
+            while len(self.unlistened) > self.max_size:
+                self.unlistened.popitem(last=False)
+
+    def invalidate(self, cache_key: str):
+        self.listened.pop(cache_key, None)
+        with self.lock:
+            self.unlistened.pop(cache_key, None)
+
+    def clear(self):
+        self.listened.clear()
+        with self.lock:
+            self.unlistened.clear()
@@ -0,0 +1,49 @@
+import time
+
+from v2.nacos.config.cache.config_read_cache import ConfigReadCache
+
+
+def test_listened_entry_is_keyed_by_md5():
+    cache = ConfigReadCache()
+    cache.put_listened("key", "md5-1", "content-1")
+    assert cache.get_listened("key", "md5-1") == "content-1"
+    # md5变化说明配置已更新，旧内容失效
+    assert cache.get_listened("key", "md5-2") is None
+
+
+def test_unlistened_entry_expires():
+    cache = ConfigReadCache(expire_time=0.05)
+    cache.put("key", "content")
+    assert cache.get("key") == "content"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_unlistened_entries_are_evicted_lru():
+    cache = ConfigReadCache(max_size=2, expire_time=60)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_zero_expire_time_disables_unlistened_cache():
+    cache = ConfigReadCache(expire_time=0)
+    cache.put("key", "content")
+    assert cache.get("key") is None
+
+
+def test_invalidate_and_clear():
+    cache = ConfigReadCache(expire_time=60)
+    cache.put("a", "1")
+    cache.put_listened("a", "md5", "1")
+    cache.put("b", "2")
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get_listened("a", "md5") is None
+    assert cache.get("b") == "2"
+    cache.clear()
+    assert cache.get("b") is None
@@ -1,6 +1,34 @@
 from cache_const import *
 import os
 from ...common.file import file
+from ...common.file.snapshot_writer import SnapshotWriter
+from ...common.file.snapshot_store import SnapshotStore
+
+# 所有配置快照共用一个后台写线程
+snapshot_writer = SnapshotWriter()
+
+# 启用单文件快照存储的缓存目录，未启用的目录仍然每个key一个文件
+snapshot_stores = {}
+
+
+def open_snapshot_store(cache_dir, logger):
+    store = snapshot_stores.get(cache_dir)
+    if store is None:
+        store = SnapshotStore(cache_dir, logger)
+        snapshot_stores[cache_dir] = store
+    return store
+
+
+def close_snapshot_store(cache_dir):
+    store = snapshot_stores.pop(cache_dir, None)
+    if store is not None:
+        # 先等写线程把队列中的记录追加到store
+        snapshot_writer.flush()
+        store.close()
+
+
+def get_encrypted_data_key_store_key(cache_key):
+    return ENCRYPTED_DATA_KEY_FILE_NAME + "/" + cache_key
 
 
 def get_failover(key, dir, logger):
@@ -33,16 +61,52 @@ def get_fail_over_config(file_path, file_type, logger):
 
 
 def get_failover_encrypted_data_key(cache_key, config_cache_dir, logger):
-    file_path = get_config_fail_over_content_file_name(cache_key, dir)
+    file_path = get_config_fail_over_content_file_name(cache_key, config_cache_dir)
     return get_fail_over_config(file_path, ConfigCachedFileType.CONFIG_ENCRYPTED_DATA_KEY, logger)
 
 
-def write_config_to_file(file_path, file_name, file_type, logger):
-    pass
+def get_encrypted_data_key_file_name(cache_key, cache_dir):
+    return os.path.join(cache_dir, ENCRYPTED_DATA_KEY_FILE_NAME, cache_key)
+
 
+def write_config_to_file(cache_key, cache_dir, content, logger):
+    # 只放入后台写线程的队列，请求路径上不做磁盘IO
+    store = snapshot_stores.get(cache_dir)
+    if store is not None:
+        snapshot_writer.put_to_store(store, cache_key, content)
+        return
+    snapshot_writer.write(get_file_name(cache_key, cache_dir), content)
 
-def write_encrypted_data_key_to_file(file_path, file_name, file_type, logger):
-    pass
+
+def write_encrypted_data_key_to_file(cache_key, cache_dir, encrypted_data_key, logger):
+    store = snapshot_stores.get(cache_dir)
+    if store is not None:
+        if encrypted_data_key:
+            snapshot_writer.put_to_store(store, get_encrypted_data_key_store_key(cache_key), encrypted_data_key)
+        else:
+            snapshot_writer.delete_from_store(store, get_encrypted_data_key_store_key(cache_key))
+        return
+    file_name = get_encrypted_data_key_file_name(cache_key, cache_dir)
+    if encrypted_data_key:
+        snapshot_writer.write(file_name, encrypted_data_key)
+    else:
+        snapshot_writer.delete(file_name)
+
+
+def write_config_snapshot(cache_key, cache_dir, content, encrypted_data_key, logger):
+    write_config_to_file(cache_key, cache_dir, content, logger)
+    write_encrypted_data_key_to_file(cache_key, cache_dir, encrypted_data_key, logger)
+
+
+def write_configs_to_file(entries, cache_dir, logger):
+    """批量写入配置快照，entries 为 (cache_key, content, encrypted_data_key) 列表"""
+    for cache_key, content, encrypted_data_key in entries:
+        write_config_snapshot(cache_key, cache_dir, content, encrypted_data_key, logger)
+
+
+def flush_snapshots(timeout=None):
+    """等待队列中的快照全部落盘"""
+    return snapshot_writer.flush(timeout)
 
 
 def _read_config_from_file(file_name, file_type):
@@ -60,12 +124,26 @@ def _read_config_from_file(file_name, file_type):
 
 
 def read_config_from_file(cache_key, cache_dir):
+    store = snapshot_stores.get(cache_dir)
+    if store is not None:
+        content = store.get(cache_key)
+        if content is None:
+            return "", f"read cache {ConfigCachedFileType.CONFIG_CONTENT} failed. cause key doesn't exist in snapshot store, key: {cache_key}."
+        return content.decode("utf-8"), None
     file_name = get_file_name(cache_key, cache_dir)
     return _read_config_from_file(file_name, ConfigCachedFileType.CONFIG_CONTENT)
 
 
 def read_encrypted_data_key_from_file(cache_key, cache_dir):
-    pass
+    store = snapshot_stores.get(cache_dir)
+    if store is not None:
+        content = store.get(get_encrypted_data_key_store_key(cache_key))
+        return content.decode("utf-8") if content is not None else ""
+    file_name = get_encrypted_data_key_file_name(cache_key, cache_dir)
+    if not os.path.isfile(file_name):
+        return ""
+    content, _ = _read_config_from_file(file_name, ConfigCachedFileType.CONFIG_ENCRYPTED_DATA_KEY)
+    return content
 
 
 
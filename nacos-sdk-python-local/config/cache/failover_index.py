@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from typing import Set
+
+from .cache_const import FAILOVER_FILE_SUFFIX
+
+DEFAULT_CHECK_INTERVAL = 5  # second
+
+
+class FailoverIndex:
+    """
+    记录缓存目录下存在failover文件的配置，读配置时只需查询内存中的集合。
+    启动时扫描一次目录，之后由后台线程定期检查目录的mtime，目录中有文件新增或删除时才重新扫描。
+    failover文件内容的修改不会改变目录mtime，但命中时总是重新读取文件内容，因此不需要跟踪
+    """
+
+    def __init__(self, cache_dir, logger, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self.check_interval = check_interval
+        self.failover_keys: Set[str] = set()
+        self.dir_mtime = None
+        self.hit_count = 0
+        self.hit_count_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.check_thread = None
+
+    def start(self):
+        self._check()
+        if self.check_thread is None:
+            self.check_thread = threading.Thread(target=self._run, name="nacos-failover-index", daemon=True)
+            self.check_thread.start()
+
+    def _run(self):
+        while not self.stop_event.wait(self.check_interval):
+            try:
+                self._check()
+            except Exception as e:
+                self.logger.warning(f"check failover files in {self.cache_dir} failed, err:{e}")
+
+    def _check(self):
+        try:
+            dir_mtime = os.stat(self.cache_dir).st_mtime_ns
+        except FileNotFoundError:
+            self.dir_mtime = None
+            self.failover_keys = set()
+            return
+        if dir_mtime == self.dir_mtime:
+            return
+
+        failover_keys = set()
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(FAILOVER_FILE_SUFFIX) and entry.is_file():
+                    failover_keys.add(entry.name[:-len(FAILOVER_FILE_SUFFIX)])
+        if failover_keys != self.failover_keys:
+            self.logger.info(f"failover configs in {self.cache_dir} changed, keys:{sorted(failover_keys)}")
+        # 整体替换集合，读方无需加锁
+        self.failover_keys = failover_keys
+        # mtime精度有限，目录刚被修改时同一时间戳内可能还有文件变化，下次仍需重新扫描
+        self.dir_mtime = dir_mtime if time.time() - dir_mtime / 1e9 > 2 else None
+
+    def has_failover(self, cache_key: str) -> bool:
+        return cache_key in self.failover_keys
+
+    def record_hit(self):
+        with self.hit_count_lock:
+            self.hit_count += 1
+
+    def get_hit_count(self) -> int:
+        return self.hit_count
+
+    def stop(self):
+        self.stop_event.set()
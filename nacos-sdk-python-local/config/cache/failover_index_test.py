@@ -0,0 +1,72 @@
+import logging
+import os
+
+from v2.nacos.config.cache.cache_const import FAILOVER_FILE_SUFFIX
+from v2.nacos.config.cache.failover_index import FailoverIndex
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _touch(path):
+    with open(path, "w") as f:
+        f.write("content")
+
+
+def test_missing_cache_dir_has_no_failover(tmp_path):
+    index = FailoverIndex(os.path.join(str(tmp_path), "missing"), LOGGER)
+    index._check()
+    assert not index.has_failover("key")
+
+
+def test_scan_finds_failover_files_only(tmp_path):
+    _touch(os.path.join(str(tmp_path), "a" + FAILOVER_FILE_SUFFIX))
+    _touch(os.path.join(str(tmp_path), "b"))
+    os.mkdir(os.path.join(str(tmp_path), "c" + FAILOVER_FILE_SUFFIX))
+    index = FailoverIndex(str(tmp_path), LOGGER)
+    index._check()
+    assert index.failover_keys == {"a"}
+
+
+def test_rescan_picks_up_added_and_removed_files(tmp_path):
+    index = FailoverIndex(str(tmp_path), LOGGER)
+    index._check()
+    assert not index.has_failover("a")
+
+    failover_file = os.path.join(str(tmp_path), "a" + FAILOVER_FILE_SUFFIX)
+    _touch(failover_file)
+    index._check()
+    assert index.has_failover("a")
+
+    os.remove(failover_file)
+    index._check()
+    assert not index.has_failover("a")
+
+
+def test_unchanged_old_dir_is_not_rescanned(tmp_path):
+    _touch(os.path.join(str(tmp_path), "a" + FAILOVER_FILE_SUFFIX))
+    # 目录mtime足够旧时才会记住，之后mtime不变就不再扫描
+    os.utime(str(tmp_path), (1, 1))
+    index = FailoverIndex(str(tmp_path), LOGGER)
+    index._check()
+    assert index.dir_mtime is not None
+    index.failover_keys = set()
+    index._check()
+    assert index.failover_keys == set()
+
+
+def test_start_indexes_existing_failover_files(tmp_path):
+    _touch(os.path.join(str(tmp_path), "a" + FAILOVER_FILE_SUFFIX))
+    index = FailoverIndex(str(tmp_path), LOGGER, check_interval=3600)
+    index.start()
+    try:
+        assert index.has_failover("a")
+        assert not index.has_failover("b")
+    finally:
+        index.stop()
+
+
+def test_hit_count():
+    index = FailoverIndex("unused", LOGGER)
+    index.record_hit()
+    index.record_hit()
+    assert index.get_hit_count() == 2
@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, List
+
+
+class ListenTaskIndex:
+    """维护每个task id下的监听配置以及其中尚未与服务端同步的配置，使每轮监听只处理有变化的部分"""
+
+    def __init__(self, per_task_size: int):
+        self.per_task_size = per_task_size
+        self.lock = threading.Lock()
+        self.task_members: Dict[int, Dict[str, object]] = {}
+        self.dirty_members: Dict[int, Dict[str, object]] = {}
+        self.key_to_task: Dict[str, int] = {}
+
+    def add(self, key: str, cache_data) -> int:
+        with self.lock:
+            task_id = self.key_to_task.get(key)
+            if task_id is None:
+                task_id = self._choose_task_id()
+                self.key_to_task[key] = task_id
+                self.task_members.setdefault(task_id, {})
+            self.task_members[task_id][key] = cache_data
+            cache_data.task_id = task_id
+            self.dirty_members.setdefault(task_id, {})[key] = cache_data
+            return task_id
+
+    def _choose_task_id(self) -> int:
+        # task数量等于 配置总数/per_task_size，遍历开销可以忽略
+        for task_id in range(len(self.task_members)):
+            if len(self.task_members.get(task_id, ())) < self.per_task_size:
+                return task_id
+        return len(self.task_members)
+
+    def mark_dirty(self, key: str):
+        with self.lock:
+            task_id = self.key_to_task.get(key)
+            if task_id is None:
+                return
+            self.dirty_members.setdefault(task_id, {})[key] = self.task_members[task_id][key]
+
+    def mark_synced(self, key: str):
+        with self.lock:
+            task_id = self.key_to_task.get(key)
+            if task_id is None:
+                return
+            dirty = self.dirty_members.get(task_id)
+            if dirty is not None:
+                dirty.pop(key, None)
+                if not dirty:
+                    del self.dirty_members[task_id]
+
+    def remove(self, key: str):
+        with self.lock:
+            task_id = self.key_to_task.pop(key, None)
+            if task_id is None:
+                return
+            self.task_members[task_id].pop(key, None)
+            dirty = self.dirty_members.get(task_id)
+            if dirty is not None:
+                dirty.pop(key, None)
+                if not dirty:
+                    del self.dirty_members[task_id]
+            self._rebalance(task_id)
+
+    def _rebalance(self, task_id: int):
+        # 从编号最大的task中挪一个配置补到空出来的位置，保持task编号连续且除最后一个外都是满的
+        last_task_id = len(self.task_members) - 1
+        if task_id != last_task_id and self.task_members[last_task_id]:
+            moved_key, moved_cache_data = self.task_members[last_task_id].popitem()
+            last_dirty = self.dirty_members.get(last_task_id)
+            if last_dirty is not None:
+                last_dirty.pop(moved_key, None)
+                if not last_dirty:
+                    del self.dirty_members[last_task_id]
+            self.task_members[task_id][moved_key] = moved_cache_data
+            self.key_to_task[moved_key] = task_id
+            moved_cache_data.task_id = task_id
+            moved_cache_data.is_sync_with_server = False
+            # 配置换到了另一个task，需要在新task对应的连接上重新监听
+            self.dirty_members.setdefault(task_id, {})[moved_key] = moved_cache_data
+
+        if not self.task_members[last_task_id]:
+            del self.task_members[last_task_id]
+            self.dirty_members.pop(last_task_id, None)
+
+    def get_listen_tasks(self, need_all_sync: bool) -> Dict[int, List[object]]:
+        with self.lock:
+            source = self.task_members if need_all_sync else self.dirty_members
+            return {task_id: list(members.values()) for task_id, members in source.items() if members}
+
+    def get_task_id(self, key: str):
+        return self.key_to_task.get(key)
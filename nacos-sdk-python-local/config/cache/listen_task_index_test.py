@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from v2.nacos.config.cache.listen_task_index import ListenTaskIndex
+
+
+def _cache_data(key):
+    return SimpleNamespace(key=key, task_id=None, is_sync_with_server=True)
+
+
+def _keys(tasks):
+    return {task_id: sorted(c.key for c in members) for task_id, members in tasks.items()}
+
+
+def test_configs_fill_tasks_in_order():
+    index = ListenTaskIndex(2)
+    task_ids = [index.add(key, _cache_data(key)) for key in ("a", "b", "c")]
+    assert task_ids == [0, 0, 1]
+    assert _keys(index.get_listen_tasks(True)) == {0: ["a", "b"], 1: ["c"]}
+
+
+def test_only_dirty_configs_are_listened_incrementally():
+    index = ListenTaskIndex(2)
+    for key in ("a", "b", "c"):
+        index.add(key, _cache_data(key))
+    for key in ("a", "b", "c"):
+        index.mark_synced(key)
+    assert index.get_listen_tasks(False) == {}
+
+    index.mark_dirty("b")
+    assert _keys(index.get_listen_tasks(False)) == {0: ["b"]}
+    assert _keys(index.get_listen_tasks(True)) == {0: ["a", "b"], 1: ["c"]}
+
+
+def test_remove_moves_last_config_into_freed_slot():
+    index = ListenTaskIndex(2)
+    cache = {key: _cache_data(key) for key in ("a", "b", "c")}
+    for key, cache_data in cache.items():
+        index.add(key, cache_data)
+        index.mark_synced(key)
+
+    index.remove("a")
+    assert _keys(index.get_listen_tasks(True)) == {0: ["b", "c"]}
+    assert index.get_task_id("c") == 0
+    assert cache["c"].task_id == 0
+    # 换了task的配置需要在新的task上重新监听
+    assert not cache["c"].is_sync_with_server
+    assert _keys(index.get_listen_tasks(False)) == {0: ["c"]}
+    assert index.get_task_id("a") is None
@@ -3,6 +3,8 @@ import os
 import threading
 import time
 import uuid
+from typing import List
+from concurrent.futures import ThreadPoolExecutor, wait
 from ..common.constants import Constants
 from ..common.client_config import ClientConfig
 from ..nacos_client import NacosClient
@@ -15,8 +17,12 @@ from ..util.common_util import check_key_param, get_config_cache_key
 from ..util.md5_util import md5
 from model.config_response import ConfigResponse
 from model.config_request import ConfigRequest
+from cache.concurrent_map import ConcurrentMap
+from cache.listen_task_index import ListenTaskIndex
+from cache.config_read_cache import ConfigReadCache
+from cache.failover_index import FailoverIndex
 from cache.disk_cache import get_failover_encrypted_data_key, read_config_from_file, read_encrypted_data_key_from_file, \
-    get_failover
+    get_failover, open_snapshot_store, close_snapshot_store
 from ..transport.model import RpcRequest
 from ... import NacosError
 
@@ -36,6 +42,8 @@ class CacheData:
         self.encrypted_data_key = encrypted_data_key
         self.task_id = task_id
         self.config_client = config_client
+        self.content_type = ""
+        self.is_sync_with_server = False
 
 
 class ConfigClient(NacosClient):
@@ -53,7 +61,7 @@ class ConfigClient(NacosClient):
         self.config_proxy = config_proxy
         self.config_cache_dir = config_cache_dir
         self.last_all_sync_time = time.time()
-        self.cache_map = []
+        self.cache_map = ConcurrentMap()
         self.uid = uid
         self.listen_execute = listen_execute
 
@@ -139,6 +147,21 @@ class ConfigService:
         self.namespace_id = client_config.namespace_id
         self.config_client = self.get_config_client()
         self.cache_map = self.config_client.cache_map
+        self.last_all_sync_time = time.time()
+        # 未与服务端同步的配置索引，每轮监听只需处理其中的配置
+        self.listen_task_index = ListenTaskIndex(perTaskConfigSize)
+        # 各task的批量监听请求并发发送，变更配置的查询交给有界的线程池执行
+        self.listen_executor = ThreadPoolExecutor(max_workers=client_config.config_listen_thread_num,
+                                                  thread_name_prefix="nacos-config-listen")
+        self.refresh_executor = ThreadPoolExecutor(max_workers=client_config.config_refresh_thread_num,
+                                                   thread_name_prefix="nacos-config-refresh")
+        if client_config.snapshot_store_enabled:
+            open_snapshot_store(self.config_cache_dir, self.logger)
+        self.failover_index = FailoverIndex(self.config_client.config_cache_dir, self.logger,
+                                            client_config.config_failover_check_interval)
+        self.failover_index.start()
+        self.config_read_cache = ConfigReadCache(client_config.config_read_cache_max_size,
+                                                 client_config.config_read_cache_expire_time)
 
     def get_config_client(self):
         self.start_internal()
@@ -153,9 +176,44 @@ class ConfigService:
 
     def get_config(self, param: ConfigParam):
         """获取配置信息, 过滤response"""
+        if not param.group:
+            param.group = Constants.DEFAULT_GROUP
+        cache_key = get_config_cache_key(param.data_id, param.group, self.namespace_id)
+
+        # failover内容优先于任何缓存
+        if self.failover_index.has_failover(cache_key):
+            content, encrypted_data_key, err_msg = self._get_config_inner(param)
+            if err_msg is not None:
+                return "", err_msg
+            return self._do_response_filters(param, content, encrypted_data_key)
+
+        # 已监听且与服务端同步的配置，直接使用CacheData中的内容，过滤结果按md5记忆
+        cache_data = self.cache_map.get(cache_key)
+        if cache_data is not None and cache_data.is_sync_with_server:
+            md5_str = cache_data.md5
+            content = self.config_read_cache.get_listened(cache_key, md5_str)
+            if content is not None:
+                return content, None
+            content, err_msg = self._do_response_filters(param, cache_data.content, cache_data.encrypted_data_key)
+            if err_msg is not None:
+                return "", err_msg
+            self.config_read_cache.put_listened(cache_key, md5_str, content)
+            return content, None
+
+        content = self.config_read_cache.get(cache_key)
+        if content is not None:
+            return content, None
+
         content, encrypted_data_key, err_msg = self._get_config_inner(param)
         if err_msg is not None:
             return "", err_msg
+        content, err_msg = self._do_response_filters(param, content, encrypted_data_key)
+        if err_msg is not None:
+            return "", err_msg
+        self.config_read_cache.put(cache_key, content)
+        return content, None
+
+    def _do_response_filters(self, param: ConfigParam, content, encrypted_data_key):
         deep_copy = copy.deepcopy(param)
         deep_copy.encrypted_data_key = encrypted_data_key
         deep_copy.content = content
@@ -164,7 +222,90 @@ class ConfigService:
             self.config_filter_chain_manager.do_filters(deep_copy)
         except Exception as e:
             return "", str(e)
-        return content, None
+        return deep_copy.content, None
+
+    def get_configs(self, params: List[ConfigParam]):
+        """
+        批量获取配置，需要查询服务端的配置并发查询，过滤链和快照写入批量执行
+        :return: ({(data_id, group): content}, {(data_id, group): err_msg})
+        """
+        results = {}
+        errors = {}
+        contents = {}
+        query_keys = []
+        for param in params:
+            if not param.group:
+                param.group = Constants.DEFAULT_GROUP
+            key = (param.data_id, param.group)
+            if key in contents or key in errors:
+                continue
+            try:
+                check_key_param(param.data_id, param.group)
+            except Exception as e:
+                errors[key] = str(e)
+                continue
+
+            cache_key = get_config_cache_key(param.data_id, param.group, self.namespace_id)
+            content = self._get_failover(cache_key)
+            if content:
+                self.logger.warning(f"{self.namespace_id} {param.group} {param.data_id} is using failover content!")
+                contents[key] = (param, content, get_failover_encrypted_data_key(
+                    cache_key, self.config_client.config_cache_dir, self.logger))
+                continue
+            contents[key] = (param, None, None)
+            query_keys.append((param.data_id, param.group, self.namespace_id))
+
+        query_results = self.config_proxy.query_configs(query_keys, self.client_config.timeout_ms, False,
+                                                        self.nacos_client,
+                                                        self.client_config.config_batch_query_max_in_flight)
+        for data_id, group, tenant in query_keys:
+            key = (data_id, group)
+            cache_key = get_config_cache_key(data_id, group, tenant)
+            response, err = query_results.get(cache_key, (None, "config query not executed"))
+            param = contents[key][0]
+            if err is not None:
+                self.logger.error(
+                    f"get config from server error:{err}, dataId:{data_id}, group:{group}, namespaceId:{tenant}")
+                content, encrypted_data_key, err = self._read_config_snapshot(cache_key, param)
+                if err is not None:
+                    del contents[key]
+                    errors[key] = err
+                    continue
+                contents[key] = (param, content, encrypted_data_key)
+                continue
+            if not response.is_success():
+                del contents[key]
+                errors[key] = response.get_message()
+                continue
+            contents[key] = (param, response.content, response.encrypted_data_key)
+
+        keys = list(contents.keys())
+        filter_params = []
+        for key in keys:
+            param, content, encrypted_data_key = contents[key]
+            deep_copy = copy.deepcopy(param)
+            deep_copy.encrypted_data_key = encrypted_data_key
+            deep_copy.content = content
+            deep_copy.type = UsageType.response_type
+            filter_params.append(deep_copy)
+        filter_errors = self.config_filter_chain_manager.do_filters_batch(filter_params)
+        for i, key in enumerate(keys):
+            if i in filter_errors:
+                errors[key] = filter_errors[i]
+            else:
+                results[key] = filter_params[i].content
+        return results, errors
+
+    def _read_config_snapshot(self, cache_key, param: ConfigParam):
+        if self.client_config.disable_use_snap_shot:
+            return "", "", "get config from remote nacos server fail, and is not allowed to read local file"
+        cache_content, cache_err = read_config_from_file(cache_key, self.config_client.config_cache_dir)
+        if cache_err is not None:
+            return "", "", f"read config from both server and cache fail, err={cache_err}"
+        if not param.data_id.startswith(Constants.CipherPrefix):
+            return cache_content, "", None
+        encrypted_data_key = read_encrypted_data_key_from_file(cache_key, self.config_client.config_cache_dir)
+        return cache_content, encrypted_data_key, None
 
     def _get_config_inner(self, param: ConfigParam):
         if not param.group:
@@ -172,13 +313,13 @@ class ConfigService:
         check_key_param(param.data_id, param.group)
 
         cache_key = get_config_cache_key(param.data_id, param.group, self.namespace_id)
-        content = get_failover(cache_key, self.config_client.config_cache_dir, self.logger)
+        content = self._get_failover(cache_key)
 
         if content:
             self.logger.warning(f"{self.namespace_id} {param.group} {param.data_id} is using failover content!")
             encrypted_data_key = get_failover_encrypted_data_key(cache_key, self.config_client.config_cache_dir,
                                                                  self.logger)
-            return content, encrypted_data_key
+            return content, encrypted_data_key, None
 
         # 这里要对齐下log如何实现的传errorMsg
         response, logger_msg = self.config_proxy.query_config(param.data_id, param.group, self.namespace_id,
@@ -187,16 +328,17 @@ class ConfigService:
             self.logger.error(
                 f"get config from server error:{logger_msg}, dataId:{param.data_id}, group:{param.group}, namespaceId:{self.namespace_id}")
             if self.client_config.disable_use_snap_shot:
-                return "", "", self.logger.error(
-                    f"get config from remote nacos server fail, and is not allowed to read local file, err:{logger_msg}")
+                err_msg = f"get config from remote nacos server fail, and is not allowed to read local file, err:{logger_msg}"
+                self.logger.error(err_msg)
+                return "", "", err_msg
             cache_content, cache_err = read_config_from_file(cache_key, self.config_client.config_cache_dir)
             if cache_err is not None:
-                return "", "", self.logger.error(
-                    f"read config from both server and cache fail, err={cache_err}, dataId={param.data_id}, group={param.group}, namespaceId={self.namespace_id}")
+                err_msg = f"read config from both server and cache fail, err={cache_err}, dataId={param.data_id}, group={param.group}, namespaceId={self.namespace_id}"
+                self.logger.error(err_msg)
+                return "", "", err_msg
             if not param.data_id.startswith(Constants.CipherPrefix):
                 return cache_content, "", None
-            encrypted_data_key, cache_err = read_encrypted_data_key_from_file(cache_key,
-                                                                              self.config_client.config_cache_dir)
+            encrypted_data_key = read_encrypted_data_key_from_file(cache_key, self.config_client.config_cache_dir)
             return cache_content, encrypted_data_key, None
         if response and response.Response is not None and not response.is_success():
             return response.content, response.encrypted_data_key, response.get_message()
@@ -204,6 +346,19 @@ class ConfigService:
         content = response.content
         return content, encrypted_data_key, None
 
+    def _get_failover(self, cache_key):
+        # 绝大多数配置没有failover文件，先查内存索引，避免每次读取都访问磁盘
+        if not self.failover_index.has_failover(cache_key):
+            return ""
+        content = get_failover(cache_key, self.config_client.config_cache_dir, self.logger)
+        if content:
+            self.failover_index.record_hit()
+        return content
+
+    def get_failover_hit_count(self) -> int:
+        """返回使用failover内容响应读取的次数"""
+        return self.failover_index.get_hit_count()
+
     def add_listener(self, listeners, param: ConfigParam) -> None:
         """为指定的配置添加监听器，当服务器修改配置后，客户端将使用传入的监听器进行回调"""
         if not param.data_id:
@@ -219,15 +374,18 @@ class ConfigService:
 
         key = get_config_cache_key(param.data_id, param.group, self.namespace_id)
 
-        if key in self.cache_map:
-            c_data = self.cache_map[key]
-            c_data.is_initializing = True
-        else:
-            content = read_config_from_file(key, self.config_cache_dir)
-            if not content:
-                self.logger.warning("Failed to read config from file")
+        with self.lock:
+            if key in self.cache_map:
+                c_data = self.cache_map[key]
+                c_data.is_initializing = True
+                for listener in listeners:
+                    c_data.listeners.append(listener)
                 return None
 
+            content, cache_err = read_config_from_file(key, self.config_cache_dir)
+            if cache_err is not None:
+                self.logger.warning(f"Failed to read config from file, {cache_err}")
+
             encrypted_data_key = read_encrypted_data_key_from_file(key, self.config_cache_dir)
             md5_str = md5(content) if content else ''
 
@@ -239,16 +397,15 @@ class ConfigService:
                 content=content,
                 md5_str=md5_str,
                 encrypted_data_key=encrypted_data_key,
-                task_id=len(self.cache_map) // perTaskConfigSize,
-                config_client=self
+                task_id=0,
+                config_client=self,
+                listeners=list(listeners)
             )
 
-            for listener in listeners:
-                cache_data.listeners.append(listener)
-
-            # 刷新缓存
-            with self.lock:
-                self.cache_map[key] = cache_data
+            # 刷新缓存，task id由索引分配
+            self.cache_map[key] = cache_data
+            self.listen_task_index.add(key, cache_data)
+        self.listen_execute.set()
 
     def publish_config(self, param: ConfigParam) -> bool:
         """发布配置信息"""
@@ -279,6 +436,7 @@ class ConfigService:
         response = self.config_proxy.request_proxy(self.rpc_client, request, Constants.DEFAULT_TIMEOUT_MILLS)
 
         if response:
+            self.config_read_cache.invalidate(get_config_cache_key(param.data_id, param.group, self.namespace_id))
             return True
 
         return False
@@ -294,6 +452,7 @@ class ConfigService:
         request = RpcRequest.remove_request(param.group, param.data_id, self.namespace_id)
 
         rpc_client = self.config_proxy.get_rpc_client(self)
+        self.config_read_cache.invalidate(get_config_cache_key(param.data_id, param.group, self.namespace_id))
 
         response = self.config_proxy.request_proxy(rpc_client, request, Constants.DEFAULT_TIMEOUT_MILLS)
         if response is not None:
@@ -307,11 +466,30 @@ class ConfigService:
         if self.nacos_client.get_client_config is None:
             self.logger.error("get config info failed")
             return
+        key = get_config_cache_key(param.data_id, param.group, self.namespace_id)
         with self.lock:
-            self.cache_map.remove_tenant_listener(get_config_cache_key(param.data_id, param.group, self.namespace_id),
-                                                  listener)
+            cache_data = self.cache_map.get(key)
+            if cache_data is None:
+                return
+            if listener in cache_data.listeners:
+                cache_data.listeners.remove(listener)
+            if not cache_data.listeners:
+                # 没有监听器后不再监听该配置，并重新平衡各task
+                self.cache_map.delete(key)
+                self.listen_task_index.remove(key)
+                self.config_read_cache.invalidate(key)
         return
 
+    def notify_config_changed(self, data_id, group, tenant):
+        """服务端推送配置变更时调用，将配置标记为未同步并触发一轮监听"""
+        key = get_config_cache_key(data_id, group, tenant)
+        cache_data = self.cache_map.get(key)
+        if cache_data is None:
+            return
+        cache_data.is_sync_with_server = False
+        self.listen_task_index.mark_dirty(key)
+        self.listen_execute.set()
+
     def add_config_filter(self, config_filter: 'IConfigFilter') -> None:
         """
         大工程，和listen_execute、config_filter_chain_manager
@@ -347,8 +525,12 @@ class ConfigService:
 
     def shut_down(self):
         """关闭资源服务"""
+        self.failover_index.stop()
+        self.listen_executor.shutdown(wait=False)
+        self.refresh_executor.shutdown(wait=False)
         self.config_proxy.get_rpc_client.shutdown()
         self.config_proxy.shut_down()
+        close_snapshot_store(self.config_cache_dir)
 
     def _build_response(self, response):
         if response.is_success():
@@ -377,57 +559,66 @@ class ConfigService:
 
     def execute_config_listen(self):
 
-        need_all_sync = (time.time() - self.last_all_sync_time) >= Constant.ALL_SYNC_INTERNAL
-        has_changed_keys = False
+        need_all_sync = (time.time() - self.last_all_sync_time) >= Constants.ALL_SYNC_INTERNAL
 
         listen_task_map = self.build_listen_task(need_all_sync)
         if not listen_task_map:
             return
 
-        for task_id, caches in listen_task_map.items():
-            request = self.build_config_batch_listen_request(caches)
-            rpc_client = self.config_proxy.create_rpc_client(str(task_id))
-            try:
-                i_response = self.request_proxy(rpc_client, request, 3)
-                if i_response is None:
-                    self.logger.warn("ConfigBatchListenRequest failure, response is nil")
-                    continue
-                if not i_response.is_success():
-                    self.logger.warn(f"ConfigBatchListenRequest failure, error code:{i_response.get_error_code()}")
-                    continue
-                response = i_response  # 断言？
-                if not response:
-                    continue
-
-                if len(response.changed_configs) > 0:
-                    has_changed_keys = True
+        # 每个task使用各自的rpc client并发监听，整体耗时取决于最慢的一个task而不是所有task之和
+        futures = [self.listen_executor.submit(self._execute_listen_task, task_id, caches)
+                   for task_id, caches in listen_task_map.items()]
+        wait(futures)
+        has_changed_keys = any(not future.exception() and future.result() for future in futures)
 
-                change_keys = {}
-                for v in response.changed_configs:
-                    change_key = common_util.get_config_cache_key(v.data_id, v.group, v.tenant)
-                    if self.cache_map.get(change_key):
-                        c_data = self.cache_map[change_key]
-                        self.refresh_content_and_check(c_data, not c_data.is_initializing)
+        if need_all_sync:
+            self.last_all_sync_time = time.time()
 
-                for k, v in self.cache_map.items():
-                    data = v
-                    change_key = self.get_config_cache_key(data.data_id, data.group, data.tenant)
-                    if change_key not in change_keys:
-                        data.is_sync_with_server = True
-                        continue
+        if has_changed_keys:
+            self.async_notify_listen_config()
 
-                    data.is_initializing = True
-                    self.cache_map[change_key] = data
+    def _execute_listen_task(self, task_id, caches) -> bool:
+        request = self.build_config_batch_listen_request(caches)
+        rpc_client = self.config_proxy.create_rpc_client(str(task_id))
+        try:
+            i_response = self.config_proxy.request_proxy(rpc_client, request, Constants.DEFAULT_TIMEOUT_MILLS)
+            if i_response is None:
+                self.logger.warn("ConfigBatchListenRequest failure, response is nil")
+                return False
+            if not i_response.is_success():
+                self.logger.warn(f"ConfigBatchListenRequest failure, error code:{i_response.get_error_code()}")
+                return False
+            response = i_response  # 断言？
+            if not response:
+                return False
+
+            change_keys = set()
+            refresh_futures = []
+            for v in response.changed_configs:
+                change_key = get_config_cache_key(v.data_id, v.group, v.tenant)
+                change_keys.add(change_key)
+                c_data = self.cache_map.get(change_key)
+                if c_data:
+                    refresh_futures.append(
+                        self.refresh_executor.submit(self.refresh_content_and_check, c_data,
+                                                     not c_data.is_initializing))
+            # 查询结果直接更新cache_map中的CacheData，这里等待本task的查询全部完成
+            wait(refresh_futures)
+
+            # 只需处理本task内参与监听的配置，未变化的标记为已同步并移出索引
+            for data in caches:
+                change_key = get_config_cache_key(data.data_id, data.group, data.tenant)
+                if change_key not in change_keys:
+                    data.is_sync_with_server = True
+                    self.listen_task_index.mark_synced(change_key)
+                    continue
 
-            except Exception as e:
-                self.logger.warn(f"ConfigBatchListenRequest failure, err:{str(e)}")
-                continue
-            finally:
-                if need_all_sync:
-                    self.last_all_sync_time = time.time()
+                data.is_initializing = True
 
-                if has_changed_keys:
-                    self.async_notify_listen_config()
+            return len(change_keys) > 0
+        except Exception as e:
+            self.logger.warn(f"ConfigBatchListenRequest failure, err:{str(e)}")
+            return False
 
     def build_config_batch_listen_request(self, caches):
         request = config_request.ConfigBatchListenRequest.new_config_batch_listen_request(len(caches))
@@ -462,16 +653,7 @@ class ConfigService:
             self.logger.error("refresh content and check md5 fail, dataId=%s, group=%s, tenant=%s",
                           cache_data.data_id, cache_data.group, cache_data.tenant)
 
-    def build_listen_task(self):
-        listen_task_map = {}
-
-        for data in self.cache_map.values():
-            if data.is_sync_with_server:
-                if data.md5 != data.cache_data_listener.last_md5:
-                    data.execute_listener()
-                if not need_all_sync:
-                    continue
-            listen_task_map[data.taskId].append(data)
-
-        return listen_task_map
+    def build_listen_task(self, need_all_sync):
+        # 增量模式下只返回未同步的配置；全量同步时返回所有配置
+        return self.listen_task_index.get_listen_tasks(need_all_sync)
 
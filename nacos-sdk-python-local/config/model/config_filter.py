@@ -58,6 +58,19 @@ class ConfigFilterChain:
         for config_filter in self.config_filters:
             config_filter.do_filter(param)
 
+    def do_filters_batch(self, params) -> dict:
+        """对一批配置依次执行过滤链，返回 {参数下标: 异常信息}，单个配置失败不影响其他配置"""
+        errors = {}
+        for config_filter in self.config_filters:
+            for i, param in enumerate(params):
+                if i in errors:
+                    continue
+                try:
+                    config_filter.do_filter(param)
+                except Exception as e:
+                    errors[i] = str(e)
+        return errors
+
     def do_filter_by_name(self, param, name: str) -> None:
         for config_filter in self.config_filters:
             if config_filter.get_filter_name() == name:
@@ -1,7 +1,11 @@
+import asyncio
+import os
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from ...common.constants import Constants
+from ...common.nacos_exception import NacosException, CLIENT_INVALID_PARAM, SERVER_ERROR
 from ...util.common_util import check_key_param, get_config_cache_key
 from ..model.config_response import ConfigQueryResponse
 from ..model.config_request import ConfigRequest
@@ -74,8 +78,10 @@ class ConfigProxy(IConfigProxy, ABC):
         self.nacos_server = nacos_server
         self.client_config = client_config
         self.logger = logger
+        # 与ConfigService读取快照的目录保持一致
+        self.config_cache_dir = os.path.join(client_config.cache_dir, "config")
 
-    def query_config(self, data_id, group, tenant, timeout, notify, client):
+    def query_config(self, data_id, group, tenant, timeout, notify, client, write_snapshot=True):
         if not group:
             group = Constants.DEFAULT_GROUP
 
@@ -96,15 +102,16 @@ class ConfigProxy(IConfigProxy, ABC):
             return None, self.logger.errorMsg("ConfigQueryRequest returns type error")
 
         if response.is_success():
-            write_config_to_file(cache_key, self.client_config.cache_dir, response.content, self.logger)
-            write_encrypted_data_key_to_file(cache_key, self.client_config.cache_dir, response.encrypted_data_key, self.logger)
+            if write_snapshot:
+                write_config_snapshot(cache_key, self.config_cache_dir, response.content,
+                                      response.encrypted_data_key, self.logger)
             if not response.content_type:
                 response.content_type = "text"
             return response
 
         if response.get_error_code() == 300:
-            write_config_to_file(cache_key, self.client_config.cache_dir, "", self.logger)
-            write_encrypted_data_key_to_file(cache_key, self.client_config.cache_dir, "", self.logger)
+            if write_snapshot:
+                write_config_snapshot(cache_key, self.config_cache_dir, "", "", self.logger)
             return response
 
         if response.get_error_code() == 400:
@@ -121,6 +128,44 @@ class ConfigProxy(IConfigProxy, ABC):
 
         return response
 
+    def query_configs(self, keys, timeout, notify, client, max_in_flight):
+        """
+        批量查询配置，最多同时发出 max_in_flight 个ConfigQueryRequest，所有结果返回后再统一写快照。
+        :param keys: (data_id, group, tenant) 列表
+        :return: {cache_key: (response, err)}
+        """
+        if not keys:
+            return {}
+
+        def query(key):
+            data_id, group, tenant = key
+            try:
+                result = self.query_config(data_id, group, tenant, timeout, notify, client, write_snapshot=False)
+            except Exception as e:
+                return None, str(e)
+            # query_config 失败时返回 (None, err)
+            if isinstance(result, tuple):
+                return None, result[1]
+            return result, None
+
+        with ThreadPoolExecutor(max_workers=min(max_in_flight, len(keys)),
+                                thread_name_prefix="nacos-config-query") as executor:
+            results = list(executor.map(query, keys))
+
+        query_results = {}
+        snapshots = []
+        for (data_id, group, tenant), (response, err) in zip(keys, results):
+            cache_key = get_config_cache_key(data_id, group or Constants.DEFAULT_GROUP, tenant)
+            query_results[cache_key] = (response, err)
+            if response is None:
+                continue
+            if response.is_success():
+                snapshots.append((cache_key, response.content, response.encrypted_data_key))
+            elif response.get_error_code() == 300:
+                snapshots.append((cache_key, "", ""))
+        write_configs_to_file(snapshots, self.config_cache_dir, self.logger)
+        return query_results
+
     def request_proxy(self, rpc_client, request, timeout_millis):
         self.nacos_server.inject_security_info(request.get_headers())
         self._inject_comm_header(request.get_headers())
@@ -129,9 +174,22 @@ class ConfigProxy(IConfigProxy, ABC):
         sign_headers = self.nacos_server.get_sign_headers_from_request(request, self.client_config.secret_key)
         request.put_all_headers(sign_headers)
 
+        # RpcClient.request是协程，运行在rpc_client.loop上；这里是同步调用方，提交到该循环后等待结果
+        loop = rpc_client.loop
         try:
-            response = rpc_client.request(request, int(timeout_millis / 1000))
-            return response
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            return NacosException(CLIENT_INVALID_PARAM, "request_proxy must not be called on the rpc client loop")
+
+        future = asyncio.run_coroutine_threadsafe(rpc_client.request(request, int(timeout_millis)), loop)
+        try:
+            # rpc_client.request自身按timeout_millis超时，这里多留一点余量给调度
+            return future.result(timeout_millis / 1000 + 1)
+        except FutureTimeoutError:
+            future.cancel()
+            return NacosException(SERVER_ERROR, f"request timeout after {timeout_millis}ms")
         except Exception as e:
             return e
 
@@ -139,5 +197,5 @@ class ConfigProxy(IConfigProxy, ABC):
         pass
 
     def shut_down(self):
-        pass
+        flush_snapshots()
 
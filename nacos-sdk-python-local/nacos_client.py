@@ -4,6 +4,7 @@ from logging.handlers import TimedRotatingFileHandler
 
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.async_http_agent import AsyncHttpAgent
 
 
 class NacosClient:
@@ -18,7 +19,11 @@ class NacosClient:
             client_config.heart_beat_interval = 5 * 1000
 
         self.client_config = client_config
-        self.http_agent = HttpAgent(self.logger, client_config.tls_config, client_config.timeout_ms)
+        self.http_agent = HttpAgent(self.logger, client_config.tls_config, client_config.timeout_ms,
+                                    client_config.http_pool_max_size, client_config.http_pool_idle_timeout)
+        self.async_http_agent = AsyncHttpAgent(self.logger, client_config.tls_config, client_config.timeout_ms,
+                                               client_config.http_max_concurrency_per_host,
+                                               client_config.http_pool_max_size, client_config.http_pool_idle_timeout)
 
     def init_log(self, client_config: ClientConfig, module):
         log_level = client_config.log_level or logging.INFO
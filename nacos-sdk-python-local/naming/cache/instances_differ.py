@@ -0,0 +1,91 @@
+from typing import Dict, List
+
+
+def _get_field(obj, attr, *keys, default=None):
+    # 服务和实例既可能是模型对象，也可能是服务端返回的dict（字段名首字母大小写都可能出现）
+    if isinstance(obj, dict):
+        for key in keys:
+            if key in obj:
+                return obj[key]
+        return default
+    return getattr(obj, attr, default)
+
+
+def get_hosts(service) -> list:
+    if service is None:
+        return []
+    return _get_field(service, "hosts", "hosts", "Hosts", default=None) or []
+
+
+def get_checksum(service) -> str:
+    if service is None:
+        return ""
+    return _get_field(service, "checksum", "checksum", "Checksum", default="") or ""
+
+
+def get_instance_key(instance) -> str:
+    return "%s#%s#%s" % (_get_field(instance, "ip", "ip", "Ip"),
+                         _get_field(instance, "port", "port", "Port"),
+                         _get_field(instance, "cluster_name", "clusterName", "ClusterName"))
+
+
+def get_instance_fingerprint(instance) -> tuple:
+    return (_get_field(instance, "weight", "weight", "Weight"),
+            _get_field(instance, "healthy", "healthy", "Healthy"),
+            _get_field(instance, "enable", "enabled", "Enable"),
+            _get_field(instance, "ephemeral", "ephemeral", "Ephemeral"),
+            _get_field(instance, "metadata", "metadata", "Metadata"))
+
+
+class InstancesDiff:
+    def __init__(self, added_instances=None, removed_instances=None, modified_instances=None):
+        self.added_instances: List = added_instances if added_instances is not None else []
+        self.removed_instances: List = removed_instances if removed_instances is not None else []
+        self.modified_instances: List = modified_instances if modified_instances is not None else []
+
+    def has_different(self) -> bool:
+        return self.is_added() or self.is_removed() or self.is_modified()
+
+    def is_added(self) -> bool:
+        return len(self.added_instances) > 0
+
+    def is_removed(self) -> bool:
+        return len(self.removed_instances) > 0
+
+    def is_modified(self) -> bool:
+        return len(self.modified_instances) > 0
+
+    def __str__(self):
+        return "InstancesDiff(added=%s, removed=%s, modified=%s)" % (
+            len(self.added_instances), len(self.removed_instances), len(self.modified_instances))
+
+
+class InstancesDiffer:
+    """
+    以 ip#port#cluster 为key比较新旧服务的实例列表，得到新增、删除、修改的实例。
+    服务端checksum相同时直接认为没有变化；否则只需各遍历一次新旧实例列表，不排序也不复制列表
+    """
+
+    def do_diff(self, old_service, new_service) -> InstancesDiff:
+        old_checksum = get_checksum(old_service)
+        if old_checksum and old_checksum == get_checksum(new_service):
+            return InstancesDiff()
+
+        old_hosts = get_hosts(old_service)
+        new_hosts = get_hosts(new_service)
+        if not old_hosts:
+            return InstancesDiff(added_instances=list(new_hosts))
+        if not new_hosts:
+            return InstancesDiff(removed_instances=list(old_hosts))
+
+        old_instances: Dict[str, object] = {get_instance_key(host): host for host in old_hosts}
+        added = []
+        modified = []
+        for host in new_hosts:
+            old_host = old_instances.pop(get_instance_key(host), None)
+            if old_host is None:
+                added.append(host)
+            elif old_host is not host and get_instance_fingerprint(old_host) != get_instance_fingerprint(host):
+                modified.append(host)
+        # 剩下未被匹配的就是被删除的实例
+        return InstancesDiff(added, list(old_instances.values()), modified)
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from v2.nacos.naming.cache.instances_differ import InstancesDiffer
+
+
+def _host(ip, weight=1.0, cluster="DEFAULT"):
+    return {"ip": ip, "port": 8080, "clusterName": cluster, "weight": weight, "healthy": True, "enabled": True}
+
+
+def _service(hosts, checksum=""):
+    return {"hosts": hosts, "checksum": checksum}
+
+
+def test_added_removed_and_modified_instances():
+    old = _service([_host("10.0.0.1"), _host("10.0.0.2"), _host("10.0.0.3")])
+    new = _service([_host("10.0.0.1"), _host("10.0.0.2", weight=2.0), _host("10.0.0.4")])
+    diff = InstancesDiffer().do_diff(old, new)
+    assert diff.added_instances == [_host("10.0.0.4")]
+    assert diff.removed_instances == [_host("10.0.0.3")]
+    assert diff.modified_instances == [_host("10.0.0.2", weight=2.0)]
+
+
+def test_instances_in_different_clusters_are_different():
+    old = _service([_host("10.0.0.1", cluster="A")])
+    new = _service([_host("10.0.0.1", cluster="B")])
+    diff = InstancesDiffer().do_diff(old, new)
+    assert diff.added_instances == [_host("10.0.0.1", cluster="B")]
+    assert diff.removed_instances == [_host("10.0.0.1", cluster="A")]
+    assert not diff.is_modified()
+
+
+def test_same_checksum_means_no_change():
+    old = _service([_host("10.0.0.1")], checksum="c1")
+    new = _service([_host("10.0.0.2")], checksum="c1")
+    assert not InstancesDiffer().do_diff(old, new).has_different()
+
+
+def test_empty_side_and_model_objects():
+    hosts = [SimpleNamespace(ip="10.0.0.1", port=8080, cluster_name="DEFAULT")]
+    differ = InstancesDiffer()
+    assert differ.do_diff(None, SimpleNamespace(hosts=hosts, checksum="")).added_instances == hosts
+    assert differ.do_diff(SimpleNamespace(hosts=hosts, checksum=""), None).removed_instances == hosts
+    assert not differ.do_diff(_service([]), _service([])).has_different()
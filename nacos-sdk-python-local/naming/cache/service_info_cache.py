@@ -2,13 +2,19 @@ import json
 import logging
 import os
 import threading
+import time
 from datetime import datetime
 
 from v2.nacos.common.constants import Constants
 from v2.nacos.common import disk_cache
 
 from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.file.snapshot_store import SnapshotStore
+from v2.nacos.common.file.snapshot_writer import SnapshotWriter
+from v2.nacos.naming.cache.instances_differ import InstancesDiff, InstancesDiffer
+from v2.nacos.naming.event.instance_change_notifier import InstancesChangeNotifier
 from v2.nacos.naming.model.service_info import ServiceInfo
+from v2.nacos.naming.util.naming_client_util import get_group_name, get_service_cache_key
 
 
 class ServiceInfoCache:
@@ -17,14 +23,38 @@ class ServiceInfoCache:
         self.update_cache_when_empty = update_cache_when_empty
         self.cache_dir = os.path.join(client_config.cache_dir, Constants.NAMING_MODULE, client_config.namespace_id)
         self.service_info_map = {}
+        # cache key -> (服务原始数据, ServiceInfo)，原始数据被替换后在下一次访问时重建，
+        # 选择实例时复用ServiceInfo中的HostTable和别名表
+        self.service_model_map = {}
         self.update_time_map = {}
         self.lock = threading.Lock()
-
-        if not client_config.not_load_cache_at_start:
+        self.instances_differ = InstancesDiffer()
+        self.instances_change_notifier = InstancesChangeNotifier(client_config, self.get_service_model)
+        # 启用后所有服务的快照保存在同一个文件中，启动时只需打开一次文件
+        self.snapshot_store = SnapshotStore(self.cache_dir, self.logger) \
+            if client_config.snapshot_store_enabled else None
+        # 快照在后台线程中序列化并追加，推送处理路径上不做磁盘IO
+        self.snapshot_writer = SnapshotWriter(self.logger) if self.snapshot_store is not None else None
+        # 懒加载模式下尚未解析的服务快照
+        self.lazy_keys = set()
+        self.prewarm_thread = None
+
+        if client_config.not_load_cache_at_start:
+            return
+        if client_config.naming_load_cache_lazy:
+            self.load_cache_index_from_disk()
+            if client_config.naming_cache_prewarm:
+                self.prewarm_thread = threading.Thread(target=self._prewarm, name="nacos-naming-cache-prewarm",
+                                                       daemon=True)
+                self.prewarm_thread.start()
+        else:
             self.load_cache_from_disk()
 
     def load_cache_from_disk(self):
-        service_map = disk_cache.read_services_from_file(self.cache_dir)
+        if self.snapshot_store is not None:
+            service_map = self._read_services_from_store()
+        else:
+            service_map = disk_cache.read_services_from_file(self.cache_dir)
         if service_map is None or len(service_map) == 0:
             self.logger.info("[load_cache_from_disk] no cache file found, skip loading cache from disk.")
             return
@@ -34,20 +64,98 @@ class ServiceInfoCache:
                 self.service_info_map[service_name] = service_info
             self.logger.info("[load_cache_from_disk] loaded {%s} entries cache from disk.", len(service_map))
 
+    def load_cache_index_from_disk(self):
+        """只读取有哪些服务存在快照，快照内容在第一次被访问时才解析"""
+        if self.snapshot_store is not None:
+            keys = self.snapshot_store.keys()
+        else:
+            try:
+                keys = [name for name in os.listdir(self.cache_dir)
+                        if os.path.isfile(os.path.join(self.cache_dir, name))]
+            except FileNotFoundError:
+                keys = []
+        with self.lock:
+            self.lazy_keys = set(keys) - set(self.service_info_map.keys())
+        self.logger.info("[load_cache_index_from_disk] found {%s} entries cache on disk.", len(keys))
+
+    def get_service_info(self, cache_key):
+        service = self.service_info_map.get(cache_key)
+        if service is not None or cache_key not in self.lazy_keys:
+            return service
+        return self._load_lazy_service(cache_key)
+
+    def get_service_model(self, cache_key) -> ServiceInfo:
+        """返回缓存的服务对应的ServiceInfo，服务不在缓存中时返回None"""
+        service = self.get_service_info(cache_key)
+        if service is None:
+            return None
+        cached = self.service_model_map.get(cache_key)
+        if cached is not None and cached[0] is service:
+            return cached[1]
+        if isinstance(service, ServiceInfo):
+            model = service
+        else:
+            # 缓存中的字段名首字母大写，ServiceInfo的字段首字母小写
+            model = ServiceInfo.from_server_dict({key[:1].lower() + key[1:]: value for key, value in service.items()})
+        # 整体替换元组，读方无需加锁
+        self.service_model_map[cache_key] = (service, model)
+        return model
+
+    def _load_lazy_service(self, cache_key):
+        data = None
+        try:
+            if self.snapshot_store is not None:
+                data = self.snapshot_store.get(cache_key)
+            else:
+                with open(os.path.join(self.cache_dir, cache_key), 'rb') as f:
+                    data = f.read()
+            service = json.loads(data) if data else None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"[load_lazy_service] failed to load cache of {cache_key}, err:{e}")
+            service = None
+
+        with self.lock:
+            self.lazy_keys.discard(cache_key)
+            # 加载期间服务端推送的数据更新，以内存中的为准
+            exist = self.service_info_map.get(cache_key)
+            if exist is not None:
+                return exist
+            if service is not None:
+                self.service_info_map[cache_key] = service
+            return service
+
+    def _prewarm(self):
+        # 低优先级地逐个解析剩余快照，每个之间让出CPU，避免影响业务线程
+        for cache_key in list(self.lazy_keys):
+            if cache_key in self.lazy_keys:
+                self._load_lazy_service(cache_key)
+            time.sleep(0.001)
+        self.logger.info("[prewarm] naming cache prewarm finished.")
+
+    def _read_services_from_store(self):
+        service_map = {}
+        for cache_key, data in self.snapshot_store.items():
+            try:
+                service_map[cache_key] = json.loads(data)
+            except ValueError as e:
+                self.logger.warning(f"[load_cache_from_disk] invalid snapshot of {cache_key}, err:{e}")
+        return service_map
+
     def process_service_json(self, data):
         service = json.loads(data)
         self.process_service(service)
 
     def process_service(self, service):
+        """更新服务缓存，返回相对于旧数据的实例变化，未更新时返回None"""
         if service is None:
-            return
+            return None
 
         if not self.update_cache_when_empty:
             if 'Hosts' not in service or not service['Hosts']:
                 # 如果服务实例列表是空的且update_cache_when_empty为假，则跳过更新缓存
                 self.logger.warning(
                     f"instance list is empty, skipping update as update_cache_when_empty is set to False. service name: {service['Name']}")
-                return
+                return None
 
         # 构建cache key，你需要根据其实现自己的获取键的方法
         cache_key = self.get_service_cache_key(service)
@@ -57,42 +165,45 @@ class ServiceInfoCache:
             if old_domain is not None and old_domain['LastRefTime'] >= service['LastRefTime']:
                 self.logger.warn(
                     f"out of date data received, old-t: {old_domain['LastRefTime']}, new-t: {service['LastRefTime']}")
-                return
+                return None
 
             # 更新时间和服务信息
             self.update_time_map[cache_key] = int(datetime.now().timestamp() * 1000)
             self.service_info_map[cache_key] = service
 
-            if not old_domain or self.check_instance_changed(old_domain, service):
-                self.logger.info(f"service key: {cache_key} was updated to: {json.dumps(service)}")
-                # 在这里你需要实现将服务信息写到磁盘的功能
+            diff = self.instances_differ.do_diff(old_domain, service)
+
+        if diff.has_different():
+            self.logger.info(f"service key: {cache_key} was updated, {diff}")
+            if self.snapshot_store is not None:
+                self.snapshot_writer.put_to_store(self.snapshot_store, cache_key, lambda: json.dumps(service))
 
-                # 触发订阅更新，这里你需要实现订阅逻辑
-                # self.sub_callback.service_changed(cache_key, service)
+            # 只把实例的变化通知给订阅者
+            self.instances_change_notifier.on_service_changed(cache_key, diff)
+        return diff
 
     def get_service_cache_key(self, service):
-        # 生成服务的缓存键
-        return f"{service['Name']}@{service['Clusters']}"
-
-    def check_instance_changed(self, old_domain, service):
-        if old_domain is None:
-            return True
-        old_service = old_domain
-        return self.is_service_instance_changed(old_service, service)
-
-    def is_service_instance_changed(self, old_service: ServiceInfo, new_service: ServiceInfo):
-        old_hosts_len = len(old_service['Hosts'])
-        new_hosts_len = len(new_service['Hosts'])
-        if old_hosts_len != new_hosts_len:
-            return True
-
-        old_ref_time = old_service['LastRefTime']
-        new_ref_time = new_service['LastRefTime']
-        if old_ref_time > new_ref_time:
-            self.logger.warn(f"out of date data received, old-t: {old_ref_time}, new-t: {new_ref_time}")
-            return False
-
-        # 排序实例列表并比较，函数需要你实现
-        old_instance = sorted(old_service['Hosts'])
-        new_instance = sorted(new_service['Hosts'])
-        return old_instance != new_instance
+        # 与订阅、选择实例时使用的key保持一致：group@@service[@@clusters]
+        name = service['Name']
+        group_name = service.get('GroupName')
+        if group_name and Constants.SERVICE_INFO_SPLITER not in name:
+            name = get_group_name(name, group_name)
+        return get_service_cache_key(name, service.get('Clusters'))
+
+    def get_service_instances_diff(self, old_service, new_service) -> InstancesDiff:
+        if old_service is not None:
+            old_ref_time = old_service['LastRefTime']
+            new_ref_time = new_service['LastRefTime']
+            if old_ref_time > new_ref_time:
+                self.logger.warn(f"out of date data received, old-t: {old_ref_time}, new-t: {new_ref_time}")
+                return InstancesDiff()
+        return self.instances_differ.do_diff(old_service, new_service)
+
+    def is_service_instance_changed(self, old_service, new_service):
+        return self.get_service_instances_diff(old_service, new_service).has_different()
+
+    def shutdown(self):
+        self.instances_change_notifier.shutdown()
+        if self.snapshot_store is not None:
+            self.snapshot_writer.shutdown()
+            self.snapshot_store.close()
@@ -1,5 +1,208 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from threading import RLock
+from typing import Callable, Dict, List, Optional
+
+from v2.nacos.common.client_config import ClientConfig
+from v2.nacos.common.constants import Constants
+from v2.nacos.naming.cache.instances_differ import InstancesDiff, get_instance_key
+from v2.nacos.naming.model.naming_request import SubscribeParam
+from v2.nacos.util.hashed_wheel_timer import HashedWheelTimer
+
+ADDED = "added"
+
+REMOVED = "removed"
+
+MODIFIED = "modified"
+
+
+def _merge_state(old_state, new_state):
+    # 返回None表示两次变化相互抵消
+    if old_state is None:
+        return new_state
+    if old_state == ADDED:
+        return None if new_state == REMOVED else ADDED
+    if old_state == REMOVED:
+        return MODIFIED if new_state == ADDED else new_state
+    return REMOVED if new_state == REMOVED else MODIFIED
+
+
+class PendingDelta:
+    """合并同一个服务在窗口期内的多次变化，每个实例只保留最终状态和最新数据"""
+
+    def __init__(self):
+        self.changes: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def merge(self, diff: InstancesDiff):
+        for state, instances in ((REMOVED, diff.removed_instances), (ADDED, diff.added_instances),
+                                 (MODIFIED, diff.modified_instances)):
+            for instance in instances:
+                key = get_instance_key(instance)
+                old = self.changes.get(key)
+                merged_state = _merge_state(old[0] if old else None, state)
+                if merged_state is None:
+                    del self.changes[key]
+                else:
+                    self.changes[key] = (merged_state, instance)
+
+    def to_diff(self) -> InstancesDiff:
+        diff = InstancesDiff()
+        for state, instance in self.changes.values():
+            if state == ADDED:
+                diff.added_instances.append(instance)
+            elif state == REMOVED:
+                diff.removed_instances.append(instance)
+            else:
+                diff.modified_instances.append(instance)
+        return diff
+
+
+class InstancesChangeEvent:
+    """
+    一次回调的内容。通常diff是service_key在合并窗口内的实例变化；
+    full_resync为True时该服务积压的变化因队列已满被丢弃，diff为None，
+    service_info是服务当前的完整状态（取不到时为None），订阅者应以它为准重建本地的实例列表
+    """
+
+    def __init__(self, service_key: str, diff: Optional[InstancesDiff], full_resync=False, service_info=None):
+        self.service_key = service_key
+        self.diff = diff
+        self.full_resync = full_resync
+        self.service_info = service_info
+
+    def __str__(self):
+        if self.full_resync:
+            return f"InstancesChangeEvent(service_key={self.service_key}, full_resync=True)"
+        return f"InstancesChangeEvent(service_key={self.service_key}, diff={self.diff})"
+
+
+class Subscriber:
+    def __init__(self, param: SubscribeParam):
+        self.param = param
+        self.service_keys = set()
+        self.lock = RLock()
+        # 等待回调的服务，按服务合并，数量受max_queue_size限制
+        self.pending: "OrderedDict[str, PendingDelta]" = OrderedDict()
+        # 变化被丢弃、需要按完整状态回调的服务，数量不超过订阅的服务数
+        self.resync_keys = set()
+        self.scheduled = False
+        self.callback_lock = RLock()
 
 
 class InstancesChangeNotifier:
-    pass
\ No newline at end of file
+    """
+    将服务实例的变化（新增、删除、修改）通知给订阅者。
+    每个订阅者在合并窗口内收到的多次变化合并为一次回调；每个订阅者最多积压max_queue_size个服务的变化，
+    超出时丢弃最早的服务的变化，并在下一次回调时改为发送该服务的完整状态；
+    回调在独立的线程池中执行，同一订阅者的回调串行执行
+    """
+
+    def __init__(self, client_config: ClientConfig, service_info_getter: Callable[[str], object] = None):
+        self.logger = logging.getLogger(Constants.NAMING_MODULE)
+        # service_key -> 服务当前的完整状态，用于积压溢出后的全量回调
+        self.service_info_getter = service_info_getter
+        self.coalesce_window = client_config.naming_push_coalesce_window
+        self.max_queue_size = client_config.naming_subscriber_queue_size
+        self.lock = RLock()
+        self.listener_map: Dict[str, List[Subscriber]] = {}
+        # 同一个回调订阅多个服务时共用一个Subscriber，积压上限对它订阅的所有服务生效
+        self.subscribers: Dict[object, Subscriber] = {}
+        self.timer = HashedWheelTimer("nacos-naming-notify-timer",
+                                      tick_duration=min(0.1, max(0.01, self.coalesce_window)), worker_num=1)
+        self.executor = ThreadPoolExecutor(max_workers=client_config.naming_notify_thread_num,
+                                           thread_name_prefix="nacos-naming-notify")
+
+    def register_listener(self, service_key: str, param: SubscribeParam):
+        with self.lock:
+            subscriber = self.subscribers.get(param.subscribe_callback)
+            if subscriber is None:
+                subscriber = self.subscribers[param.subscribe_callback] = Subscriber(param)
+            if service_key in subscriber.service_keys:
+                return
+            subscriber.service_keys.add(service_key)
+            # 整体替换列表，通知时遍历无需加锁
+            self.listener_map[service_key] = self.listener_map.get(service_key, []) + [subscriber]
+
+    def deregister_listener(self, service_key: str, param: SubscribeParam):
+        with self.lock:
+            subscriber = self.subscribers.get(param.subscribe_callback)
+            if subscriber is None or service_key not in subscriber.service_keys:
+                return
+            subscriber.service_keys.discard(service_key)
+            if not subscriber.service_keys:
+                del self.subscribers[param.subscribe_callback]
+            subscribers = [s for s in self.listener_map.get(service_key, []) if s is not subscriber]
+            if subscribers:
+                self.listener_map[service_key] = subscribers
+            else:
+                self.listener_map.pop(service_key, None)
+
+    def is_subscribed(self, service_key: str) -> bool:
+        return len(self.listener_map.get(service_key, ())) > 0
+
+    def on_service_changed(self, service_key: str, diff: InstancesDiff):
+        if diff is None or not diff.has_different():
+            return
+        for subscriber in self.listener_map.get(service_key, ()):
+            with subscriber.lock:
+                # 已标记全量回调的服务不再记录变化，下一次回调的完整状态已包含这次变化
+                if service_key not in subscriber.resync_keys:
+                    pending = subscriber.pending.get(service_key)
+                    if pending is None:
+                        if len(subscriber.pending) >= self.max_queue_size:
+                            dropped_key, _ = subscriber.pending.popitem(last=False)
+                            subscriber.resync_keys.add(dropped_key)
+                            self.logger.warning(
+                                f"[notifier] subscriber queue is full, resync {dropped_key} with full state")
+                        pending = subscriber.pending[service_key] = PendingDelta()
+                    pending.merge(diff)
+                if subscriber.scheduled:
+                    continue
+                subscriber.scheduled = True
+            if self.coalesce_window > 0:
+                self.timer.schedule(self.coalesce_window, self._dispatch, subscriber)
+            else:
+                self._dispatch(subscriber)
+
+    def _dispatch(self, subscriber: Subscriber):
+        try:
+            self.executor.submit(self._notify, subscriber)
+        except RuntimeError:
+            # 线程池已关闭
+            pass
+
+    def _notify(self, subscriber: Subscriber):
+        with subscriber.callback_lock:
+            with subscriber.lock:
+                pending = subscriber.pending
+                resync_keys = subscriber.resync_keys
+                subscriber.pending = OrderedDict()
+                subscriber.resync_keys = set()
+                subscriber.scheduled = False
+            for service_key in resync_keys:
+                self._callback(subscriber, InstancesChangeEvent(service_key, None, True,
+                                                                self._get_service_info(service_key)))
+            for service_key, delta in pending.items():
+                diff = delta.to_diff()
+                if diff.has_different():
+                    self._callback(subscriber, InstancesChangeEvent(service_key, diff))
+
+    def _get_service_info(self, service_key):
+        if self.service_info_getter is None:
+            return None
+        try:
+            return self.service_info_getter(service_key)
+        except Exception as e:
+            self.logger.error(f"[notifier] get service info of {service_key} failed, err:{e}")
+            return None
+
+    def _callback(self, subscriber: Subscriber, event: InstancesChangeEvent):
+        try:
+            subscriber.param.subscribe_callback(event, None)
+        except Exception as e:
+            self.logger.error(f"[notifier] subscribe callback of {event.service_key} failed, err:{e}")
+
+    def shutdown(self):
+        self.timer.stop()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,84 @@
+import threading
+from types import SimpleNamespace
+
+from v2.nacos.naming.cache.instances_differ import InstancesDiff
+from v2.nacos.naming.event.instance_change_notifier import (
+    InstancesChangeNotifier,
+    PendingDelta,
+)
+from v2.nacos.naming.model.naming_request import SubscribeParam
+
+
+def _host(ip, weight=1.0):
+    return {"ip": ip, "port": 8080, "clusterName": "DEFAULT", "weight": weight}
+
+
+def _config(coalesce_window=0.0, queue_size=16):
+    return SimpleNamespace(naming_push_coalesce_window=coalesce_window, naming_subscriber_queue_size=queue_size,
+                           naming_notify_thread_num=1)
+
+
+class _Recorder:
+    def __init__(self, expected):
+        self.events = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    def __call__(self, event, err):
+        self.events.append(event)
+        if len(self.events) >= self.expected:
+            self.done.set()
+
+
+def test_pending_delta_merges_changes_of_one_instance():
+    delta = PendingDelta()
+    delta.merge(InstancesDiff(added_instances=[_host("10.0.0.1")]))
+    delta.merge(InstancesDiff(modified_instances=[_host("10.0.0.1", 2.0)]))
+    delta.merge(InstancesDiff(added_instances=[_host("10.0.0.2")]))
+    delta.merge(InstancesDiff(removed_instances=[_host("10.0.0.2")]))
+
+    diff = delta.to_diff()
+    assert diff.added_instances == [_host("10.0.0.1", 2.0)]
+    assert not diff.is_removed()
+    assert not diff.is_modified()
+
+
+def test_callback_receives_service_key_and_diff():
+    notifier = InstancesChangeNotifier(_config())
+    recorder = _Recorder(1)
+    try:
+        notifier.register_listener("DEFAULT_GROUP@@svc", SubscribeParam("svc", recorder))
+        notifier.on_service_changed("DEFAULT_GROUP@@svc", InstancesDiff(added_instances=[_host("10.0.0.1")]))
+        assert recorder.done.wait(5)
+    finally:
+        notifier.shutdown()
+
+    event = recorder.events[0]
+    assert event.service_key == "DEFAULT_GROUP@@svc"
+    assert not event.full_resync
+    assert event.diff.added_instances == [_host("10.0.0.1")]
+
+
+def test_queue_overflow_resyncs_dropped_service_with_full_state():
+    full_state = {"DEFAULT_GROUP@@a": "service-a"}
+    notifier = InstancesChangeNotifier(_config(coalesce_window=0.05, queue_size=1), full_state.get)
+    recorder = _Recorder(2)
+    try:
+        param = SubscribeParam("a", recorder)
+        notifier.register_listener("DEFAULT_GROUP@@a", param)
+        notifier.register_listener("DEFAULT_GROUP@@b", param)
+        notifier.on_service_changed("DEFAULT_GROUP@@a", InstancesDiff(added_instances=[_host("10.0.0.1")]))
+        notifier.on_service_changed("DEFAULT_GROUP@@b", InstancesDiff(added_instances=[_host("10.0.0.2")]))
+        # a已标记为全量回调，之后的变化不再占用队列
+        notifier.on_service_changed("DEFAULT_GROUP@@a", InstancesDiff(removed_instances=[_host("10.0.0.1")]))
+        assert recorder.done.wait(5)
+    finally:
+        notifier.shutdown()
+
+    events = {event.service_key: event for event in recorder.events}
+    assert len(recorder.events) == 2
+    assert events["DEFAULT_GROUP@@a"].full_resync
+    assert events["DEFAULT_GROUP@@a"].diff is None
+    assert events["DEFAULT_GROUP@@a"].service_info == "service-a"
+    assert not events["DEFAULT_GROUP@@b"].full_resync
+    assert events["DEFAULT_GROUP@@b"].diff.added_instances == [_host("10.0.0.2")]
@@ -0,0 +1,124 @@
+import random
+import sys
+from array import array
+from typing import Dict, FrozenSet, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.util.alias_table import AliasTable
+
+
+def _get_host_field(host, attr, key, default):
+    if isinstance(host, dict):
+        return host.get(key, default)
+    return getattr(host, attr, default)
+
+
+class HostTable:
+    """
+    按列保存服务的实例：ip、port、weight、healthy、enabled各为一个数组，集群名保存为驻留后的编号。
+    健康过滤、权重求和、集群过滤在数组上完成（安装了numpy时向量化执行），
+    加权随机选择基于别名表，是O(1)的；Instance对象只在被访问时才构造。
+    构建后不跟踪hosts的变化，由调用方通过version判断是否需要重建
+    """
+
+    def __init__(self, hosts: list, version: int = 0):
+        self.source = hosts
+        self.version = version
+        self.size = len(hosts)
+        self.hosts = list(hosts)
+        self.instances: List[Optional[Instance]] = [host if isinstance(host, Instance) else None for host in hosts]
+        self.ips = [sys.intern(ip) if isinstance(ip, str) else ip
+                    for ip in (_get_host_field(host, "ip", "ip", None) for host in hosts)]
+        self.cluster_names: List[str] = []
+        cluster_ids: Dict[str, int] = {}
+        ports = array("i")
+        weights = array("d")
+        healthy = array("b")
+        enabled = array("b")
+        clusters = array("I")
+        for host in hosts:
+            ports.append(int(_get_host_field(host, "port", "port", 0) or 0))
+            weights.append(float(_get_host_field(host, "weight", "weight", 1.0) or 0.0))
+            healthy.append(1 if _get_host_field(host, "healthy", "healthy", True) else 0)
+            enabled.append(1 if _get_host_field(host, "enable", "enabled", True) else 0)
+            cluster_name = _get_host_field(host, "cluster_name", "clusterName", "") or ""
+            cluster_id = cluster_ids.get(cluster_name)
+            if cluster_id is None:
+                cluster_id = cluster_ids[cluster_name] = len(self.cluster_names)
+                self.cluster_names.append(sys.intern(cluster_name))
+            clusters.append(cluster_id)
+        self.cluster_ids = cluster_ids
+        if np is not None:
+            self.ports = np.frombuffer(ports, dtype=np.int32) if ports else np.zeros(0, dtype=np.int32)
+            self.weights = np.frombuffer(weights, dtype=np.float64) if weights else np.zeros(0)
+            self.healthy = np.frombuffer(healthy, dtype=np.int8).astype(bool) if healthy else np.zeros(0, bool)
+            self.enabled = np.frombuffer(enabled, dtype=np.int8).astype(bool) if enabled else np.zeros(0, bool)
+            self.clusters = np.frombuffer(clusters, dtype=np.uint32) if clusters else np.zeros(0, np.uint32)
+        else:
+            self.ports = ports
+            self.weights = weights
+            self.healthy = healthy
+            self.enabled = enabled
+            self.clusters = clusters
+        # (healthy_only, clusters) -> (候选下标, 别名表)，实例变化时整个HostTable重建，这里无需失效
+        self.alias_cache: Dict[tuple, tuple] = {}
+
+    def __len__(self):
+        return self.size
+
+    def is_stale(self, hosts: list, version: int = 0) -> bool:
+        return hosts is not self.source or len(hosts) != self.size or version != self.version
+
+    def _cluster_filter(self, clusters) -> Optional[FrozenSet[int]]:
+        if not clusters:
+            return None
+        return frozenset(self.cluster_ids[name] for name in clusters if name in self.cluster_ids)
+
+    def select_indices(self, healthy_only=True, clusters=None) -> List[int]:
+        """返回满足条件（已启用、权重大于0，可选健康、所属集群）的实例下标"""
+        cluster_filter = self._cluster_filter(clusters)
+        if np is not None:
+            mask = self.enabled & (self.weights > 0)
+            if healthy_only:
+                mask &= self.healthy
+            if cluster_filter is not None:
+                mask &= np.isin(self.clusters, list(cluster_filter))
+            return np.flatnonzero(mask).tolist()
+
+        enabled, weights, healthy, cluster_ids = self.enabled, self.weights, self.healthy, self.clusters
+        return [i for i in range(self.size)
+                if enabled[i] and weights[i] > 0 and (not healthy_only or healthy[i])
+                and (cluster_filter is None or cluster_ids[i] in cluster_filter)]
+
+    def total_weight(self, healthy_only=True, clusters=None) -> float:
+        indices = self.select_indices(healthy_only, clusters)
+        if np is not None:
+            return float(self.weights[indices].sum()) if indices else 0.0
+        weights = self.weights
+        return float(sum(weights[i] for i in indices))
+
+    def pick_index(self, healthy_only=True, clusters=None, rng=random) -> int:
+        """按权重随机选择一个实例下标，使用预先构建的别名表，每次选择O(1)；没有可选实例时返回-1"""
+        cache_key = (healthy_only, frozenset(clusters) if clusters else None)
+        alias = self.alias_cache.get(cache_key)
+        if alias is None:
+            indices = self.select_indices(healthy_only, clusters)
+            weights = self.weights
+            alias = self.alias_cache[cache_key] = (indices, AliasTable([float(weights[i]) for i in indices]))
+        indices, alias_table = alias
+        position = alias_table.pick(rng)
+        return indices[position] if position >= 0 else -1
+
+    def get_instance(self, index: int) -> Instance:
+        instance = self.instances[index]
+        if instance is None:
+            instance = self.instances[index] = Instance.from_server_dict(self.hosts[index])
+        return instance
+
+    def get_instances(self, indices) -> List[Instance]:
+        return [self.get_instance(i) for i in indices]
@@ -0,0 +1,52 @@
+import random
+
+from v2.nacos.naming.model.host_table import HostTable
+
+
+def _host(ip, weight=1.0, healthy=True, enabled=True, cluster="DEFAULT"):
+    return {"ip": ip, "port": 8080, "weight": weight, "healthy": healthy, "enabled": enabled,
+            "clusterName": cluster}
+
+
+HOSTS = [
+    _host("10.0.0.1"),
+    _host("10.0.0.2", healthy=False),
+    _host("10.0.0.3", enabled=False),
+    _host("10.0.0.4", weight=0),
+    _host("10.0.0.5", weight=3.0, cluster="BACKUP"),
+]
+
+
+def test_select_indices_filters_columns():
+    table = HostTable(HOSTS)
+    assert table.select_indices() == [0, 4]
+    assert table.select_indices(healthy_only=False) == [0, 1, 4]
+    assert table.select_indices(clusters=["BACKUP"]) == [4]
+    assert table.select_indices(clusters=["UNKNOWN"]) == []
+    assert table.total_weight() == 4.0
+
+
+def test_pick_index_only_returns_candidates():
+    table = HostTable(HOSTS)
+    rng = random.Random(3)
+    assert {table.pick_index(rng=rng) for _ in range(200)} == {0, 4}
+    assert table.pick_index(clusters=["DEFAULT"], rng=rng) == 0
+    assert table.pick_index(clusters=["UNKNOWN"], rng=rng) == -1
+
+
+def test_instances_are_built_lazily():
+    table = HostTable(HOSTS)
+    assert table.instances == [None] * len(HOSTS)
+    instance = table.get_instance(4)
+    assert instance.ip == "10.0.0.5"
+    assert instance.cluster_name == "BACKUP"
+    assert table.get_instance(4) is instance
+
+
+def test_is_stale():
+    table = HostTable(HOSTS)
+    assert not table.is_stale(HOSTS)
+    assert table.is_stale(list(HOSTS))
+    # 同一个列表被原地修改后，调用方通过版本号使其失效
+    assert table.is_stale(HOSTS, version=1)
+    assert not HostTable(HOSTS, version=1).is_stale(HOSTS, version=1)
@@ -1,15 +1,47 @@
 import re
+import sys
 
 from v2.nacos.common.constants import Constants
 from v2.nacos.common.nacos_exception import NacosException, INVALID_PARAM
 from v2.nacos.common.preserved_metadata_key import PreservedMetadataKeys
 
 
+# 内容相同的metadata在所有实例间共享同一个dict，超过上限后清空重新积累
+METADATA_POOL_MAX_SIZE = 10000
+
+_metadata_pool = {}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _share_metadata(metadata):
+    if not metadata:
+        return {}
+    try:
+        pool_key = tuple(sorted(metadata.items()))
+    except TypeError:
+        # value不可比较或不可哈希时不共享
+        return metadata
+    shared = _metadata_pool.get(pool_key)
+    if shared is None:
+        if len(_metadata_pool) >= METADATA_POOL_MAX_SIZE:
+            _metadata_pool.clear()
+        shared = _metadata_pool.setdefault(pool_key, metadata)
+    return shared
+
+
 class Instance:
+    # 大服务的订阅方会持有几十万个实例，使用__slots__去掉每个实例的__dict__
+    __slots__ = ("instance_id", "ip", "port", "weight", "healthy", "enable", "ephemeral", "cluster_name",
+                 "service_name", "metadata")
+
     def __init__(self, service_name=None, ip=None, port=None, cluster_name=None, weight=1.0, healthy=True, enable=True,
-                 ephemeral=True, metadata=None):
+                 ephemeral=True, metadata=None, instance_id=None):
         if metadata is None:
             metadata = {}
+        self.instance_id = instance_id
         self.ip = ip
         self.port = port
         self.weight = weight
@@ -20,8 +52,39 @@ class Instance:
         self.service_name = service_name
         self.metadata = metadata
 
+    @classmethod
+    def from_server_dict(cls, host: dict) -> "Instance":
+        """根据服务端返回的实例数据直接构造，不做校验；ip、集群名、服务名被驻留，相同的metadata共享同一个dict"""
+        instance = cls.__new__(cls)
+        instance.instance_id = host.get("instanceId")
+        instance.ip = _intern(host.get("ip"))
+        instance.port = host.get("port")
+        instance.weight = host.get("weight", 1.0)
+        instance.healthy = host.get("healthy", True)
+        instance.enable = host.get("enabled", True)
+        instance.ephemeral = host.get("ephemeral", True)
+        instance.cluster_name = _intern(host.get("clusterName"))
+        instance.service_name = _intern(host.get("serviceName"))
+        instance.metadata = _share_metadata(host.get("metadata"))
+        return instance
+
+    def to_server_dict(self) -> dict:
+        """from_server_dict的逆操作，字段名与服务端返回的数据一致"""
+        return {
+            "instanceId": self.instance_id,
+            "ip": self.ip,
+            "port": self.port,
+            "weight": self.weight,
+            "healthy": self.healthy,
+            "enabled": self.enable,
+            "ephemeral": self.ephemeral,
+            "clusterName": self.cluster_name,
+            "serviceName": self.service_name,
+            "metadata": self.metadata,
+        }
+
     def __str__(self):
-        return f"Instance({', '.join(f'{key}={value!r}' for key, value in self.__dict__.items())})"
+        return f"Instance({', '.join(f'{key}={getattr(self, key)!r}' for key in self.__slots__)})"
 
     def to_inet_addr(self):
         return self.ip + ":" + self.port
@@ -32,9 +95,15 @@ class Instance:
     def get_weight(self):
         return self.weight
 
+    def is_healthy(self) -> bool:
+        return self.healthy
+
+    def is_enabled(self) -> bool:
+        return self.enable
+
     def add_metadata(self, key: str, value: str) -> None:
-        if self.metadata is None:
-            self.metadata = {}
+        # metadata可能与其他实例共享，修改前先复制
+        self.metadata = dict(self.metadata) if self.metadata else {}
         self.metadata[key] = value
 
     def get_instance_heart_beat_interval(self):
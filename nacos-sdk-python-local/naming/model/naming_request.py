@@ -54,7 +54,8 @@ class GetAllServiceInfoParam:
 
 
 class SubscribeParam:
-    def __init__(self, service_name: str, subscribe_callback: Callable[[List[object], Exception], None],
+    # subscribe_callback 收到的是InstancesChangeEvent：服务的key和合并后的实例变化，积压溢出时改为服务的完整状态
+    def __init__(self, service_name: str, subscribe_callback: Callable[[object, Exception], None],
                  clusters: List[str] = None, group_name: str = "DEFAULT_GROUP"):
         self.service_name = service_name
         self.clusters = clusters if clusters else []
@@ -2,12 +2,17 @@ import time
 import urllib.parse
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from v2.nacos.common.constants import Constants
 
-from v2.nacos.common.nacos_exception import NacosException
+from v2.nacos.common.nacos_exception import NacosException, NOT_FOUND
 from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.host_table import HostTable
+
+# 服务端返回的ServiceInfo字段，写入快照时只保存这些字段
+SERVER_FIELDS = ("name", "groupName", "clusters", "cacheMillis", "hosts", "lastRefTime", "checksum", "allIps",
+                 "reachProtectionThreshold")
 
 
 class ServiceInfo(BaseModel):
@@ -23,6 +28,10 @@ class ServiceInfo(BaseModel):
     reachProtectionThreshold: bool = False
     jsonFromServer: str = ""
 
+    _host_table: Optional[HostTable] = PrivateAttr(default=None)
+    # hosts每次被替换或修改后加一，HostTable按版本判断是否需要重建
+    _hosts_version: int = PrivateAttr(default=0)
+
     EMPTY = ""
 
     ALL_IPS = "000--00-ALL_IPS--00--000"
@@ -54,14 +63,34 @@ class ServiceInfo(BaseModel):
     def expired(self):
         return int(round(time.time() * 1000)) - self.lastRefTime > self.cacheMillis
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == "hosts":
+            self.mark_hosts_changed()
+
     def set_hosts(self, hosts):
         self.hosts = hosts
 
     def add_host(self, host):
         self.hosts.append(host)
+        self.mark_hosts_changed()
 
     def add_all_hosts(self, hosts):
         self.hosts.extend(hosts)
+        self.mark_hosts_changed()
+
+    def mark_hosts_changed(self):
+        """直接修改了hosts中的实例（例如健康状态、权重）后需要调用，使实例表和别名表重建"""
+        self._hosts_version += 1
+        self._host_table = None
+
+    def get_host_table(self) -> HostTable:
+        """按列保存的实例表，hosts变化后在下一次访问时重建"""
+        host_table = self._host_table
+        if host_table is None or host_table.is_stale(self.hosts, self._hosts_version):
+            host_table = HostTable(self.hosts, self._hosts_version)
+            self._host_table = host_table
+        return host_table
 
     def get_hosts(self):
         return self.hosts
@@ -105,6 +134,14 @@ class ServiceInfo(BaseModel):
     def set_json_from_server(self, json_from_server) -> None:
         self.jsonFromServer = json_from_server
 
+    def select_one_healthy_instance(self, clusters=None) -> Instance:
+        """按权重随机选择一个健康且可用的实例，别名表只在实例集合变化后重建"""
+        host_table = self.get_host_table()
+        index = host_table.pick_index(healthy_only=True, clusters=clusters)
+        if index < 0:
+            raise NacosException(NOT_FOUND, f"no healthy instance of service: {self.get_key_default()}")
+        return host_table.get_instance(index)
+
     def validate(self):
         if self.allIps:
             return True
@@ -112,15 +149,7 @@ class ServiceInfo(BaseModel):
         if not self.hosts:
             return False
 
-        valid_hosts = []
-        for host in self.hosts:
-            if not host.is_healthy():
-                continue
-
-            for i in range(host.get_weight()):
-                valid_hosts.append(i)
-
-        return len(valid_hosts) > 0
+        return self.get_host_table().total_weight(healthy_only=True) > 0
 
     @staticmethod
     def get_key(name, clusters):
@@ -183,6 +212,19 @@ class ServiceInfo(BaseModel):
         new_service_info.hosts = hosts_instance_list
         return new_service_info
 
+    @staticmethod
+    def from_server_dict(json_dict: dict):
+        """服务端返回的数据是可信的，跳过pydantic校验，实例使用紧凑的构造方式"""
+        fields = {key: value for key, value in json_dict.items() if key in ServiceInfo.__fields__}
+        fields["hosts"] = [Instance.from_server_dict(host) for host in json_dict.get("hosts") or []]
+        return ServiceInfo.construct(**fields)
+
+    def to_server_dict(self) -> dict:
+        """from_server_dict的逆操作，只包含服务端返回的字段，实例同样使用服务端的字段名"""
+        data = {field: getattr(self, field) for field in SERVER_FIELDS}
+        data["hosts"] = [host if isinstance(host, dict) else host.to_server_dict() for host in self.hosts]
+        return data
+
     def get_hosts_str(self):
         hosts_str = ""
         for host in self.hosts:
@@ -2,12 +2,27 @@ import os
 from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 import json
+import logging
 from collections import defaultdict
 
+from v2.nacos.common.constants import Constants
+from v2.nacos.common.file.snapshot_writer import SnapshotWriter
+from v2.nacos.naming.cache.instances_differ import InstancesDiffer
+from v2.nacos.naming.model.service_info import ServiceInfo
+from v2.nacos.naming.util.naming_client_util import get_group_name
+
+
+def _service_info_to_json(service_info: ServiceInfo) -> str:
+    # 与服务端推送的数据格式一致，加载时同样可以使用ServiceInfo.from_server_dict
+    return json.dumps(service_info.to_server_dict())
+
 
 class ServiceInfoHolder:
     def __init__(self, namespace, notifier_event_scope, properties):
+        self.logger = logging.getLogger(Constants.NAMING_MODULE)
         self.service_info_map = defaultdict(dict)
+        # 快照由后台线程合并后原子写入，处理推送的线程不会阻塞在磁盘IO上
+        self.snapshot_writer = SnapshotWriter(self.logger)
         self.cache_dir = self.init_cache_dir(namespace, properties)
         self.instances_differ = InstancesDiffer()
         self.failover_reactor = FailoverReactor(self, notifier_event_scope)
@@ -36,44 +51,61 @@ class ServiceInfoHolder:
         return self.service_info_map
 
     def get_service_info(self, service_name, group_name, clusters):
-        grouped_service_name = NamingUtils.get_grouped_name(service_name, group_name)
+        grouped_service_name = get_group_name(service_name, group_name)
         key = ServiceInfo.get_key(grouped_service_name, clusters)
         return self.service_info_map[key]
 
     def process_service_info(self, json_str):
-        service_info = json.loads(json_str, cls=ServiceInfo.json_decoder)
-        service_info.json_from_server = json_str
+        if isinstance(json_str, bytes):
+            json_str = json_str.decode("utf-8")
+        service_info = ServiceInfo.from_server_dict(json.loads(json_str))
+        service_info.set_json_from_server(json_str)
         return self._process_service_info(service_info)
 
-    def _process_service_info(self, service_info):
-        service_key = service_info.key
+    def _process_service_info(self, service_info: ServiceInfo):
+        service_key = service_info.get_key_default()
         if not service_key:
-            print("process service info but serviceKey is null")
+            self.logger.warning("process service info but serviceKey is null")
             return None
 
         old_service = self.service_info_map.get(service_key)
+        # 1. 丢弃重复或过期的推送
+        if old_service and self.is_duplicate_push(old_service, service_info):
+            return old_service
+
+        # 2. 推空保护
         if self.is_empty_or_error_push(service_info):
-            print("process service info but found empty or error push")
+            self.logger.warning(f"process service info but found empty or error push, service: {service_key}")
             return old_service
 
+        # 3. 更新内存
         self.service_info_map[service_key] = service_info
         diff = self.get_service_info_diff(old_service, service_info)
-        if not service_info.json_from_server:
-            service_info.json_from_server = json.dumps(service_info)
 
         if diff.has_different():
-            print("current ips: {}, service: {} -> {}".format(service_info.ip_count(), service_key, service_info.hosts))
+            self.logger.info(f"current ips: {service_info.ip_count()}, service: {service_key}, {diff}")
 
             if not self.failover_reactor.is_failover_switch(service_key):
                 # 这里需要实现NotifyCenter.publishEvent的Python对应逻辑
                 pass
 
-            # 写入磁盘缓存
-            with open(os.path.join(self.cache_dir, service_key), 'w') as f:
-                json.dump(service_info.__dict__, f)
+            # 4. 异步写入磁盘缓存，优先直接使用服务端返回的原始数据
+            self.snapshot_writer.write(os.path.join(self.cache_dir, service_key),
+                                       service_info.get_json_from_server()
+                                       or (lambda: _service_info_to_json(service_info)))
 
         return service_info
 
+    def is_duplicate_push(self, old_service: ServiceInfo, new_service: ServiceInfo):
+        old_checksum = old_service.get_checksum()
+        if old_checksum and old_checksum == new_service.get_checksum():
+            return True
+        if old_service.get_last_ref_time() > new_service.get_last_ref_time():
+            self.logger.warning(f"out of date data received, old-t: {old_service.get_last_ref_time()}, "
+                                f"new-t: {new_service.get_last_ref_time()}")
+            return True
+        return False
+
     def is_empty_or_error_push(self, service_info):
         return service_info.hosts is None or (self.push_empty_protection and not service_info.validate())
 
@@ -87,11 +119,12 @@ class ServiceInfoHolder:
         return self.failover_reactor.is_failover_switch()
 
     def get_failover_service_info(self, service_name, group_name, clusters):
-        grouped_service_name = NamingUtils.get_grouped_name(service_name, group_name)
+        grouped_service_name = get_group_name(service_name, group_name)
         key = ServiceInfo.get_key(grouped_service_name, clusters)
         return self.failover_reactor.get_service(key)
 
     def shutdown(self):
-        print("ServiceInfoHolder do shutdown begin")
+        self.logger.info("ServiceInfoHolder do shutdown begin")
         self.failover_reactor.shutdown()
-        print("ServiceInfoHolder do shutdown stop")
+        self.snapshot_writer.shutdown()
+        self.logger.info("ServiceInfoHolder do shutdown stop")
@@ -0,0 +1,52 @@
+import json
+import os
+
+from v2.nacos.common.file.snapshot_writer import SnapshotWriter
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.service_info import ServiceInfo
+from v2.nacos.naming.model.service_info_holder import _service_info_to_json
+
+SERVER_DATA = {
+    "name": "svc",
+    "groupName": "DEFAULT_GROUP",
+    "clusters": "",
+    "cacheMillis": 10000,
+    "lastRefTime": 1700000000000,
+    "checksum": "abc",
+    "allIps": False,
+    "reachProtectionThreshold": False,
+    "hosts": [{
+        "instanceId": "10.0.0.1#8080#DEFAULT#DEFAULT_GROUP@@svc",
+        "ip": "10.0.0.1",
+        "port": 8080,
+        "weight": 2.0,
+        "healthy": True,
+        "enabled": False,
+        "ephemeral": True,
+        "clusterName": "DEFAULT",
+        "serviceName": "DEFAULT_GROUP@@svc",
+        "metadata": {"k": "v"},
+    }],
+}
+
+
+def test_snapshot_round_trip_keeps_server_field_names(tmp_path):
+    service_info = ServiceInfo.from_server_dict(SERVER_DATA)
+    path = os.path.join(str(tmp_path), "DEFAULT_GROUP@@svc")
+    writer = SnapshotWriter()
+    writer.write(path, lambda: _service_info_to_json(service_info))
+    writer.shutdown(5)
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data == SERVER_DATA
+
+    loaded = ServiceInfo.from_server_dict(data)
+    host = loaded.hosts[0]
+    assert isinstance(host, Instance)
+    assert host.instance_id == "10.0.0.1#8080#DEFAULT#DEFAULT_GROUP@@svc"
+    assert host.cluster_name == "DEFAULT"
+    assert host.enable is False
+    assert host.weight == 2.0
+    assert loaded.get_key_default() == "DEFAULT_GROUP@@svc"
+    assert loaded.checksum == "abc"
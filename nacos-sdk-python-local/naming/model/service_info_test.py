@@ -0,0 +1,55 @@
+import pytest
+from v2.nacos.common.nacos_exception import NOT_FOUND, NacosException
+from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.service_info import ServiceInfo
+
+
+def _host(ip, healthy=True, cluster="DEFAULT"):
+    return {"ip": ip, "port": 8080, "weight": 1.0, "healthy": healthy, "enabled": True, "clusterName": cluster}
+
+
+def _service(*hosts):
+    return ServiceInfo.from_server_dict({"name": "demo-service", "groupName": "DEFAULT_GROUP", "clusters": "",
+                                         "hosts": list(hosts)})
+
+
+def test_select_one_healthy_instance_skips_unhealthy_hosts():
+    service = _service(_host("10.0.0.1"), _host("10.0.0.2"), _host("10.0.0.3", healthy=False))
+    picked = {service.select_one_healthy_instance().ip for _ in range(200)}
+    assert picked == {"10.0.0.1", "10.0.0.2"}
+
+
+def test_select_one_healthy_instance_by_cluster():
+    service = _service(_host("10.0.0.1"), _host("10.0.0.2", cluster="BACKUP"))
+    assert service.select_one_healthy_instance(["BACKUP"]).ip == "10.0.0.2"
+
+
+def test_select_one_healthy_instance_without_candidates():
+    service = _service(_host("10.0.0.1", healthy=False))
+    with pytest.raises(NacosException) as e:
+        service.select_one_healthy_instance()
+    assert e.value.error_code == NOT_FOUND
+
+
+def test_select_one_healthy_instance_follows_new_hosts():
+    service = _service(_host("10.0.0.1"))
+    assert service.select_one_healthy_instance().ip == "10.0.0.1"
+    service.set_hosts([Instance(ip="10.0.0.3", port=8080, cluster_name="DEFAULT")])
+    assert service.select_one_healthy_instance().ip == "10.0.0.3"
+
+
+def test_in_place_health_change_rebuilds_host_table():
+    service = _service(_host("10.0.0.1"), _host("10.0.0.2"))
+    assert {service.select_one_healthy_instance().ip for _ in range(200)} == {"10.0.0.1", "10.0.0.2"}
+
+    service.hosts[0].healthy = False
+    service.mark_hosts_changed()
+    assert {service.select_one_healthy_instance().ip for _ in range(200)} == {"10.0.0.2"}
+
+
+def test_assigning_hosts_rebuilds_host_table():
+    service = _service(_host("10.0.0.1"))
+    host_table = service.get_host_table()
+    service.hosts = [Instance(ip="10.0.0.2", port=8080, cluster_name="DEFAULT")]
+    assert service.get_host_table() is not host_table
+    assert service.select_one_healthy_instance().ip == "10.0.0.2"
@@ -1,11 +1,16 @@
 import json
 import logging
+import random
 import threading
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from v2.nacos.common.constants import Constants
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
+from v2.nacos.util.hashed_wheel_timer import HashedWheelTimer, TimerTask
+
+# 退避指数的上限，2**16倍的心跳间隔早已超过heart_beat_max_backoff，再大只会在计算时溢出
+MAX_BACKOFF_EXPONENT = 16
 
 
 class HeartbeatInfo:
@@ -27,7 +32,10 @@ class HeartbeatInfo:
         self.weight = weight
         self.metadata = metadata
         self.heartbeat_interval = heartbeat_interval
-        self.task: threading.Timer = None  # 保存心跳任务的引用
+        self.task: TimerTask = None  # 保存心跳任务的引用
+        self.fail_count = 0  # 连续发送失败的次数，用于退避
+        self.last_beat_success = None  # 最近一次心跳是否成功
+        self.light_beat_enabled = False  # 服务端已持有实例元数据时，只需发送不带beat内容的轻量心跳
 
 
 class HeartbeatReactor:
@@ -37,68 +45,181 @@ class HeartbeatReactor:
         self.nacos_server_connector = nacos_server_connector
         self.client_config = client_config
         self.lock = threading.Lock()
+        # 所有实例的心跳共用一个时间轮和固定大小的线程池
+        self.timer = HashedWheelTimer("nacos-beat", worker_num=client_config.heart_beat_thread_num)
+        # 批量模式下，同一个窗口内到期的心跳按 (namespace, group) 聚合后一起发送
+        self.pending_beats: Dict[Tuple[str, str], List[HeartbeatInfo]] = {}
+        self.pending_beats_lock = threading.Lock()
 
     def _send_heartbeat(self, beat_info: HeartbeatInfo):
+        success = self._do_send_heartbeat(beat_info)
+        self._on_heartbeat_result(beat_info, success)
+
+    def _enqueue_heartbeat(self, beat_info: HeartbeatInfo):
+        batch_key = (self.client_config.namespace_id, beat_info.group_name)
+        with self.pending_beats_lock:
+            batch = self.pending_beats.get(batch_key)
+            if batch is None:
+                self.pending_beats[batch_key] = [beat_info]
+                self.timer.schedule(self.client_config.heart_beat_batch_window, self._send_heartbeat_batch,
+                                    batch_key)
+            else:
+                batch.append(beat_info)
+
+    def _send_heartbeat_batch(self, batch_key: Tuple[str, str]):
+        with self.pending_beats_lock:
+            batch = self.pending_beats.pop(batch_key, [])
+
+        self.logger.debug("[auto-beat-task] send %s beats in batch, namespace:%s, group_name:%s",
+                          len(batch), batch_key[0], batch_key[1])
+        # 在同一个线程里连续发送，复用连接池中同一条keep-alive连接
+        for beat_info in batch:
+            if not self._is_beat_info_alive(beat_info):
+                continue
+            success = self._do_send_heartbeat(beat_info)
+            self._on_heartbeat_result(beat_info, success)
+
+    def _do_send_heartbeat(self, beat_info: HeartbeatInfo) -> bool:
         self.logger.info("[auto-beat-task] beat task start, ip:%s, port:%s, service_name:%s, group_name:%s",
                          beat_info.ip, beat_info.port, beat_info.service_name, beat_info.group_name)
         try:
-            beat_data = {
+            params = {
                 "serviceName": beat_info.service_name,
+                "groupName": beat_info.group_name,
                 "ip": beat_info.ip,
                 "port": beat_info.port,
-                "weight": beat_info.weight,
-                "ephemeral": True
-
             }
 
             if beat_info.cluster_name is not None:
-                beat_data["cluster"] = beat_info.cluster_name
-
-            if beat_info.metadata is not None:
-                if isinstance(beat_info.metadata, str):
-                    beat_data["metadata"] = json.loads(beat_info.metadata)
-                else:
-                    beat_data["metadata"] = beat_info.metadata
-
-            params = {
-                "serviceName": beat_info.service_name,
-                "beat": json.dumps(beat_data),
-                "groupName": beat_info.group_name
-            }
+                params["clusterName"] = beat_info.cluster_name
 
             if self.client_config.namespace_id:
                 params["namespaceId"] = self.client_config.namespace_id
 
+            if not beat_info.light_beat_enabled:
+                params["beat"] = json.dumps(self._build_beat_data(beat_info))
+
             url = Constants.SERVICE_BASE_PATH + "/instance/beat"
 
-            self.nacos_server_connector.req_api(url, None, beat_data, None, "PUT")
+            response = self.nacos_server_connector.req_api(url, None, params, None, "PUT")
+            self._process_beat_response(beat_info, response)
 
             self.logger.info("[auto-beat-task] ip:%s, port:%s, service_name:%s, namespace:%s",
                              beat_info.ip, beat_info.port, beat_info.service_name, self.client_config.namespace_id)
-
+            return True
         except Exception as e:
             self.logger.error(
                 "[auto-beat-task] failed to send heartbeat for ip:%s, port:%s, service_name:%s, namespace:%s, exception: %s",
                 beat_info.ip, beat_info.port, beat_info.service_name, self.client_config.namespace_id, str(e))
-        self._schedule_heartbeat(beat_info)
+            return False
+
+    @staticmethod
+    def _build_beat_data(beat_info: HeartbeatInfo):
+        beat_data = {
+            "serviceName": beat_info.service_name,
+            "ip": beat_info.ip,
+            "port": beat_info.port,
+            "weight": beat_info.weight,
+            "ephemeral": True
+
+        }
+
+        if beat_info.cluster_name is not None:
+            beat_data["cluster"] = beat_info.cluster_name
+
+        if beat_info.metadata is not None:
+            if isinstance(beat_info.metadata, str):
+                beat_data["metadata"] = json.loads(beat_info.metadata)
+            else:
+                beat_data["metadata"] = beat_info.metadata
+        return beat_data
+
+    def _process_beat_response(self, beat_info: HeartbeatInfo, response):
+        if not response:
+            return
+        result = json.loads(response.decode("UTF-8") if isinstance(response, bytes) else response)
+
+        # 采用服务端建议的心跳间隔（毫秒）
+        client_beat_interval = result.get(Constants.CLIENT_BEAT_INTERVAL_FIELD, 0)
+        if client_beat_interval and client_beat_interval > 0:
+            beat_info.heartbeat_interval = client_beat_interval / 1000
+
+        beat_info.light_beat_enabled = bool(result.get(Constants.LIGHT_BEAT_ENABLED, False))
+
+        if result.get("code") == Constants.NAMING_RESOURCE_NOT_FOUND_CODE:
+            # 服务端已丢失该实例（例如服务端重启或实例已过期），需要重新注册
+            self.logger.warning("[auto-beat-task] instance not found on server, re-register, ip:%s, port:%s, "
+                                "service_name:%s", beat_info.ip, beat_info.port, beat_info.service_name)
+            beat_info.light_beat_enabled = False
+            self._re_register_instance(beat_info)
+
+    def _re_register_instance(self, beat_info: HeartbeatInfo):
+        params = {
+            "ip": beat_info.ip,
+            "port": beat_info.port,
+            "serviceName": beat_info.service_name,
+            "weight": beat_info.weight,
+            "enable": True,
+            "healthy": True,
+            "ephemeral": True,
+            "groupName": beat_info.group_name,
+            "app": self.client_config.app_name,
+        }
+
+        if beat_info.cluster_name is not None:
+            params["clusterName"] = beat_info.cluster_name
+
+        if self.client_config.namespace_id:
+            params["namespaceId"] = self.client_config.namespace_id
+
+        if beat_info.metadata is not None:
+            params["metadata"] = beat_info.metadata if isinstance(beat_info.metadata, str) else json.dumps(
+                beat_info.metadata)
+
+        self.nacos_server_connector.req_api(Constants.SERVICE_BASE_PATH + "/instance", None, params, None, "POST")
+
+    def _on_heartbeat_result(self, beat_info: HeartbeatInfo, success: bool):
+        beat_info.last_beat_success = success
+        beat_info.fail_count = 0 if success else beat_info.fail_count + 1
+        with self.lock:
+            # 发送期间实例可能已被移除或替换，此时不再续约
+            if self._is_beat_info_alive(beat_info):
+                self._schedule_heartbeat(beat_info)
+
+    def _is_beat_info_alive(self, beat_info: HeartbeatInfo) -> bool:
+        return self.beat_info_map.get(
+            self._get_beat_info_key(beat_info.service_name, beat_info.ip, beat_info.port)) is beat_info
 
     def _schedule_heartbeat(self, beat_info: HeartbeatInfo):
-        timer = threading.Timer(beat_info.heartbeat_interval, self._send_heartbeat, args=[beat_info])
-        beat_info.task = timer
-        timer.start()
+        delay = beat_info.heartbeat_interval
+        if beat_info.fail_count > 0:
+            # 连续失败时按指数退避，最长不超过 heart_beat_max_backoff
+            delay = min(delay * (2 ** min(beat_info.fail_count, MAX_BACKOFF_EXPONENT)),
+                        max(delay, self.client_config.heart_beat_max_backoff))
+        # 加入随机抖动，避免大量实例的心跳在同一时刻发出
+        jitter = self.client_config.heart_beat_jitter_ratio
+        delay = delay * (1 + random.uniform(-jitter, jitter))
+        if self.client_config.heart_beat_batch_enabled:
+            beat_info.task = self.timer.schedule(delay, self._enqueue_heartbeat, beat_info)
+        else:
+            beat_info.task = self.timer.schedule(delay, self._send_heartbeat, beat_info)
+
+    @staticmethod
+    def _get_beat_info_key(service_name, ip, port):
+        return "%s#%s#%s" % (service_name, ip, port)
 
     def add_beat_info(self, service_name, beat_info: HeartbeatInfo):
-        beat_info_key = "%s#%s#%s" % (service_name, beat_info.ip, beat_info.port)
+        beat_info_key = self._get_beat_info_key(service_name, beat_info.ip, beat_info.port)
         with self.lock:
             exist_beat_info = self.beat_info_map.get(beat_info_key)
             if exist_beat_info and exist_beat_info.task:
                 exist_beat_info.task.cancel()
 
             self.beat_info_map[beat_info_key] = beat_info
-            self.schedule_heartbeat(beat_info)
+            self._schedule_heartbeat(beat_info)
 
     def remove_beat_info(self, service_name, ip, port):
-        beat_info_key = f"{service_name}#{ip}#{port}"
+        beat_info_key = self._get_beat_info_key(service_name, ip, port)
         with self.lock:
             exist_beat_info = self.beat_info_map.pop(beat_info_key, None)
             if exist_beat_info and exist_beat_info.task:
@@ -110,3 +231,7 @@ class HeartbeatReactor:
                 if beat_info.task:
                     beat_info.task.cancel()  # 取消每一个心跳任务
             self.beat_info_map.clear()  # 清空心跳信息映射
+
+    def shutdown(self):
+        self.stop_all_beats()
+        self.timer.stop()
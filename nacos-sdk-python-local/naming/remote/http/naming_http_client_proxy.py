@@ -34,6 +34,33 @@ class NamingHttpClientProxy(NamingClientProxy):
         self.logger.info("[register_instance] ip:%s, port:%s, service_name:%s, namespace:%s" % (
             instance.ip, instance.port, service_name, self.namespace_id))
 
+        params = self._build_register_params(service_name, group_name, instance)
+        try:
+            body = self.nacos_server_connector.req_api("/nacos/v1/ns/instance", None, None, params, "POST")
+            return self._on_registered(service_name, group_name, instance, body)
+        except HTTPError as e:
+            raise self._to_nacos_exception(e)
+        except Exception as e:
+            self.logger.exception("[add-naming-instance] exception %s occur" % str(e))
+            raise
+
+    async def register_instance_async(self, service_name: str, group_name: str, instance: Instance) -> bool:
+        """register_instance的asyncio版本，通过AsyncHttpAgent发送请求，不占用线程"""
+        self.logger.info("[register_instance_async] ip:%s, port:%s, service_name:%s, namespace:%s" % (
+            instance.ip, instance.port, service_name, self.namespace_id))
+
+        params = self._build_register_params(service_name, group_name, instance)
+        try:
+            body = await self.nacos_server_connector.req_api_async("/nacos/v1/ns/instance", params=params,
+                                                                   method="POST")
+            return self._on_registered(service_name, group_name, instance, body)
+        except HTTPError as e:
+            raise self._to_nacos_exception(e)
+        except Exception as e:
+            self.logger.exception("[add-naming-instance] exception %s occur" % str(e))
+            raise
+
+    def _build_register_params(self, service_name: str, group_name: str, instance: Instance) -> dict:
         params = {
             "ip": instance.ip,
             "port": instance.port,
@@ -51,33 +78,31 @@ class NamingHttpClientProxy(NamingClientProxy):
             params["namespaceId"] = self.namespace_id
 
         params["metadata"] = json.dumps(instance.metadata)
-        try:
-            resp = self.nacos_server_connector.req_api("/nacos/v1/ns/instance", None, None, params, "POST")
-            c = resp.read()
-            self.logger.info(
-                "[add-naming-instance] ip:%s, port:%s, service_name:%s, namespace:%s, server response:%s" % (
-                    instance.ip, instance.port, service_name, self.namespace_id, c))
-            res = c == b"ok"
+        return params
 
-            if res and instance.ephemeral:
-                heartbeat_interval = Constants.DEFAULT_HEARTBEAT_INTERVAL if instance.metadata is None else instance.metadata.get(
-                    PreservedMetadataKeys.HEART_BEAT_INTERVAL, Constants.DEFAULT_HEARTBEAT_INTERVAL)
-                beat_info = HeartbeatInfo(service_name,
-                                          instance.ip,
-                                          instance.port,
-                                          instance.cluster_name,
-                                          group_name,
-                                          instance.weight,
-                                          heartbeat_interval,
-                                          instance.metadata
-                                          )
-                self.heartbeatReactor.add_beat_info(service_name, beat_info)
-            return res
-        except HTTPError as e:
-            if e.code == HTTPStatus.FORBIDDEN:
-                raise NacosException(NO_RIGHT, "Insufficient privilege.")
-            else:
-                raise NacosException(SERVER_ERROR, "Request Error, code is %s" % e.code)
-        except Exception as e:
-            self.logger.exception("[add-naming-instance] exception %s occur" % str(e))
-            raise
+    def _on_registered(self, service_name: str, group_name: str, instance: Instance, c) -> bool:
+        self.logger.info(
+            "[add-naming-instance] ip:%s, port:%s, service_name:%s, namespace:%s, server response:%s" % (
+                instance.ip, instance.port, service_name, self.namespace_id, c))
+        res = c == b"ok"
+
+        if res and instance.ephemeral:
+            heartbeat_interval = Constants.DEFAULT_HEARTBEAT_INTERVAL if instance.metadata is None else instance.metadata.get(
+                PreservedMetadataKeys.HEART_BEAT_INTERVAL, Constants.DEFAULT_HEARTBEAT_INTERVAL)
+            beat_info = HeartbeatInfo(service_name,
+                                      instance.ip,
+                                      instance.port,
+                                      instance.cluster_name,
+                                      group_name,
+                                      instance.weight,
+                                      heartbeat_interval,
+                                      instance.metadata
+                                      )
+            self.heartbeatReactor.add_beat_info(service_name, beat_info)
+        return res
+
+    @staticmethod
+    def _to_nacos_exception(e: HTTPError) -> NacosException:
+        if e.code == HTTPStatus.FORBIDDEN:
+            return NacosException(NO_RIGHT, "Insufficient privilege.")
+        return NacosException(SERVER_ERROR, "Request Error, code is %s" % e.code)
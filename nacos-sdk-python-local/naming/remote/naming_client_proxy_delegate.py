@@ -1,23 +1,27 @@
 import logging
 
-from v2.nacos.common.nacos_exception import NacosException, SERVER_ERROR
+from v2.nacos.common.nacos_exception import NacosException, NOT_FOUND, SERVER_ERROR
 from v2.nacos.common.client_config import ClientConfig
 from v2.nacos.naming.cache.service_info_cache import ServiceInfoCache
 from v2.nacos.naming.model.instance import Instance
+from v2.nacos.naming.model.naming_request import SelectOneHealthInstanceParam, SubscribeParam
 from v2.nacos.naming.remote.grpc.naming_grpc_client_proxy import NamingGrpcClientProxy
 from v2.nacos.naming.remote.http.naming_http_client_proxy import NamingHttpClientProxy
 from v2.nacos.naming.util.naming_client_util import *
 from v2.nacos.naming.remote.naming_client_proxy import NamingClientProxy
 from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.async_http_agent import AsyncHttpAgent
 from v2.nacos.transport.nacos_server_connector import NacosServerConnector
 
 
 class NamingClientProxyDelegate(NamingClientProxy):
-    def __init__(self, client_config: ClientConfig, http_agent: HttpAgent, service_info_cache: ServiceInfoCache):
+    def __init__(self, client_config: ClientConfig, http_agent: HttpAgent, service_info_cache: ServiceInfoCache,
+                 async_http_agent: AsyncHttpAgent = None):
         self.logger = logging.getLogger(Constants.NAMING_MODULE)
-        self.nacos_server_connector = NacosServerConnector(self.logger, client_config, http_agent)
+        self.nacos_server_connector = NacosServerConnector(self.logger, client_config, http_agent, async_http_agent)
         self.http_client_proxy = NamingHttpClientProxy(client_config, self.nacos_server_connector, service_info_cache)
         self.grpc_client_proxy = NamingGrpcClientProxy(client_config, self.nacos_server_connector, service_info_cache)
+        self.service_info_cache = service_info_cache
 
     def register_instance(self, service_name: str, group_name: str, instance: Instance) -> bool:
         return self.__get_execute_client_proxy(instance).register_instance(service_name, group_name, instance)
@@ -42,9 +46,9 @@ class NamingClientProxyDelegate(NamingClientProxy):
     def subscribe(self, service_name: str, group_name: str, clusters: str):
         is_subscribed = self.grpc_client_proxy.is_subscribed(service_name, group_name, clusters)
         service_name_with_group = get_service_cache_key(get_group_name(service_name, group_name), clusters)
-        service_info, exist = self.service_info_cache.service_info_map.get(service_name_with_group)
+        service_info = self.service_info_cache.get_service_info(service_name_with_group)
 
-        if not is_subscribed or not exist:
+        if not is_subscribed or service_info is None:
             service_info = self.grpc_client_proxy.subscribe(service_name, group_name, clusters)
             if service_info is None:
                 raise NacosException(SERVER_ERROR, 'failed to subscribe')
@@ -52,6 +56,32 @@ class NamingClientProxyDelegate(NamingClientProxy):
         self.service_info_cache.process_service(service_info)
         return service
 
+    def subscribe_instances(self, param: SubscribeParam):
+        clusters = ",".join(param.clusters)
+        service_key = get_service_cache_key(get_group_name(param.service_name, param.group_name), clusters)
+        self.service_info_cache.instances_change_notifier.register_listener(service_key, param)
+        return self.subscribe(param.service_name, param.group_name, clusters)
+
+    def unsubscribe_instances(self, param: SubscribeParam):
+        clusters = ",".join(param.clusters)
+        service_key = get_service_cache_key(get_group_name(param.service_name, param.group_name), clusters)
+        notifier = self.service_info_cache.instances_change_notifier
+        notifier.deregister_listener(service_key, param)
+        if not notifier.is_subscribed(service_key):
+            return self.unsubscribe(param.service_name, param.group_name, clusters)
+
+    def select_one_healthy_instance(self, param: SelectOneHealthInstanceParam) -> Instance:
+        clusters = ",".join(param.clusters)
+        cache_key = get_service_cache_key(get_group_name(param.service_name, param.group_name), clusters)
+        # 已缓存的服务直接在缓存的ServiceInfo上选择，只有缓存未命中时才订阅
+        service_info = self.service_info_cache.get_service_model(cache_key)
+        if service_info is None:
+            self.subscribe(param.service_name, param.group_name, clusters)
+            service_info = self.service_info_cache.get_service_model(cache_key)
+            if service_info is None:
+                raise NacosException(NOT_FOUND, f"service {cache_key} not found")
+        return service_info.select_one_healthy_instance(param.clusters)
+
     def unsubscribe(self, service_name, group_name, clusters):
         self.service_info_holder.stop_update_if_contain(get_group_name(service_name, group_name), clusters)
         return self.grpc_client_proxy.unsubscribe(service_name, group_name, clusters)
@@ -0,0 +1,54 @@
+import random
+from typing import Sequence
+
+
+class AliasTable:
+    """
+    Walker/Vose别名表：构建O(n)，每次按权重随机选择O(1)。
+    构建完成后不再修改，多个线程可以同时调用pick
+    """
+
+    __slots__ = ("size", "probabilities", "aliases")
+
+    def __init__(self, weights: Sequence[float]):
+        size = len(weights)
+        self.size = size
+        self.probabilities = [1.0] * size
+        self.aliases = list(range(size))
+        total = float(sum(weights))
+        if size == 0 or total <= 0:
+            self.size = 0
+            return
+
+        scaled = [weight * size / total for weight in weights]
+        small = [i for i, weight in enumerate(scaled) if weight < 1.0]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # 剩下的由于浮点误差应当都是1
+        for i in small + large:
+            self.probabilities[i] = 1.0
+
+    def __len__(self):
+        return self.size
+
+    def pick(self, rng=random) -> int:
+        """按权重随机返回一个下标，表为空时返回-1"""
+        if self.size == 0:
+            return -1
+        point = rng.random() * self.size
+        column = int(point)
+        if column >= self.size:
+            column = self.size - 1
+        # 复用同一个随机数的小数部分决定取本列还是别名
+        if point - column < self.probabilities[column]:
+            return column
+        return self.aliases[column]
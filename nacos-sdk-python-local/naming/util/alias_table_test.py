@@ -0,0 +1,26 @@
+import random
+
+from v2.nacos.naming.util.alias_table import AliasTable
+
+
+def test_empty_or_zero_weights_pick_nothing():
+    assert AliasTable([]).pick() == -1
+    assert len(AliasTable([0.0, 0.0])) == 0
+    assert AliasTable([0.0, 0.0]).pick() == -1
+
+
+def test_zero_weight_is_never_picked():
+    table = AliasTable([1.0, 0.0, 3.0])
+    rng = random.Random(1)
+    assert 1 not in {table.pick(rng) for _ in range(1000)}
+
+
+def test_pick_follows_weights():
+    weights = [1.0, 2.0, 7.0]
+    table = AliasTable(weights)
+    rng = random.Random(7)
+    counts = [0] * len(weights)
+    for _ in range(20000):
+        counts[table.pick(rng)] += 1
+    for count, weight in zip(counts, weights):
+        assert abs(count / 20000 - weight / sum(weights)) < 0.02
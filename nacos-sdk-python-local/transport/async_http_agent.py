@@ -0,0 +1,219 @@
+import asyncio
+import io
+import time
+import weakref
+from collections import deque
+from http import HTTPStatus
+from typing import Deque, Dict, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+
+from v2.nacos.common.client_config import TLSConfig
+from v2.nacos.transport.http_agent import create_ssl_context, is_success_status
+from v2.nacos.transport.http_connection_pool import (
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_MAX_POOL_SIZE,
+)
+
+DEFAULT_MAX_CONCURRENCY_PER_HOST = 32
+
+
+class _AsyncConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used_time = time.monotonic()
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+
+class _LoopState:
+    """信号量和连接都绑定在创建它们的事件循环上，每个事件循环各有一份"""
+
+    def __init__(self):
+        self.host_semaphores: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self.idle_connections: Dict[Tuple[str, str, int], Deque[_AsyncConnection]] = {}
+
+
+class AsyncHttpAgent:
+    """
+    HttpAgent的asyncio版本，request返回值与HttpAgent一致：(body, None) 或 (None, error)。
+    可以在多个事件循环中使用，每个事件循环有独立的并发限制和连接池
+    """
+
+    def __init__(self, logger, tls_config: TLSConfig, default_timeout,
+                 max_concurrency_per_host=DEFAULT_MAX_CONCURRENCY_PER_HOST, max_pool_size=DEFAULT_MAX_POOL_SIZE,
+                 pool_idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.logger = logger
+        self.tls_config = tls_config
+        self.default_timeout = default_timeout  # millisecond
+        self.ssl_context = create_ssl_context(tls_config)
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.max_pool_size = max_pool_size
+        self.pool_idle_timeout = pool_idle_timeout
+        # 事件循环关闭并被回收后，它的状态随之释放
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = \
+            weakref.WeakKeyDictionary()
+
+    def _get_loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState()
+        return state
+
+    async def request(self, url, method, headers=None, params=None, data=None):
+        if not headers:
+            headers = {}
+
+        if params:
+            url += '?' + urlencode(params)
+
+        data = urlencode(data).encode() if data else None
+
+        self.logger.debug(
+            f"[async-http-request] url: {url}, headers: {headers}, params: {params}, data: {data}, timeout: {self.default_timeout}")
+
+        if not url.startswith("http"):
+            url = f"http://{url}"
+
+        split_url = urlsplit(url)
+        key = (split_url.scheme, split_url.hostname, split_url.port or (443 if split_url.scheme == "https" else 80))
+        state = self._get_loop_state()
+        semaphore = state.host_semaphores.get(key)
+        if semaphore is None:
+            semaphore = state.host_semaphores[key] = asyncio.Semaphore(self.max_concurrency_per_host)
+
+        try:
+            async with semaphore:
+                status, reason, response_headers, body = await asyncio.wait_for(
+                    self._do_request(state, key, split_url, method, headers, data), self.default_timeout / 1000)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            self.logger.debug(f"[async-http-request] url error msg : {e}")
+            return None, URLError(e)
+
+        if not is_success_status(status):
+            if status in [HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.BAD_GATEWAY,
+                          HTTPStatus.SERVICE_UNAVAILABLE]:
+                self.logger.debug(f"[async-http-request] http error msg : {reason}")
+            return None, HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+        return body, None
+
+    async def _do_request(self, state: _LoopState, key, split_url, method, headers, data):
+        path = split_url.path or "/"
+        if split_url.query:
+            path += "?" + split_url.query
+
+        request_headers = {"Host": split_url.netloc}
+        request_headers.update(headers)
+        request_headers["Connection"] = "keep-alive"
+        request_headers["Content-Length"] = str(len(data)) if data is not None else "0"
+        if data is not None and "Content-Type" not in request_headers:
+            request_headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in request_headers.items()) + "\r\n"
+        payload = head.encode("latin-1") + (data or b"")
+
+        while True:
+            conn = await self._acquire(state, key)
+            try:
+                conn.writer.write(payload)
+                await conn.writer.drain()
+                status, reason, response_headers, body, will_close = await self._read_response(conn.reader, method)
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                conn.close()
+                if conn.reused:
+                    # 复用的连接可能已被服务端关闭，换一个新连接重试
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+
+            if will_close:
+                conn.close()
+            else:
+                self._release(state, key, conn)
+            return status, reason, response_headers, body
+
+    async def _acquire(self, state: _LoopState, key) -> _AsyncConnection:
+        now = time.monotonic()
+        idle = state.idle_connections.get(key)
+        while idle:
+            conn = idle.pop()
+            if now - conn.last_used_time > self.pool_idle_timeout or conn.reader.at_eof():
+                conn.close()
+                continue
+            conn.reused = True
+            return conn
+
+        scheme, host, port = key
+        ssl_context = self.ssl_context if scheme == "https" else None
+        if scheme == "https" and ssl_context is None:
+            ssl_context = True
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        return _AsyncConnection(reader, writer)
+
+    def _release(self, state: _LoopState, key, conn: _AsyncConnection):
+        conn.last_used_time = time.monotonic()
+        idle = state.idle_connections.setdefault(key, deque())
+        if len(idle) < self.max_pool_size:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("server closed connection without response")
+        version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        status = int(status)
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        connection_header = response_headers.get("connection", "").lower()
+        will_close = connection_header == "close" or (version == "HTTP/1.0" and connection_header != "keep-alive")
+
+        if method == "HEAD" or status in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED) or 100 <= status < 200:
+            body = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # 跳过trailer
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in response_headers:
+            body = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            body = await reader.read()
+            will_close = True
+
+        return status, reason, response_headers, body, will_close
+
+    async def close(self):
+        running_loop = asyncio.get_running_loop()
+        for loop, state in list(self._loop_states.items()):
+            connections = [conn for idle in state.idle_connections.values() for conn in idle]
+            state.idle_connections.clear()
+            for conn in connections:
+                if loop is running_loop:
+                    conn.close()
+                elif not loop.is_closed():
+                    # 连接只能在所属的事件循环中关闭
+                    loop.call_soon_threadsafe(conn.close)
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from v2.nacos.common.client_config import TLSConfig
+from v2.nacos.transport.async_http_agent import AsyncHttpAgent
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        status = 403 if self.path.endswith("/forbidden") else 200
+        body = b"ok" if status == 200 else b"no right"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    _Handler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d/nacos" % server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _agent():
+    return AsyncHttpAgent(logging.getLogger(__name__), TLSConfig(), 3000, max_concurrency_per_host=1)
+
+
+async def _request_twice(agent, url):
+    results = await asyncio.gather(agent.request(url, "GET"), agent.request(url, "GET"))
+    await agent.close()
+    return results
+
+
+def test_connection_is_reused_within_loop(server_url):
+    agent = _agent()
+    results = asyncio.run(_request_twice(agent, server_url))
+    assert results == [(b"ok", None), (b"ok", None)]
+    assert len(_Handler.connections) == 1
+
+
+def test_agent_can_be_used_from_another_loop(server_url):
+    agent = _agent()
+
+    async def request_and_keep_alive():
+        return await agent.request(server_url, "GET")
+
+    assert asyncio.run(request_and_keep_alive()) == (b"ok", None)
+    # 上一个事件循环留下的信号量和空闲连接不能被新的事件循环使用
+    assert asyncio.run(_request_twice(agent, server_url)) == [(b"ok", None), (b"ok", None)]
+    assert len(_Handler.connections) == 2
+
+
+def test_error_keeps_response_body(server_url):
+    body, error = asyncio.run(_agent().request(server_url + "/forbidden", "GET"))
+    assert body is None
+    assert error.code == 403
+    assert error.read() == b"no right"
@@ -2,12 +2,12 @@ from abc import ABC, abstractmethod
 from grpc import Channel
 from  ..common.model.request import IRequest
 from  ..common.model.response import IResponse
-from rpc_client import RpcClient, ServerInfo
+from rpc_client import ServerInfo
 
 
 class IConnection(ABC):
     @abstractmethod
-    def request(self, request: IRequest, timeout_mills: int, client: RpcClient) -> IResponse:
+    async def request(self, request: IRequest, timeout_mills: int) -> IResponse:
         pass
 
     @abstractmethod
@@ -38,8 +38,8 @@ class Connection(IConnection):
         self.abandon = False
         self.server_info = server_info
 
-    def request(self, request: IRequest, timeout_mills: int, client: RpcClient) -> IResponse:
-        pass 
+    async def request(self, request: IRequest, timeout_mills: int) -> IResponse:
+        pass
 
     def close(self):
         if self.conn:
@@ -55,4 +55,7 @@ class Connection(IConnection):
         self.abandon = flag
 
     def get_abandon(self) -> bool:
-        return self.abandon
\ No newline at end of file
+        return self.abandon
+
+    def is_connected(self) -> bool:
+        return self.conn is not None and not self.abandon
@@ -1,5 +1,6 @@
 # 需要大改
 import concurrent.futures
+import inspect
 import threading
 from connection import Connection
 import re
@@ -7,15 +8,23 @@ import grpc
 import asyncio
 import json
 from rpc_client import RpcClient, ConnectionType
+from request_hedger import RequestHedger
 import time
 import ssl
 from ..util.grpc_util import GrpcUtils
 from ..common.model.request import Request
 from ..common.model.response import Response
 from ..common.constants import Constants
+from ..common.nacos_exception import NacosException, CLIENT_DISCONNECT
+from .remote import internal_request
 from grpc_connection import GrpcConnection
 import proto.nacos_grpc_service_pb2_grpc as ngs
 
+# 等待旧版本服务端注册连接的最长时间和检查间隔，单位秒
+CONNECTION_REGISTER_TIMEOUT = 3
+
+CONNECTION_REGISTER_CHECK_INTERVAL = 0.01
+
 
 class GrpcClient(RpcClient):
 
@@ -30,6 +39,11 @@ class GrpcClient(RpcClient):
         self.tls_config = tls_config
         self.ability_mode = ability_mode
         self.client_version = client_version
+        self.standby_enabled = client_config.grpc_standby_enabled
+        if client_config.grpc_hedge_enabled:
+            self.request_hedger = RequestHedger(client_config.grpc_hedge_request_types,
+                                                client_config.grpc_hedge_budget_ratio,
+                                                client_config.grpc_hedge_quantile)
 
     def get_connection_type(self):
         return ConnectionType.GRPC
@@ -59,26 +73,26 @@ class GrpcClient(RpcClient):
                 ('grpc.keepalive_time_ms', self.client_config().channel_keep_alive()),
                 ('grpc.keepalive_timeout_ms', self.client_config().channel_keep_alive_timeout())
             ]
-            channel = grpc.secure_channel(server_ip, credentials=credentials, options=options)
+            channel = grpc.aio.secure_channel(server_ip, credentials=credentials, options=options)
         else:
-            channel = grpc.insecure_channel(f'{server_ip}:{server_port}')
+            channel = grpc.aio.insecure_channel(f'{server_ip}:{server_port}')
         return channel
 
     def _create_async_stub(self, channel):
         async_stub = ngs.RequestStub(channel)
         return async_stub
 
-    def _server_check(self, server_ip, server_port, async_stub):
+    async def _server_check(self, server_ip, server_port, async_stub):
         server_check_request = Request
         grpc_request = GrpcUtils.convert(server_check_request)
         try:
             # Send a request and wait for a response
-            response = asyncio.wait_for(
+            response = await asyncio.wait_for(
                 async_stub.request(grpc_request),
                 self.client_config.server_check_time_out() / 1000.0
             )
             return GrpcUtils.parse(response)
-        except TimeoutError:
+        except asyncio.TimeoutError:
             self.logger.error(f"Server check timed out for {server_ip}:{server_port}")
         except Exception as e:
             self.logger.error(f"Server check fail for {server_ip}:{server_port}, error = {e}")
@@ -88,24 +102,25 @@ class GrpcClient(RpcClient):
                 self.logger.error("Current client requires tls encrypted, server must support tls, please check.")
         return None
 
-    def connect_to_server(self, server_info):
+    async def connect_to_server(self, server_info):
         try:
             if self.grpc_executor is None:
                 self.grpc_executor = self._create_grpc_executor(
                     server_info.server_ip)
-                port = server_info.port + self.rpc_client.rpc_port_offset()
+            port = server_info.port + self.rpc_client.rpc_port_offset()
             # Establish a channel
             managed_channel = self._create_new_managed_channel(server_info.server_ip, port)
             # Create a stub
             channel_stub = self._create_async_stub(managed_channel)
-            response = self._server_check(server_info.server_ip, server_info.server_port, channel_stub)
+            response = await self._server_check(server_info.server_ip, server_info.server_port, channel_stub)
             server_check_response = Response(response)
             connection_id = server_check_response.get_connection_id()
 
             bi_request_stream_stub = ngs.BiRequestStreamStub(
                 managed_channel)
 
-            grpc_conn = GrpcConnection(server_info, self.grpc_executor)
+            grpc_conn = GrpcConnection(server_info, self.grpc_executor,
+                                       self.client_config.grpc_max_in_flight_requests, self.logger)
             grpc_conn.set_connection_id(connection_id)
 
             if server_check_response.is_support_ability_negotiation:  # If the server supports ability negotiation
@@ -126,19 +141,22 @@ class GrpcClient(RpcClient):
             con_setup_request.set_labels(self.labels)
             con_setup_request.set_ability_table(self.client_abilities(self.ability_mode))
             con_setup_request.set_tenant(self.tenant)
-            grpc_conn.send_request(con_setup_request)
+            # 服务端不回复setup请求
+            await grpc_conn.send_request_no_ack(con_setup_request)
 
             # Wait for a response
             if self.rec_ability_context.is_need_to_sync():
                 # Try to wait for a notification response
-                self.rec_ability_context.rec_await(self.client_config.capability_negotiation_timeout())
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.rec_ability_context.rec_await, self.client_config.capability_negotiation_timeout())
                 # If the server's abilities are not received, reconnect
                 if not self.rec_ability_context.check(grpc_conn):
                     return None
-            else:
+            elif not await self._wait_connection_registered(grpc_conn):
                 # Adapt to the old version of the server
-                # Consider the registration successful within 100ms after the connection is registered
-                time.sleep(0.1)
+                grpc_conn.set_abandon(True)
+                grpc_conn.close()
+                return None
 
             return grpc_conn
         except Exception as e:
@@ -149,6 +167,23 @@ class GrpcClient(RpcClient):
 
         return None
 
+    async def _wait_connection_registered(self, grpc_conn) -> bool:
+        # 旧版本服务端没有能力协商，不再固定等待100ms，而是用健康检查确认setup请求已被服务端处理，通常只需一个RTT
+        deadline = time.monotonic() + CONNECTION_REGISTER_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                response = await grpc_conn.request(internal_request.HealthCheckRequest().new_health_check_request(),
+                                                   max(1, int((deadline - time.monotonic()) * 1000)))
+                # 连接未注册时服务端返回UN_REGISTER
+                if response is not None and response.is_success():
+                    return True
+            except NacosException as e:
+                if e.error_code == CLIENT_DISCONNECT:
+                    return False
+            await asyncio.sleep(CONNECTION_REGISTER_CHECK_INTERVAL)
+        self.logger.warning(f"[{self.name}] connection {grpc_conn.get_connection_id()} is not registered by server")
+        return False
+
     def _get_tls_credentials(self, server_ip):
         self.logger.info("build tls config for connecting to server %s, tlsConfig = %s", server_ip,
                          self.tls_config)
@@ -182,35 +217,18 @@ class GrpcClient(RpcClient):
 
         return ssl_context
 
-    def _handle_server_request(self, payload, grpc_conn):
-        client = self.get_rpc_client()
-        payload_type = payload.get("metadata").get("type")
-        handler_mapping = client.server_request_handler_mapping.get(payload_type)
+    async def _handle_server_request(self, request, grpc_conn):
+        """把双向流上解析出的服务端请求交给注册的处理器，返回需要回复的响应"""
+        request_type = request.get_request_type()
+        handler_mapping = self.server_request_handler_mapping.get(request_type)
         if not handler_mapping:
-            self.logger.error("%s Unsupported payload type", grpc_conn.get_connection_id())
-            return
+            self.logger.error(f"[{grpc_conn.connection_id}] Unsupported payload type:{request_type}")
+            return None
 
-        # Gets the server request object and deserializes it
-        server_request = handler_mapping["server_request"]()
-        try:
-            json.loads(payload.get("body").get("value"), object_hook=lambda d: server_request.update(d))
-        except json.JSONDecodeError as err:
-            self.logger.error("%s Fail to json Unmarshal for request:%s, ackId->%s", grpc_conn.get_connection_id(),
-                              server_request.get("request_type"), server_request.get("request_id"))
-            return
-
-        server_request["headers"] = payload.get("metadata").get("headers")
-        response = handler_mapping["handler"].request_reply(server_request, client)
-        if not response:
-            self.logger.warning("%s Fail to process server request, ackId->%s", grpc_conn.get_connection_id(),
-                                server_request.get("request_id"))
-            return
-
-        response["request_id"] = server_request.get("request_id")
-        err = grpc_conn.bi_stream_send(grpc_conn.convert_response(response))
-        if err and err != EOFError:
-            self.logger.warning("%s Fail to send response:%s,ackId->%s", grpc_conn.get_connection_id(),
-                                response.get("response_type"), server_request.get("request_id"))
+        response = handler_mapping.handler.request_reply(request, self)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
 
     class RecAbilityContext:
         def __init__(self, logger, connection: Connection):
@@ -252,29 +270,29 @@ class GrpcClient(RpcClient):
             return True
 
     def _bind_request_stream(self, stream_stub, grpc_conn):
-        async def request_stream_handler(request):
+        # 双向流上的响应由grpc_conn按request_id交给等待的请求，这里只处理服务端推送的请求
+        async def request_stream_handler(request, conn):
             try:
-                request = GrpcUtils.parse(request)
-                if request:
-                    response = await self._handle_server_request(request)
-                    if response:
-                        response.request_id = request.request_id
-                        await self._send_response(response)
-                    else:
-                        self.logger.warning(
-                            f"[{grpc_conn.connection_id}] Fail to process server request, ackId->{request.request_id}")
+                response = await self._handle_server_request(request, conn)
+                if response:
+                    response.request_id = request.request_id
+                    await self._send_response(response, conn)
+                else:
+                    self.logger.warning(
+                        f"[{conn.connection_id}] Fail to process server request, ackId->{request.request_id}")
             except Exception as e:
-                self.logger.error(f"[{grpc_conn.connection_id}] Handle server request exception: {e}")
+                self.logger.error(f"[{conn.connection_id}] Handle server request exception: {e}")
                 err_response = Response.build(Constants.CLIENT_ERROR, "Handle server request error")
                 err_response.request_id = request.request_id
-                await self._send_response(err_response)
+                await self._send_response(err_response, conn)
 
-        return stream_stub.requestBiStream(request_stream_handler)
+        return grpc_conn.bind_bi_stream(stream_stub, request_stream_handler)
 
-    def _send_response(self, response):
+    async def _send_response(self, response, conn):
+        # 在收到请求的连接上回复，该连接可能已不是current_connection（例如备用连接或切换中的旧连接）
         try:
-            self.current_connection.send_response(response)
-        except Exception as e:
+            await conn.send_response(response)
+        except Exception:
             self.logger.error(
-                f"[{self.current_connection.connection_id}] Error to send ack response, ackId-> {response.request_id}",
+                f"[{conn.connection_id}] Error to send ack response, ackId-> {response.request_id}",
                 exc_info=True)
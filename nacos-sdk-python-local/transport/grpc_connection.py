@@ -1,36 +1,244 @@
-from connection import IConnection, Connection
+import asyncio
+import itertools
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+import grpc
+
+from connection import Connection
+from ..common.nacos_exception import NacosException, CLIENT_DISCONNECT, CLIENT_OVER_THRESHOLD, SERVER_ERROR
+from ..util.grpc_util import GrpcUtils
 import proto.nacos_grpc_service_pb2_grpc as ngs
 
+DEFAULT_MAX_IN_FLIGHT_REQUESTS = 256
+
+
+def _get_request_id(obj) -> str:
+    if isinstance(obj, dict):
+        return obj.get("requestId") or obj.get("request_id") or ""
+    return getattr(obj, "request_id", "") or ""
+
+
+def _invoke_call_back(call_back: Callable, future: asyncio.Future):
+    if future.cancelled():
+        call_back(None, NacosException(CLIENT_DISCONNECT, "request is cancelled"))
+    elif future.exception() is not None:
+        call_back(None, future.exception())
+    else:
+        call_back(future.result(), None)
+
+
 class GrpcConnection(Connection):
+    """
+    一个grpc.aio通道上多路复用的连接：普通请求走unary调用，多个请求并发进行互不阻塞，
+    同时在途的请求数受max_in_flight_requests限制；经双向流发送的请求按request_id登记在pending_requests中，
+    收到对应的响应后完成
+    """
     tps_control_manager = None
 
-    def __init__(self):
-        self.request = ngs.Request
-        self.bi_stream = ngs.BiRequestStream
+    def __init__(self, server_info, grpc_executor=None, max_in_flight_requests=DEFAULT_MAX_IN_FLIGHT_REQUESTS,
+                 logger=None):
+        super().__init__(None, "", server_info)
+        self.logger = logger or logging.getLogger(__name__)
+        self.grpc_executor = grpc_executor
+        self.grpc_utils = GrpcUtils(self.logger)
+        self.grpc_future_service_stub: Optional[ngs.RequestStub] = None
+        self.bi_stream_call = None
+        self.bi_stream_task: Optional[asyncio.Task] = None
+        self.ability_table = None
+        self.max_in_flight_requests = max_in_flight_requests
+        # 在事件循环中首次使用时创建，避免绑定到构造连接时的循环
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._bi_stream_write_lock: Optional[asyncio.Lock] = None
+        self.pending_requests: Dict[str, asyncio.Future] = {}
+        self._request_id_seq = itertools.count(1)
+        self.closed = False
 
-    def send_request_no_ack(self, request):
-        pass
+    def set_connection_id(self, connection_id: str):
+        self.connection_id = connection_id
 
-    def _send_request(self, request):
-        pass
+    def set_channel(self, channel: grpc.aio.Channel):
+        self.conn = channel
 
-    def send_queue_block_check(self):
-        pass
+    def set_grpc_future_service_stub(self, stub: ngs.RequestStub):
+        self.grpc_future_service_stub = stub
 
-    def trace_if_necessary(self, payload):
-        pass
+    def set_payload_stream_observer(self, bi_stream_call):
+        self.bi_stream_call = bi_stream_call
 
-    def request(self, request, timeout_mills):
-        pass
+    def set_ability_table(self, ability_table):
+        self.ability_table = ability_table
+
+    def is_abilities_set(self) -> bool:
+        return self.ability_table is not None
+
+    def _get_in_flight(self) -> asyncio.Semaphore:
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight_requests)
+        return self._in_flight
 
-    def send_request_inner(self, request, call_back):
+    def _next_request_id(self, request) -> str:
+        request_id = _get_request_id(request)
+        if not request_id:
+            request_id = str(next(self._request_id_seq))
+            request.request_id = request_id
+        return request_id
+
+    def _check_open(self):
+        if self.closed or self.conn is None:
+            raise NacosException(CLIENT_DISCONNECT, f"connection {self.connection_id} is closed")
+
+    async def request(self, request, timeout_mills):
+        """
+        通过unary调用发送请求并等待响应。timeout_mills是整个请求的期限，
+        等待在途名额的时间也计算在内，剩余时间作为grpc调用的deadline
+        """
+        self._check_open()
+        deadline = time.monotonic() + timeout_mills / 1000.0
+        in_flight = self._get_in_flight()
+        try:
+            await asyncio.wait_for(in_flight.acquire(), timeout_mills / 1000.0)
+        except asyncio.TimeoutError as e:
+            raise NacosException(CLIENT_OVER_THRESHOLD,
+                                 f"too many in-flight requests on connection {self.connection_id}") from e
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise NacosException(SERVER_ERROR, f"request {request.get_request_type()} timeout")
+            self._next_request_id(request)
+            payload = self.grpc_utils.convert(request)
+            try:
+                response_payload = await self.grpc_future_service_stub.request(payload, timeout=remaining)
+            except grpc.aio.AioRpcError as e:
+                if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                    raise NacosException(SERVER_ERROR, f"request {request.get_request_type()} timeout") from e
+                if e.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED):
+                    raise NacosException(CLIENT_DISCONNECT,
+                                         f"connection {self.connection_id} is unavailable") from e
+                raise NacosException(SERVER_ERROR,
+                                     f"request {request.get_request_type()} failed, err:{e.details()}") from e
+            return self.grpc_utils.parse(response_payload)
+        finally:
+            in_flight.release()
+
+    async def _write_bi_stream(self, payload):
+        if self.bi_stream_call is None:
+            raise NacosException(CLIENT_DISCONNECT, f"bi stream of connection {self.connection_id} is not ready")
+        if self._bi_stream_write_lock is None:
+            self._bi_stream_write_lock = asyncio.Lock()
+        # grpc.aio的流不允许并发write
+        async with self._bi_stream_write_lock:
+            await self.bi_stream_call.write(payload)
+
+    async def send_request_no_ack(self, request):
+        """经双向流发送请求，不等待响应"""
+        self._check_open()
+        self._next_request_id(request)
+        await self._write_bi_stream(self.grpc_utils.convert(request))
+
+    async def send_response(self, response):
+        """经双向流回复服务端推送的请求"""
+        self._check_open()
+        await self._write_bi_stream(self.grpc_utils.convert(response))
+
+    async def send_request_inner(self, request, call_back: Callable = None):
+        """
+        经双向流发送请求，返回在收到同一request_id的响应时完成的future。
+        call_back不为空时，以(response, error)调用
+        """
+        self._check_open()
+        request_id = self._next_request_id(request)
+        future = asyncio.get_running_loop().create_future()
+        if call_back is not None:
+            future.add_done_callback(lambda f: _invoke_call_back(call_back, f))
+        self.pending_requests[request_id] = future
+        try:
+            await self._write_bi_stream(self.grpc_utils.convert(request))
+        except Exception as e:
+            self.pending_requests.pop(request_id, None)
+            if not future.done():
+                future.set_exception(e)
+        return future
+
+    async def send_request(self, request, timeout_mills=None):
+        future = await self.send_request_inner(request)
+        if timeout_mills is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, timeout_mills / 1000.0)
+        except asyncio.TimeoutError as e:
+            self.pending_requests.pop(_get_request_id(request), None)
+            raise NacosException(SERVER_ERROR, f"request {request.get_request_type()} timeout") from e
+
+    def complete_request(self, response) -> bool:
+        """双向流收到响应时调用，返回是否有等待该响应的请求"""
+        future = self.pending_requests.pop(_get_request_id(response), None)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(response)
+        return True
+
+    def bind_bi_stream(self, bi_stream_stub: ngs.BiRequestStreamStub, server_request_handler: Callable):
+        """打开双向流并在后台读取：响应交给pending_requests中的请求，其余作为服务端推送交给server_request_handler"""
+        self.bi_stream_call = bi_stream_stub.requestBiStream()
+        self.bi_stream_task = asyncio.get_running_loop().create_task(self._read_bi_stream(server_request_handler))
+        return self.bi_stream_call
+
+    async def _read_bi_stream(self, server_request_handler: Callable):
+        try:
+            async for payload in self.bi_stream_call:
+                obj = self.grpc_utils.parse(payload)
+                if obj is None:
+                    continue
+                if payload.metadata.type.endswith("Response") and self.complete_request(obj):
+                    continue
+                try:
+                    await server_request_handler(obj, self)
+                except Exception as e:
+                    self.logger.error(f"[{self.connection_id}] handle server request failed, err:{e}")
+        except asyncio.CancelledError:
+            pass
+        except grpc.aio.AioRpcError as e:
+            self.logger.warning(f"[{self.connection_id}] bi stream is closed, err:{e.details()}")
+        finally:
+            self._fail_pending_requests()
+
+    def _fail_pending_requests(self):
+        pending = self.pending_requests
+        self.pending_requests = {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(NacosException(CLIENT_DISCONNECT,
+                                                    f"connection {self.connection_id} is closed"))
+
+    def send_queue_block_check(self) -> bool:
+        return self._in_flight is not None and self._in_flight.locked()
+
+    def trace_if_necessary(self, payload):
         pass
 
     def close(self):
-        pass
+        if self.closed:
+            return
+        self.closed = True
+        self.close_bi_stream()
+        self._fail_pending_requests()
+        if self.conn is not None:
+            try:
+                asyncio.get_running_loop().create_task(self.conn.close())
+            except RuntimeError:
+                # 不在事件循环中，交给通道自己回收
+                pass
 
     def close_bi_stream(self):
-        pass
+        if self.bi_stream_call is not None:
+            self.bi_stream_call.cancel()
+        if self.bi_stream_task is not None:
+            self.bi_stream_task.cancel()
 
-    def is_connected(self):
-        pass
\ No newline at end of file
+    def is_connected(self) -> bool:
+        if self.closed or self.conn is None:
+            return False
+        return self.conn.get_state() == grpc.ChannelConnectivity.READY
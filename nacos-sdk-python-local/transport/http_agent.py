@@ -1,32 +1,48 @@
+import io
 import ssl
 from http import HTTPStatus
+from http.client import HTTPException, RemoteDisconnected
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from urllib.parse import urlencode, urlsplit
 
 from v2.nacos.common.client_config import TLSConfig
+from v2.nacos.transport.http_connection_pool import HttpConnectionPool, DEFAULT_MAX_POOL_SIZE, \
+    DEFAULT_IDLE_TIMEOUT
 
 HTTP_STATUS_SUCCESS = 200
 
 
+def is_success_status(status: int) -> bool:
+    # 与urlopen一致，2xx都视为成功
+    return HTTP_STATUS_SUCCESS <= status < 300
+
+
+def create_ssl_context(tls_config: TLSConfig):
+    if tls_config is None or not tls_config.enabled:
+        # 如果未开启tls，则无需创建ssl context
+        return None
+
+    ctx = ssl.create_default_context(
+        cafile=tls_config.ca_file) if tls_config.ca_file else ssl.create_default_context()
+
+    if tls_config.cert_file and tls_config.key_file:
+        ctx.load_cert_chain(certfile=tls_config.cert_file, keyfile=tls_config.key_file)
+
+    return ctx
+
+
 class HttpAgent:
-    def __init__(self, logger, tls_config: TLSConfig, default_timeout):
+    def __init__(self, logger, tls_config: TLSConfig, default_timeout, max_pool_size=DEFAULT_MAX_POOL_SIZE,
+                 pool_idle_timeout=DEFAULT_IDLE_TIMEOUT):
         self.logger = logger
         self.tls_config = tls_config
-        self.default_timeout = default_timeout
+        self.default_timeout = default_timeout  # millisecond
+        # ssl context只在初始化时创建一次，所有连接共享
+        self.ssl_context = self.create_ssl_context()
+        self.connection_pool = HttpConnectionPool(self.ssl_context, max_pool_size, pool_idle_timeout)
 
     def create_ssl_context(self):
-        if self.tls_config is None or not self.tls_config.enabled:
-            # 如果未开启tls，则无需创建ssl context
-            return None
-
-        ctx = ssl.create_default_context(
-            cafile=self.tls_config.ca_file) if self.tls_config.ca_file else ssl.create_default_context()
-
-        if self.tls_config.cert_file and self.tls_config.key_file:
-            ctx.load_cert_chain(certfile=self.tls_config.cert_file, keyfile=self.tls_config.key_file)
-
-        return ctx
+        return create_ssl_context(self.tls_config)
 
     def request(self, url, method, headers=None, params=None, data=None):
         if not headers:
@@ -40,21 +56,59 @@ class HttpAgent:
         self.logger.debug(
             f"[http-request] url: {url}, headers: {headers}, params: {params}, data: {data}, timeout: {self.default_timeout}")
 
-        try:
-            if not url.startswith("http"):
-                url = f"http://{url}"
-
-            ctx = self.create_ssl_context()
+        if not url.startswith("http"):
+            url = f"http://{url}"
 
-            request = Request(url=url, data=data, headers=headers, method=method)
+        try:
+            status, reason, response_headers, body = self._do_request(url, method, headers, data)
+        except (OSError, HTTPException) as e:
+            self.logger.debug(f"[http-request] url error msg : {e}")
+            return None, URLError(e)
 
-            response = urlopen(request, timeout=self.default_timeout, context=ctx)
-            return response.read(), None
-        except HTTPError as e:
-            if e.code in [HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.BAD_GATEWAY,
+        if not is_success_status(status):
+            if status in [HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.BAD_GATEWAY,
                           HTTPStatus.SERVICE_UNAVAILABLE]:
-                self.logger.debug(f"[http-request] http error msg : {e.reason}")
-            return None, e
-        except URLError as e:
-            self.logger.debug(f"[http-request] url error msg : {e.reason}")
-            return None, e
+                self.logger.debug(f"[http-request] http error msg : {reason}")
+            # 保留响应体，调用方可以通过e.read()读取服务端返回的错误信息
+            return None, HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+        return body, None
+
+    def _do_request(self, url, method, headers, data):
+        split_url = urlsplit(url)
+        scheme = split_url.scheme
+        host = split_url.hostname
+        port = split_url.port or (443 if scheme == "https" else 80)
+        path = split_url.path or "/"
+        if split_url.query:
+            path += "?" + split_url.query
+
+        request_headers = dict(headers)
+        request_headers["Connection"] = "keep-alive"
+        if data is not None and "Content-Type" not in request_headers:
+            request_headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        timeout = self.default_timeout / 1000
+        while True:
+            pooled = self.connection_pool.acquire(scheme, host, port, timeout)
+            try:
+                pooled.conn.request(method, path, body=data, headers=request_headers)
+                response = pooled.conn.getresponse()
+                body = response.read()
+            except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                pooled.conn.close()
+                if pooled.reused:
+                    # 复用的连接可能已被服务端关闭，换一个新连接重试
+                    continue
+                raise
+            except BaseException:
+                pooled.conn.close()
+                raise
+
+            if response.will_close:
+                pooled.conn.close()
+            else:
+                self.connection_pool.release(scheme, host, port, pooled)
+            return response.status, response.reason, response.headers, body
+
+    def close(self):
+        self.connection_pool.close()
@@ -0,0 +1,52 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from v2.nacos.common.client_config import TLSConfig
+from v2.nacos.transport.http_agent import HttpAgent
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = int(self.path.rsplit("/", 1)[-1])
+        body = b"" if status == 204 else ("status %d" % status).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:%d" % server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _agent():
+    return HttpAgent(logging.getLogger(__name__), TLSConfig(), 3000)
+
+
+def test_any_2xx_is_success(server_url):
+    agent = _agent()
+    assert agent.request(server_url + "/200", "GET") == (b"status 200", None)
+    assert agent.request(server_url + "/201", "GET") == (b"status 201", None)
+    assert agent.request(server_url + "/204", "GET") == (b"", None)
+
+
+def test_error_keeps_response_body(server_url):
+    body, error = _agent().request(server_url + "/403", "GET")
+    assert body is None
+    assert error.code == 403
+    assert error.read() == b"status 403"
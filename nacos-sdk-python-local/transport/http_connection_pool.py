@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from http.client import HTTPConnection, HTTPSConnection
+from typing import Deque, Dict, Tuple
+
+DEFAULT_MAX_POOL_SIZE = 8
+
+DEFAULT_IDLE_TIMEOUT = 30  # second
+
+
+class _PooledConnection:
+    def __init__(self, conn: HTTPConnection):
+        self.conn = conn
+        self.last_used_time = time.monotonic()
+        self.reused = False
+
+
+class HttpConnectionPool:
+    """
+    按 (scheme, host, port) 维护的 HTTP/1.1 keep-alive 连接池。
+    acquire只清理同一个host的过期连接，release时每隔idle_timeout清理一次所有host，
+    不再访问的host上的空闲连接也会被关闭
+    """
+
+    def __init__(self, ssl_context=None, max_size=DEFAULT_MAX_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.ssl_context = ssl_context
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle_connections: Dict[Tuple[str, str, int], Deque[_PooledConnection]] = {}
+        self._lock = threading.Lock()
+        self._next_evict_time = time.monotonic() + idle_timeout
+
+    def acquire(self, scheme: str, host: str, port: int, timeout) -> _PooledConnection:
+        key = (scheme, host, port)
+        expired = []
+        pooled = None
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle_connections.get(key)
+            while idle:
+                candidate = idle.pop()
+                if now - candidate.last_used_time > self.idle_timeout:
+                    expired.append(candidate)
+                    continue
+                pooled = candidate
+                break
+
+        for candidate in expired:
+            candidate.conn.close()
+
+        if pooled is not None:
+            pooled.reused = True
+            pooled.conn.timeout = timeout
+            if pooled.conn.sock is not None:
+                pooled.conn.sock.settimeout(timeout)
+            return pooled
+
+        if scheme == "https":
+            conn = HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        else:
+            conn = HTTPConnection(host, port, timeout=timeout)
+        return _PooledConnection(conn)
+
+    def release(self, scheme: str, host: str, port: int, pooled: _PooledConnection):
+        now = time.monotonic()
+        pooled.last_used_time = now
+        key = (scheme, host, port)
+        pooled_back = False
+        with self._lock:
+            idle = self._idle_connections.setdefault(key, deque())
+            if len(idle) < self.max_size:
+                idle.append(pooled)
+                pooled_back = True
+            evict = now >= self._next_evict_time
+            if evict:
+                self._next_evict_time = now + self.idle_timeout
+        if not pooled_back:
+            pooled.conn.close()
+        if evict:
+            self.evict_idle()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for key, idle in list(self._idle_connections.items()):
+                alive = deque(c for c in idle if now - c.last_used_time <= self.idle_timeout)
+                expired.extend(c for c in idle if now - c.last_used_time > self.idle_timeout)
+                if alive:
+                    self._idle_connections[key] = alive
+                else:
+                    del self._idle_connections[key]
+        for pooled in expired:
+            pooled.conn.close()
+
+    def close(self):
+        with self._lock:
+            all_idle = [c for idle in self._idle_connections.values() for c in idle]
+            self._idle_connections.clear()
+        for pooled in all_idle:
+            pooled.conn.close()
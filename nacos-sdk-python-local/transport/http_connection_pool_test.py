@@ -0,0 +1,51 @@
+import time
+
+from v2.nacos.transport.http_connection_pool import (
+    HttpConnectionPool,
+    _PooledConnection,
+)
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.timeout = None
+        self.sock = None
+
+    def close(self):
+        self.closed = True
+
+
+def test_released_connection_is_reused():
+    pool = HttpConnectionPool()
+    pooled = _PooledConnection(_FakeConnection())
+    pool.release("http", "10.0.0.1", 8848, pooled)
+
+    reused = pool.acquire("http", "10.0.0.1", 8848, 3)
+    assert reused is pooled
+    assert reused.reused
+    assert reused.conn.timeout == 3
+
+
+def test_pool_size_is_limited_per_host():
+    pool = HttpConnectionPool(max_size=1)
+    first = _PooledConnection(_FakeConnection())
+    second = _PooledConnection(_FakeConnection())
+    pool.release("http", "10.0.0.1", 8848, first)
+    pool.release("http", "10.0.0.1", 8848, second)
+    assert not first.conn.closed
+    assert second.conn.closed
+
+
+def test_idle_connections_of_unused_hosts_are_evicted_on_release():
+    pool = HttpConnectionPool(idle_timeout=0.05)
+    stale = _PooledConnection(_FakeConnection())
+    pool.release("http", "10.0.0.1", 8848, stale)
+    time.sleep(0.1)
+
+    fresh = _PooledConnection(_FakeConnection())
+    pool.release("http", "10.0.0.2", 8848, fresh)
+
+    assert stale.conn.closed
+    assert not fresh.conn.closed
+    assert list(pool._idle_connections) == [("http", "10.0.0.2", 8848)]
@@ -2,7 +2,6 @@ import json
 import sched
 import threading
 from concurrent.futures import ThreadPoolExecutor
-from random import randrange
 
 import time
 import uuid
@@ -18,14 +17,19 @@ from v2.nacos.naming.util.naming_client_util import get_group_name
 from v2.nacos.utils.common_util import get_current_time_millis
 from v2.nacos.transport.auth_client import AuthClient
 from v2.nacos.transport.http_agent import HttpAgent
+from v2.nacos.transport.async_http_agent import AsyncHttpAgent
+from v2.nacos.transport.server_selector import ServerSelector, create_server_selector
 
 
-def _choose_random_index(upper_limit: int):
-    return randrange(0, upper_limit)
+def _is_server_failure(error) -> bool:
+    # 4xx说明服务端正常处理了请求，只有连接失败和5xx计为服务端的失败
+    code = getattr(error, "code", None)
+    return not isinstance(code, int) or code >= 500
 
 
 class NacosServerConnector:
-    def __init__(self, logger, client_config: ClientConfig, http_agent: HttpAgent):
+    def __init__(self, logger, client_config: ClientConfig, http_agent: HttpAgent,
+                 async_http_agent: AsyncHttpAgent = None, server_selector: ServerSelector = None):
         self.logger = logger
 
         if len(client_config.server_list) == 0 and not client_config.endpoint:
@@ -33,8 +37,9 @@ class NacosServerConnector:
 
         self.client_config = client_config
         self.server_list = client_config.server_list
-        self.current_index = 0
+        self.server_selector = server_selector or create_server_selector(client_config)
         self.http_agent = http_agent
+        self.async_http_agent = async_http_agent
         self.endpoint = client_config.endpoint
 
         self.server_src_change_signal = threading.Event()
@@ -51,8 +56,8 @@ class NacosServerConnector:
         if len(self.server_list) == 0:
             raise NacosException(INVALID_PARAM, "server list is empty")
 
-        self.current_index = _choose_random_index(len(self.server_list))
-        self.auth_client = AuthClient(self.logger, client_config, self.get_server_list, http_agent)
+        self.auth_client = AuthClient(self.logger, client_config, self.get_server_list, http_agent,
+                                      async_http_agent)
         self.auth_client.get_access_token(True)
 
     def _get_server_list_from_endpoint(self) -> Optional[List[str]]:
@@ -128,20 +133,64 @@ class NacosServerConnector:
                         "[req_api] api:%s, method:%s, params:%s call server error: %s", url, method,
                         {json.dumps(params)}, e)
         else:
-            index = randrange(len(servers))
-            for _ in range(len(servers)):
-                current_server = servers[index]
+            for current_server in self.server_selector.order(servers):
                 try:
                     return self._call_server(current_server, url, params, method)
                 except Exception as e:
                     self.logger.error(
                         "[req_api] api:%s, method:%s, params:%s call server error: %s", url, method,
                         {json.dumps(params)}, e)
-                    index = (index + 1) % len(servers)
 
         raise NacosException(SERVER_ERROR, f"failed to request api after {Constants.MAX_RETRY} tries")
 
     def _call_server(self, current_server: str, url: str, params: Dict[str, str], method: str):
+        url, headers = self._build_call_server_request(current_server, url)
+        start = time.monotonic()
+        response, error = self.http_agent.request(url, method, headers=headers, params=params)
+        self._record_call_result(current_server, start, error)
+        if error is not None:
+            raise NacosException(getattr(error, "code", SERVER_ERROR), str(error))
+        return response
+
+    async def req_api_async(self, url: str, headers=None, params=None, data=None, method="GET"):
+        if self.async_http_agent is None:
+            raise NacosException(INVALID_PARAM, "async http agent is not configured")
+
+        servers = self.get_server_list()
+        if servers is None or len(servers) == 0:
+            raise NacosException(INVALID_PARAM, "server list is empty")
+
+        all_params = {}
+        if params:
+            all_params.update(params)
+
+        if self.client_config.username and self.client_config.password:
+            all_params[Constants.ACCESS_TOKEN] = await self.auth_client.get_access_token_async(False)
+        self._inject_naming_params_sign(all_params, data)
+
+        tries = Constants.MAX_RETRY if len(servers) == 1 else len(servers)
+        ordered_servers = self.server_selector.order(servers)
+        for i in range(tries):
+            current_server = ordered_servers[i % len(ordered_servers)]
+            try:
+                return await self._call_server_async(current_server, url, all_params, method)
+            except Exception as e:
+                self.logger.error(
+                    "[req_api_async] api:%s, method:%s, params:%s call server error: %s", url, method,
+                    {json.dumps(params)}, e)
+
+        raise NacosException(SERVER_ERROR, f"failed to request api after {tries} tries")
+
+    async def _call_server_async(self, current_server: str, url: str, params: Dict[str, str], method: str):
+        url, headers = self._build_call_server_request(current_server, url)
+        start = time.monotonic()
+        response, error = await self.async_http_agent.request(url, method, headers=headers, params=params)
+        self._record_call_result(current_server, start, error)
+        if error is not None:
+            raise NacosException(getattr(error, "code", SERVER_ERROR), str(error))
+        return response
+
+    def _build_call_server_request(self, current_server: str, url: str):
         context_path = self.client_config.context_path if self.client_config.context_path != '' else Constants.WEB_CONTEXT
         url = current_server + context_path + url
         # 设置HTTP请求的头部信息
@@ -153,19 +202,32 @@ class NacosServerConnector:
             'Request-Module': 'Naming',
             'Content-Type': 'application/x-www-form-urlencoded;charset=utf-8',
         }
-        response, error = self.http_agent.request(url, method, headers=headers, params=params)
-        if error is not None:
-            raise NacosException(response.status_code, response.text)
-        return response
+        return url, headers
 
     def get_server_list(self):
         return self.server_list
 
     def get_next_server(self):
-        if not self.server_list:
-            raise ValueError('server list is empty')
-        self.current_index = (self.current_index + 1) % len(self.server_list)
-        return self.server_list[self.current_index]
+        return self.server_selector.select(self.server_list)
+
+    def get_ordered_servers(self) -> list:
+        return self.server_selector.order(self.server_list)
+
+    def _record_call_result(self, server: str, start: float, error):
+        if error is None:
+            self.record_server_success(server, time.monotonic() - start)
+        elif _is_server_failure(error):
+            self.record_server_failure(server)
+
+    def record_server_success(self, server: str, latency: float):
+        self.server_selector.record_success(server, latency)
+
+    def record_server_failure(self, server: str):
+        self.server_selector.record_failure(server)
+
+    def get_server_scores(self) -> Dict[str, dict]:
+        """每台服务端当前的延迟、错误率、得分和摘除状态"""
+        return self.server_selector.get_scores()
 
     def _inject_security_info(self, params):
         if self.client_config.username and self.client_config.password:
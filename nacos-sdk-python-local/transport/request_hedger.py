@@ -0,0 +1,174 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional
+
+# 只读、幂等的请求，重复发送不会产生副作用
+DEFAULT_HEDGE_REQUEST_TYPES = ("ConfigQueryRequest", "ServiceQueryRequest", "ServiceListRequest")
+
+DEFAULT_HEDGE_BUDGET_RATIO = 0.1
+
+DEFAULT_MIN_HEDGE_DELAY = 0.01
+
+DEFAULT_MAX_HEDGE_DELAY = 1.0
+
+# 样本不足时使用的对冲延迟
+DEFAULT_HEDGE_DELAY = 0.2
+
+MIN_LATENCY_SAMPLES = 20
+
+LATENCY_WINDOW_SIZE = 256
+
+
+async def timed_request(connection, request, timeout_millis: int, on_result: Optional[Callable] = None):
+    """
+    在connection上发送请求，完成后调用on_result(connection, latency, response, error)。
+    请求被取消时不调用：被取消的一方没有结果，不能据此评价该服务端
+    """
+    start = time.monotonic()
+    try:
+        response = await connection.request(request, timeout_millis)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        if on_result is not None:
+            on_result(connection, time.monotonic() - start, None, e)
+        raise
+    if on_result is not None:
+        on_result(connection, time.monotonic() - start, response, None)
+    return response
+
+
+class LatencyTracker:
+    """保存某类请求最近LATENCY_WINDOW_SIZE次的耗时，用于计算分位数"""
+
+    def __init__(self, window_size=LATENCY_WINDOW_SIZE):
+        self.samples: Deque[float] = deque(maxlen=window_size)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, quantile: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(quantile * len(ordered)) - 1))
+        return ordered[index]
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class HedgeBudget:
+    """
+    令牌桶：每个请求积累budget_ratio个令牌，每次对冲消耗一个，
+    因此对冲请求最多占该类请求的budget_ratio，不会让服务端负载翻倍
+    """
+
+    def __init__(self, budget_ratio=DEFAULT_HEDGE_BUDGET_RATIO, max_tokens=10.0):
+        self.budget_ratio = budget_ratio
+        self.max_tokens = max_tokens
+        self.tokens = 0.0
+
+    def on_request(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.budget_ratio)
+
+    def try_acquire(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class RequestHedger:
+    """
+    对只读请求做对冲：主连接上的请求超过该类请求的p95耗时仍未返回时，在另一个连接上发送同样的请求，
+    取先成功的响应并取消另一个。每类请求的对冲次数受HedgeBudget限制
+    """
+
+    def __init__(self, hedge_request_types: Iterable[str] = DEFAULT_HEDGE_REQUEST_TYPES,
+                 budget_ratio=DEFAULT_HEDGE_BUDGET_RATIO, quantile=0.95, min_delay=DEFAULT_MIN_HEDGE_DELAY,
+                 max_delay=DEFAULT_MAX_HEDGE_DELAY):
+        self.hedge_request_types = frozenset(hedge_request_types)
+        self.budget_ratio = budget_ratio
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.budgets: Dict[str, HedgeBudget] = {}
+        self.hedged_count = 0
+        self.hedge_win_count = 0
+
+    def is_hedgeable(self, request) -> bool:
+        return request.get_request_type() in self.hedge_request_types
+
+    def get_hedge_delay(self, request_type: str) -> float:
+        tracker = self.latencies.get(request_type)
+        if tracker is None or len(tracker) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return min(self.max_delay, max(self.min_delay, tracker.percentile(self.quantile)))
+
+    def record_latency(self, request_type: str, latency: float):
+        tracker = self.latencies.get(request_type)
+        if tracker is None:
+            tracker = self.latencies[request_type] = LatencyTracker()
+        tracker.record(latency)
+
+    def _get_budget(self, request_type: str) -> HedgeBudget:
+        budget = self.budgets.get(request_type)
+        if budget is None:
+            budget = self.budgets[request_type] = HedgeBudget(self.budget_ratio)
+        return budget
+
+    async def request(self, primary, secondary, request, timeout_millis: int, on_result: Optional[Callable] = None):
+        """
+        在primary上发送请求，必要时在secondary上对冲，返回(响应, 返回该响应的连接)。
+        返回最先成功的响应；都失败时返回最后一个失败的响应，或抛出最后一个异常。
+        每个连接上的请求完成时分别调用on_result(connection, latency, response, error)，见timed_request
+        """
+        request_type = request.get_request_type()
+        budget = self._get_budget(request_type)
+        budget.on_request()
+        start = time.monotonic()
+        primary_task = asyncio.ensure_future(timed_request(primary, request, timeout_millis, on_result))
+        hedge_delay = min(self.get_hedge_delay(request_type), timeout_millis / 1000.0)
+        done, _ = await asyncio.wait((primary_task,), timeout=hedge_delay)
+        if done or secondary is None or not budget.try_acquire():
+            response = await primary_task
+            self._record_success(request_type, start, response)
+            return response, primary
+
+        self.hedged_count += 1
+        remaining = max(1, timeout_millis - int((time.monotonic() - start) * 1000))
+        hedge_task = asyncio.ensure_future(timed_request(secondary, request, remaining, on_result))
+        connections = {primary_task: primary, hedge_task: secondary}
+        pending = {primary_task, hedge_task}
+        last_result = None
+        last_connection = None
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    response = task.result()
+                    if response is not None and response.is_success():
+                        if task is hedge_task:
+                            self.hedge_win_count += 1
+                        self._record_success(request_type, start, response)
+                        return response, connections[task]
+                    last_result = response
+                    last_connection = connections[task]
+        finally:
+            for task in pending:
+                task.cancel()
+        if last_result is not None or last_error is None:
+            return last_result, last_connection
+        raise last_error
+
+    def _record_success(self, request_type, start, response):
+        if response is not None and response.is_success():
+            self.record_latency(request_type, time.monotonic() - start)
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from v2.nacos.transport.request_hedger import HedgeBudget, LatencyTracker, RequestHedger
+
+
+class _Request:
+    def get_request_type(self):
+        return "ConfigQueryRequest"
+
+
+class _Response:
+    def __init__(self, success=True):
+        self.success = success
+
+    def is_success(self):
+        return self.success
+
+
+class _Connection:
+    def __init__(self, name, delay, response=None, error=None):
+        self.name = name
+        self.delay = delay
+        self.response = response or _Response()
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def request(self, request, timeout_millis):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def _hedger():
+    hedger = RequestHedger(budget_ratio=1.0)
+    hedger.get_hedge_delay = lambda request_type: 0.01
+    return hedger
+
+
+def _record(results):
+    def on_result(connection, latency, response, error):
+        results.append((connection.name, response is not None and error is None))
+    return on_result
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window_size=100)
+    for i in range(1, 101):
+        tracker.record(i / 1000)
+    assert tracker.percentile(0.95) == 0.095
+    assert tracker.percentile(0.5) == 0.05
+
+
+def test_hedge_budget_limits_ratio():
+    budget = HedgeBudget(budget_ratio=0.25)
+    acquired = 0
+    for _ in range(100):
+        budget.on_request()
+        acquired += budget.try_acquire()
+    assert acquired == 25
+
+
+def test_fast_primary_is_not_hedged():
+    primary = _Connection("primary", 0)
+    secondary = _Connection("secondary", 0)
+    results = []
+    response, connection = asyncio.run(
+        _hedger().request(primary, secondary, _Request(), 1000, _record(results)))
+    assert connection is primary
+    assert response is primary.response
+    assert secondary.calls == 0
+    assert results == [("primary", True)]
+
+
+def test_hedge_winner_is_reported_and_loser_is_not_recorded():
+    primary = _Connection("primary", 1)
+    secondary = _Connection("secondary", 0)
+    hedger = _hedger()
+    results = []
+    response, connection = asyncio.run(hedger.request(primary, secondary, _Request(), 3000, _record(results)))
+    assert connection is secondary
+    assert response is secondary.response
+    assert primary.cancelled
+    assert results == [("secondary", True)]
+    assert hedger.hedged_count == 1
+    assert hedger.hedge_win_count == 1
+
+
+def test_each_failed_connection_is_recorded():
+    primary = _Connection("primary", 0.05, error=ConnectionError("primary down"))
+    secondary = _Connection("secondary", 0, error=ConnectionError("secondary down"))
+    results = []
+    with pytest.raises(ConnectionError):
+        asyncio.run(_hedger().request(primary, secondary, _Request(), 3000, _record(results)))
+    assert sorted(results) == [("primary", False), ("secondary", False)]
@@ -0,0 +1,93 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+DEFAULT_BASE_DELAY = 0.1
+
+DEFAULT_MAX_DELAY = 5.0
+
+DEFAULT_MULTIPLIER = 2.0
+
+DEFAULT_JITTER_RATIO = 0.2
+
+
+class RetryPolicy:
+    """
+    asyncio下的重试退避策略：第n次重试前等待 base_delay * multiplier^n（不超过max_delay），并加入随机抖动。
+    等待期间不阻塞事件循环；cancel后所有正在等待的重试立即返回，不再重试
+    """
+
+    def __init__(self, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, multiplier=DEFAULT_MULTIPLIER,
+                 jitter_ratio=DEFAULT_JITTER_RATIO):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter_ratio = jitter_ratio
+        self.cancelled = False
+        self._cancel_event = asyncio.Event()
+
+    def get_delay(self, attempt: int) -> float:
+        try:
+            delay = min(self.base_delay * (self.multiplier ** attempt), self.max_delay)
+        except OverflowError:
+            # 重连不限次数，长时间断连后multiplier ** attempt会超出float范围
+            delay = self.max_delay
+        return delay * (1 + random.uniform(-self.jitter_ratio, self.jitter_ratio))
+
+    def new_retry(self, deadline: Optional[float] = None, max_attempts: Optional[int] = None) -> "Retry":
+        """deadline为整个请求（含所有重试）可用的秒数，max_attempts为最多重试次数，None表示不限制"""
+        return Retry(self, deadline, max_attempts)
+
+    async def sleep(self, delay: float) -> bool:
+        """等待delay秒，策略被取消时提前返回False"""
+        if self.cancelled:
+            return False
+        try:
+            await asyncio.wait_for(self._cancel_event.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        return not self.cancelled
+
+    def cancel(self):
+        self.cancelled = True
+        self._cancel_event.set()
+
+
+class Retry:
+    """一次请求的重试状态，记录已重试次数和截止时间"""
+
+    def __init__(self, policy: RetryPolicy, deadline: Optional[float], max_attempts: Optional[int]):
+        self.policy = policy
+        self.deadline = None if deadline is None else time.monotonic() + deadline
+        self.max_attempts = max_attempts
+        self.attempts = 0
+
+    def remaining(self) -> float:
+        """剩余可用的秒数，没有截止时间时返回inf"""
+        if self.deadline is None:
+            return float("inf")
+        return max(0.0, self.deadline - time.monotonic())
+
+    def remaining_millis(self) -> int:
+        return int(self.remaining() * 1000)
+
+    def can_retry(self) -> bool:
+        if self.policy.cancelled:
+            return False
+        if self.max_attempts is not None and self.attempts >= self.max_attempts:
+            return False
+        return self.remaining() > 0
+
+    async def backoff(self) -> bool:
+        """
+        等待到下一次重试，返回是否可以继续重试。
+        退避时间不会超过剩余的期限，期限用完、次数用完或策略被取消时返回False
+        """
+        if not self.can_retry():
+            return False
+        delay = min(self.policy.get_delay(self.attempts), self.remaining())
+        self.attempts += 1
+        if not await self.policy.sleep(delay):
+            return False
+        return self.remaining() > 0
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from v2.nacos.transport.retry_policy import RetryPolicy
+
+
+def test_delay_grows_exponentially_up_to_max_delay():
+    policy = RetryPolicy(base_delay=0.1, max_delay=1.0, multiplier=2.0, jitter_ratio=0)
+    assert [policy.get_delay(i) for i in range(5)] == [0.1, 0.2, 0.4, 0.8, 1.0]
+
+
+def test_delay_does_not_overflow_after_many_attempts():
+    policy = RetryPolicy(base_delay=0.1, max_delay=5.0, multiplier=2.0, jitter_ratio=0)
+    assert policy.get_delay(5000) == 5.0
+
+
+def test_jitter_stays_within_ratio():
+    policy = RetryPolicy(base_delay=1.0, max_delay=1.0, jitter_ratio=0.2)
+    for _ in range(100):
+        assert 0.8 <= policy.get_delay(3) <= 1.2
+
+
+def test_retry_stops_at_max_attempts():
+    async def run():
+        retry = RetryPolicy(base_delay=0.001, max_delay=0.001, jitter_ratio=0).new_retry(max_attempts=2)
+        return [await retry.backoff() for _ in range(3)]
+
+    assert asyncio.run(run()) == [True, True, False]
+
+
+def test_backoff_does_not_exceed_deadline():
+    async def run():
+        retry = RetryPolicy(base_delay=10, max_delay=10, jitter_ratio=0).new_retry(deadline=0.05)
+        start = time.monotonic()
+        result = await retry.backoff()
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result is False
+    assert elapsed < 1
+
+
+def test_cancel_wakes_up_waiting_retry():
+    async def run():
+        policy = RetryPolicy(base_delay=10, max_delay=10, jitter_ratio=0)
+        retry = policy.new_retry()
+        asyncio.get_running_loop().call_later(0.01, policy.cancel)
+        start = time.monotonic()
+        result = await retry.backoff()
+        return result, time.monotonic() - start, retry.can_retry()
+
+    result, elapsed, can_retry = asyncio.run(run())
+    assert result is False
+    assert elapsed < 1
+    assert can_retry is False
@@ -5,6 +5,8 @@ from .remote import rpc_response
 from .remote import naming_response
 from .remote import internal_request
 from connection_event_listener import IConnectionEventListener
+from retry_policy import Retry, RetryPolicy
+from request_hedger import RequestHedger, timed_request
 from ...common.constant.const import Const
 from ...util import commom
 import server_request_handler
@@ -21,6 +23,10 @@ import asyncio
 from asyncio import Lock
 
 
+# 后台检查备用连接的间隔，单位秒
+STANDBY_CHECK_INTERVAL = 5
+
+
 class ConnectionType(Enum):
     GRPC = auto()
 
@@ -38,16 +44,12 @@ class ConnectionStatus(Enum):
     CONNECTED = auto()
 
 
-def wait_reconnect(timeout_millis, retry_times: int,
-                   request: rpc_request.IRequest
-                   ):  
+async def wait_reconnect(retry: Retry, request: rpc_request.IRequest) -> bool:
     logging.error(
-        f"Send request fail, request={request.get_request_type()}, body={request.get_body()}, retryTimes={retry_times}"
+        f"Send request fail, request={request.get_request_type()}, body={request.get_body()}, retryTimes={retry.attempts}"
     )
-    sleep_time = min(100, int(timeout_millis / 3))
-    time.sleep(sleep_time / 1000.0)  
-    retry_times += 1
-    return retry_times
+    # 退避期间不阻塞事件循环，返回False表示期限或次数已用完
+    return await retry.backoff()
 
 
 
@@ -76,11 +78,13 @@ class IRpcClient(ABC):
 
 class ServerInfo: 
 
-    def __init__(self, server_ip: str, server_port: int,
-                 server_grpc_port: int):
+    def __init__(self, server_ip: str = "", server_port: int = 0,
+                 server_grpc_port: int = 0, server_key=None):
         self.server_ip = server_ip
         self.server_port = server_port
         self.server_grpc_port = server_grpc_port
+        # nacos_server服务端列表中对应的元素，用于向server_selector反馈请求结果
+        self.server_key = server_key
 
     def __eq__(self, other):
         if isinstance(other, ServerInfo):
@@ -121,7 +125,15 @@ class RpcClient:
         self.tenant = None
         self.lock = asyncio.Lock()  #mux
         self.loop = asyncio.get_event_loop()
-        
+        # 请求失败的重试间隔较短，重连在连续失败后逐步退避到5秒；shutdown时取消
+        self.request_retry_policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+        self.reconnect_retry_policy = RetryPolicy(base_delay=0.1, max_delay=5.0)
+        # 不为空时对只读请求做对冲，对冲请求发往standby_connection所连的另一台服务端
+        self.request_hedger: RequestHedger = None
+        self.standby_connection: IConnection = None
+        # 为True时始终保持一个连到另一台服务端的备用连接，切换服务端时直接提升为当前连接
+        self.standby_enabled = False
+        self.standby_lock = asyncio.Lock()
 
     # def get_name(self):
     #     return self.name
@@ -191,9 +203,9 @@ class RpcClient:
             for task in pending:
                 task.cancel()
 
-    def start(self):
-        if not self._compare_and_swap_status(RpcClientStatus.INITIALIZED,
-                                             RpcClientStatus.STARTING):
+    async def start(self):
+        if not await self._compare_and_swap_status(RpcClientStatus.INITIALIZED,
+                                                   RpcClientStatus.STARTING):
             return
         self.register_server_request_handlers()
         # threading.Thread(target=self._handle_events).start()
@@ -210,11 +222,11 @@ class RpcClient:
                 logging.info(
                     f"[RpcClient.Start] {self.name} trying to connect to server on start up, server: {server_info}"
                 )
-                connection, err = self.execute_client.connect_to_server(
-                    server_info) 
-                if err:
+                connection = await self.execute_client.connect_to_server(
+                    server_info)
+                if connection is None:
                     logging.warning(
-                        f"[RpcClient.Start] {self.name} failed to connect to server on start up, error message={err}, start up retry times left={start_up_retry_times}"
+                        f"[RpcClient.Start] {self.name} failed to connect to server on start up, server={server_info}, start up retry times left={start_up_retry_times}"
                     )
                 else:
                     self.current_connection = connection
@@ -232,6 +244,8 @@ class RpcClient:
             self._notify_connection_change(ConnectionStatus.CONNECTED)
         else:
             self._switch_server_async(ServerInfo(), False)
+        if self._is_standby_wanted():
+            self.loop.create_task(self.standby_keeper())
 
     
     async def is_wait_initiated(self):
@@ -265,7 +279,7 @@ class RpcClient:
     #         time.sleep(1)
 
     def _notify_connection_change(self, event_type: ConnectionStatus):
-        self.event_chan.put(ConnectionEvent(event_type))
+        self.event_chan.put_nowait(ConnectionEvent(event_type))
 
     def notify_server_srv_change(self):
         if self.current_connection is None:
@@ -341,48 +355,51 @@ class RpcClient:
     def _next_rpc_server(self) -> ServerInfo:
         # Placeholder for getting the next server info
         
-        server_config = self.nacos_server.get_next_server()
+        return self._to_server_info(self.nacos_server.get_next_server())
+
+    @staticmethod
+    def _to_server_info(server_config) -> ServerInfo:
         if server_config:
             return ServerInfo(
                 server_ip=server_config.ip_addr,
                 server_port=server_config.port,
-                server_grpc_port=server_config.grpc_port  
+                server_grpc_port=server_config.grpc_port,
+                server_key=server_config
             )
         return ServerInfo()
 
     async def request(self, request: rpc_request.IRequest,
                       timeout_millis: int):
-        retry_times = 0
-        start = commom.current_millis()  
-        # current_err = None
+        # timeout_millis是包含所有重试在内的总期限
+        retry = self.request_retry_policy.new_retry(timeout_millis / 1000.0, Const.REQUEST_DOMAIN_RETRY_TIME)
 
-        while retry_times < Const.REQUEST_DOMAIN_RETRY_TIME and commom.current_millis(
-        ) * 1000 < start + timeout_millis:
+        while retry.remaining() > 0:
             if not self.current_connection or not await self.is_running():
-                retry_times = wait_reconnect(timeout_millis, retry_times,
-                                             request)
+                if not await wait_reconnect(retry, request):
+                    break
                 continue
             try:
-                response = self.current_connection.request(
-                    request, timeout_millis)  
+                response, connection = await self._do_request(request, max(retry.remaining_millis(), 1))
             except Exception as err:
-                retry_times = wait_reconnect(timeout_millis, retry_times,
-                                             request)
+                if not await wait_reconnect(retry, request):
+                    break
                 continue
 
             if isinstance(response, naming_response.ErrorResponse):
-                if response.get_error_code() == Const.UN_REGISTER:
-                    async with self.lock:  
-                        if self._compare_and_swap_status(
-                                RpcClientStatus.RUNNING,
-                                RpcClientStatus.UNHEALTHY):
-                            logging.info(
-                                "Connection is unregistered, switch server, connectionId=%s, request=%s",
-                                self.current_connection.get_connection_id(),
-                                request.get_request_type())
-                            self._switch_server_async(ServerInfo(), False)
-                retry_times = wait_reconnect(timeout_millis, retry_times,
-                                             request)
+                if response.get_error_code() == Const.UN_REGISTER and connection is not self.current_connection:
+                    # 对冲请求由备用连接返回，只需重建备用连接
+                    connection.set_abandon(True)
+                elif response.get_error_code() == Const.UN_REGISTER:
+                    if await self._compare_and_swap_status(
+                            RpcClientStatus.RUNNING,
+                            RpcClientStatus.UNHEALTHY):
+                        logging.info(
+                            "Connection is unregistered, switch server, connectionId=%s, request=%s",
+                            self.current_connection.get_connection_id(),
+                            request.get_request_type())
+                        self._switch_server_async(ServerInfo(), False)
+                if not await wait_reconnect(retry, request):
+                    break
                 continue
 
             if response and not response.is_success():
@@ -394,16 +411,140 @@ class RpcClient:
                 self.last_active_timestamp = time.time()
             return response
 
-        async with self.lock:
-            if self._compare_and_swap_status(RpcClientStatus.RUNNING,
-                                             RpcClientStatus.UNHEALTHY):
-                self._switch_server_async(ServerInfo(), True)
+        if await self._compare_and_swap_status(RpcClientStatus.RUNNING,
+                                               RpcClientStatus.UNHEALTHY):
+            self._switch_server_async(ServerInfo(), True)
 
         return None
 
+    async def _do_request(self, request: rpc_request.IRequest, timeout_millis: int):
+        """返回(响应, 返回该响应的连接)，参与请求的每个连接的结果分别计入各自服务端的统计"""
+        if self.request_hedger is not None and self.request_hedger.is_hedgeable(request):
+            standby = self.standby_connection
+            if standby is not None and standby.get_abandon():
+                standby = None
+            return await self.request_hedger.request(self.current_connection, standby, request, timeout_millis,
+                                                     self._record_server_result)
+        connection = self.current_connection
+        response = await timed_request(connection, request, timeout_millis, self._record_server_result)
+        return response, connection
+
+    def _next_standby_server(self) -> ServerInfo:
+        # 选择与当前连接不同的服务端，只有一台服务端时返回None
+        # 按server_selector的优先级选择，备用连接也尽量连到最快的服务端
+        current = self.current_connection.get_server_info() if self.current_connection else None
+        for server_config in self.nacos_server.get_ordered_servers():
+            server_info = self._to_server_info(server_config)
+            if server_info != ServerInfo() and server_info != current:
+                return server_info
+        return None
+
+    def _record_server_result(self, connection: IConnection, latency: float, response, error):
+        server_key = connection.get_server_info().server_key if connection is not None else None
+        if self.nacos_server is None or server_key is None:
+            return
+        if error is None and response is not None and not isinstance(response, naming_response.ErrorResponse):
+            self.nacos_server.record_server_success(server_key, latency)
+        else:
+            self.nacos_server.record_server_failure(server_key)
+
+    def _is_standby_wanted(self) -> bool:
+        return self.standby_enabled or self.request_hedger is not None
+
+    async def standby_keeper(self):
+        while not await self.is_shutdown():
+            try:
+                await self._check_standby_connection()
+            except Exception as err:
+                logging.error(f"{self.name} check standby connection failed, err: {err}")
+            # shutdown时立即返回False
+            if not await self.reconnect_retry_policy.sleep(STANDBY_CHECK_INTERVAL):
+                break
+
+    async def _check_standby_connection(self):
+        if not self._is_standby_wanted() or await self.is_shutdown():
+            return
+        # 提升备用连接后会立即补建，与后台的定时检查互斥，避免同时建立两个备用连接。
+        # _promote_standby_connection不持有standby_lock，每次await之后都要重新确认备用连接没有被提升或替换
+        async with self.standby_lock:
+            standby = self.standby_connection
+            current = self.current_connection
+            if standby is not None and not standby.get_abandon() and (
+                    current is None or standby.get_server_info() != current.get_server_info()):
+                healthy = await self._send_health_check(standby)
+                if not self._is_standby(standby):
+                    return
+                if healthy:
+                    return
+                logging.info(
+                    f"{self.name} standby server {standby.get_server_info()} health check fail, connectionId={standby.get_connection_id()}")
+            if standby is not None and self._is_standby(standby):
+                standby.set_abandon(True)
+                standby.close()
+                self.standby_connection = None
+            elif self.standby_connection is not None:
+                # 等待期间已被提升或换上了新的备用连接
+                return
+            server_info = self._next_standby_server()
+            if server_info is None:
+                return
+            try:
+                standby = await self.execute_client.connect_to_server(server_info)
+            except Exception as err:
+                logging.warning(f"{self.name} fail to connect standby server {server_info}, err: {err}")
+                return
+            if standby is None:
+                return
+            current = self.current_connection
+            if await self.is_shutdown() or self.standby_connection is not None or (
+                    current is not None and current.get_server_info() == server_info):
+                # 建连期间当前连接切换到了同一台服务端（例如重连或提升完成），这条连接不能作为备用
+                standby.close()
+                return
+            self.standby_connection = standby
+            logging.info(
+                f"{self.name} connected standby server {server_info}, connectionId={standby.get_connection_id()}")
+
+    def _is_standby(self, connection: IConnection) -> bool:
+        return self.standby_connection is connection and connection is not self.current_connection
+
+    async def _promote_standby_connection(self, recommend_server_info: ServerInfo) -> bool:
+        """把备用连接提升为当前连接，不需要重新建立连接；没有可用的备用连接或与推荐的服务端不同时返回False"""
+        standby = self.standby_connection
+        if standby is None or standby.get_abandon() or not standby.is_connected() or await self.is_shutdown():
+            return False
+        # is_shutdown会让出事件循环，期间备用连接可能已被检查任务关闭或替换
+        if not self._is_standby(standby) or standby.get_abandon():
+            return False
+        if recommend_server_info is not None and recommend_server_info != ServerInfo() and \
+                standby.get_server_info().server_ip != recommend_server_info.server_ip:
+            return False
+        self.standby_connection = None
+        if self.current_connection:
+            logging.info(
+                f"{self.name} abandon prev connection, server is {self.current_connection.get_server_info()}, connectionId is {self.current_connection.get_connection_id()}"
+            )
+            self.current_connection.set_abandon(True)
+            self._close_connection()
+        self.current_connection = standby
+        async with self.lock:
+            self.rpc_client_status = RpcClientStatus.RUNNING
+        logging.info(
+            f"{self.name} promote standby connection, server is {standby.get_server_info()}, connectionId={standby.get_connection_id()}")
+        self._notify_connection_change(ConnectionStatus.CONNECTED)
+        # 立即补建新的备用连接
+        self.loop.create_task(self._check_standby_connection())
+        return True
+
     async def shutdown(self):
         async with self.lock:
-            self.rpc_client_status = RpcClientStatus.SHUTDOWN  
+            self.rpc_client_status = RpcClientStatus.SHUTDOWN
+        # 唤醒正在退避等待的请求和重连，不再重试
+        self.request_retry_policy.cancel()
+        self.reconnect_retry_policy.cancel()
+        if self.standby_connection is not None:
+            self.standby_connection.close()
+            self.standby_connection = None
         self._close_connection()
 
     def _close_connection(self):
@@ -452,11 +593,13 @@ class RpcClient:
                              reconnect_context.on_request_fail)
         # await asyncio.sleep(constant.KEEP_ALIVE_TIME)
 
-    def _send_health_check(self) -> bool:
-        if self.current_connection is None:
+    async def _send_health_check(self, connection: IConnection = None) -> bool:
+        if connection is None:
+            connection = self.current_connection
+        if connection is None:
             return False
         try:
-            response = self.current_connection.request(
+            response = await connection.request(
                 internal_request.HealthCheckRequest().new_health_check_request(
                 ), Const.DEFAULT_TIMEOUT_MILLS)
         except Exception as err:
@@ -470,7 +613,7 @@ class RpcClient:
         return True
 
     async def reconnect(self, server_info: ServerInfo, on_request_fail: bool):
-        if on_request_fail and self._send_health_check():
+        if on_request_fail and await self._send_health_check():
             logging.info(
                 f"{self.name} server check success, currentServer is {self.current_connection.get_server_info()}"
             )
@@ -479,8 +622,12 @@ class RpcClient:
             self._notify_connection_change(ConnectionStatus.CONNECTED)
             return
 
-        server_info_flag = False  
-        re_connect_times, retry_turns = 0, 0
+        if await self._promote_standby_connection(server_info):
+            return
+
+        server_info_flag = False
+        re_connect_times = 0
+        retry = self.reconnect_retry_policy.new_retry()
         err = None
         if server_info == ServerInfo():
             server_info_flag = True
@@ -489,6 +636,7 @@ class RpcClient:
             )
 
         while not await self.is_shutdown():
+            connection_new = None
             if server_info_flag:
                 try:
                     server_info = self._next_rpc_server()
@@ -497,7 +645,7 @@ class RpcClient:
                         f"[RpcClient.next_rpc_server], err: {str(err)}")
                     break
             try:
-                connection_new = self.execute_client.connect_to_server(
+                connection_new = await self.execute_client.connect_to_server(
                     server_info)
             except Exception as err:
                 logging.error(
@@ -515,12 +663,19 @@ class RpcClient:
                     self.current_connection.set_abandon(True)
                     self._close_connection()
                 self.current_connection = connection_new
+                standby = self.standby_connection
+                if standby is not None and standby.get_server_info() == connection_new.get_server_info():
+                    # 新的当前连接与备用连接在同一台服务端，备用连接失去意义，重新建立
+                    standby.set_abandon(True)
+                    standby.close()
+                    self.standby_connection = None
+                    self.loop.create_task(self._check_standby_connection())
                 async with self.lock:
                     self.rpc_client_status = RpcClientStatus.RUNNING
                 self._notify_connection_change(ConnectionStatus.CONNECTED)
                 return
 
-            if self.is_shutdown():
+            if await self.is_shutdown():
                 self._close_connection()
 
             if re_connect_times > 0 and re_connect_times % len(
@@ -528,13 +683,12 @@ class RpcClient:
                 logging.warning(
                     f"{self.name} fail to connect server, after trying {re_connect_times} times, last try server is {server_info}, error={err}"
                 )
-                if retry_turns < 50:
-                    retry_turns += 1
 
             re_connect_times += 1
             if not await self.is_running():
-                sleep_time = min(retry_turns, 50) * 100
-                time.sleep(sleep_time / 1000)
+                # 连续失败时指数退避，shutdown时立即结束等待
+                if not await retry.backoff():
+                    break
 
         if await self.is_shutdown():
             logging.warning(
@@ -542,7 +696,14 @@ class RpcClient:
 
     def _switch_server_async(self, recommend_server_info: ServerInfo,
                              on_request_fail: bool):
-        self.reconnection_chan.put(
+        self.loop.create_task(self._switch_server(recommend_server_info, on_request_fail))
+
+    async def _switch_server(self, recommend_server_info: ServerInfo,
+                             on_request_fail: bool):
+        # 有可用的备用连接时直接切换，省去建连、服务端检查和setup的耗时
+        if await self._promote_standby_connection(recommend_server_info):
+            return
+        self.reconnection_chan.put_nowait(
             ReconnectContext(recommend_server_info, on_request_fail))
 
 
@@ -575,5 +736,8 @@ class IServerRequestHandler(ABC):
 
 
 if __name__ == "__main__":
-    client = RpcClient("example_client")
-    client.start()
+    async def main():
+        client = RpcClient("example_client")
+        await client.start()
+
+    asyncio.run(main())
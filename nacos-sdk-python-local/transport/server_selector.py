@@ -0,0 +1,189 @@
+import math
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+ROUND_ROBIN = "round_robin"
+
+LATENCY_AWARE = "latency"
+
+DEFAULT_EWMA_ALPHA = 0.3
+
+DEFAULT_EJECT_THRESHOLD = 3
+
+DEFAULT_EJECT_BASE_TIME = 5
+
+DEFAULT_EJECT_MAX_TIME = 300
+
+DEFAULT_EXPLORE_RATIO = 0.05
+
+# 错误率对得分的放大倍数，错误率为50%时得分是延迟的 1 + 0.5 * 10 = 6 倍
+ERROR_RATE_PENALTY = 10
+
+
+class ServerSelector(ABC):
+    """根据请求结果选择服务端。服务端用server_list中的字符串标识"""
+
+    @abstractmethod
+    def select(self, servers: List[str]) -> str:
+        pass
+
+    @abstractmethod
+    def order(self, servers: List[str]) -> List[str]:
+        """返回按优先级排列的服务端，用于失败后依次尝试"""
+        pass
+
+    def record_success(self, server: str, latency: float):
+        """请求成功的回调，不关心服务端状态的实现可以不覆盖"""
+        return None
+
+    def record_failure(self, server: str):
+        """请求失败的回调，不关心服务端状态的实现可以不覆盖"""
+        return None
+
+    def get_scores(self) -> Dict[str, dict]:
+        return {}
+
+
+class RoundRobinSelector(ServerSelector):
+    """从随机位置开始轮询，不考虑服务端的状态"""
+
+    def __init__(self):
+        self.current_index = -1
+
+    def select(self, servers: List[str]) -> str:
+        if not servers:
+            raise ValueError('server list is empty')
+        if self.current_index < 0:
+            self.current_index = random.randrange(len(servers))
+        self.current_index = (self.current_index + 1) % len(servers)
+        return servers[self.current_index]
+
+    def order(self, servers: List[str]) -> List[str]:
+        if not servers:
+            return []
+        start = random.randrange(len(servers))
+        return servers[start:] + servers[:start]
+
+
+class ServerStats:
+    def __init__(self):
+        self.latency = 0.0  # EWMA，单位秒，没有成功样本时为0
+        self.error_rate = 0.0  # EWMA
+        self.samples = 0
+        self.success_samples = 0
+        self.consecutive_failures = 0
+        self.eject_count = 0
+        self.ejected_until = 0.0
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def score(self) -> float:
+        if self.success_samples == 0:
+            # 只有失败记录时延迟未知，排在所有成功过的服务端之后
+            return math.inf
+        return self.latency * (1 + ERROR_RATE_PENALTY * self.error_rate)
+
+
+class LatencyAwareSelector(ServerSelector):
+    """
+    按EWMA延迟和错误率给每台服务端打分，优先选择得分最低（最快、最健康）的服务端；
+    还没有样本的服务端优先被选中以获得样本，另有explore_ratio的请求随机选择，使其他服务端的分数保持更新。
+    连续失败eject_threshold次的服务端被摘除，摘除时间从eject_base_time开始每次翻倍，最长eject_max_time；
+    到期后重新参与选择，成功后摘除时间逐步恢复。所有服务端都被摘除时选择最早到期的
+    """
+
+    def __init__(self, ewma_alpha=DEFAULT_EWMA_ALPHA, eject_threshold=DEFAULT_EJECT_THRESHOLD,
+                 eject_base_time=DEFAULT_EJECT_BASE_TIME, eject_max_time=DEFAULT_EJECT_MAX_TIME,
+                 explore_ratio=DEFAULT_EXPLORE_RATIO):
+        self.ewma_alpha = ewma_alpha
+        self.eject_threshold = eject_threshold
+        self.eject_base_time = eject_base_time
+        self.eject_max_time = eject_max_time
+        self.explore_ratio = explore_ratio
+        self.lock = threading.Lock()
+        self.stats: Dict[str, ServerStats] = {}
+
+    def _get_stats(self, server: str) -> ServerStats:
+        stats = self.stats.get(server)
+        if stats is None:
+            stats = self.stats[server] = ServerStats()
+        return stats
+
+    def order(self, servers: List[str]) -> List[str]:
+        if not servers:
+            return []
+        now = time.monotonic()
+        with self.lock:
+            available = []
+            ejected = []
+            for server in servers:
+                stats = self.stats.get(server)
+                if stats is None or stats.samples == 0:
+                    available.append((-1.0, random.random(), server))
+                elif stats.is_ejected(now):
+                    ejected.append((stats.ejected_until, server))
+                else:
+                    available.append((stats.score(), random.random(), server))
+        available.sort()
+        ejected.sort()
+        ordered = [server for _, _, server in available]
+        if len(ordered) > 1 and random.random() < self.explore_ratio:
+            explored = ordered.pop(random.randrange(1, len(ordered)))
+            ordered.insert(0, explored)
+        return ordered + [server for _, server in ejected]
+
+    def select(self, servers: List[str]) -> str:
+        if not servers:
+            raise ValueError('server list is empty')
+        return self.order(servers)[0]
+
+    def record_success(self, server: str, latency: float):
+        with self.lock:
+            stats = self._get_stats(server)
+            if stats.success_samples == 0:
+                stats.latency = latency
+            else:
+                stats.latency += self.ewma_alpha * (latency - stats.latency)
+            stats.error_rate -= self.ewma_alpha * stats.error_rate
+            stats.samples += 1
+            stats.success_samples += 1
+            stats.consecutive_failures = 0
+            if stats.eject_count > 0:
+                stats.eject_count -= 1
+
+    def record_failure(self, server: str):
+        with self.lock:
+            stats = self._get_stats(server)
+            stats.error_rate += self.ewma_alpha * (1.0 - stats.error_rate)
+            stats.samples += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.eject_threshold:
+                eject_time = min(self.eject_max_time, self.eject_base_time * (2 ** stats.eject_count))
+                stats.ejected_until = time.monotonic() + eject_time
+                # 达到最长摘除时间后不再增长，避免长期故障的服务端指数溢出
+                if eject_time < self.eject_max_time:
+                    stats.eject_count += 1
+                # 到期重新参与选择后，成功之前再失败一次就会被摘除更长时间
+                stats.consecutive_failures = self.eject_threshold - 1
+
+    def get_scores(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        with self.lock:
+            return {server: {
+                "latency": stats.latency,
+                "error_rate": stats.error_rate,
+                "score": stats.score(),
+                "ejected": stats.is_ejected(now),
+                "ejected_remaining": max(0.0, stats.ejected_until - now),
+            } for server, stats in self.stats.items()}
+
+
+def create_server_selector(client_config) -> ServerSelector:
+    if client_config.server_selector_strategy == ROUND_ROBIN:
+        return RoundRobinSelector()
+    return LatencyAwareSelector(eject_base_time=client_config.server_eject_base_time,
+                                eject_max_time=client_config.server_eject_max_time)
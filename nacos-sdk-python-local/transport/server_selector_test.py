@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+from v2.nacos.transport.server_selector import (
+    LatencyAwareSelector,
+    RoundRobinSelector,
+    create_server_selector,
+)
+
+SERVERS = ["http://a:8848", "http://b:8848", "http://c:8848"]
+
+
+def _selector(**kwargs):
+    kwargs.setdefault("explore_ratio", 0)
+    return LatencyAwareSelector(**kwargs)
+
+
+def test_round_robin_visits_every_server():
+    selector = RoundRobinSelector()
+    assert sorted(selector.select(SERVERS) for _ in SERVERS) == SERVERS
+    assert sorted(selector.order(SERVERS)) == SERVERS
+
+
+def test_servers_without_samples_come_first():
+    selector = _selector()
+    selector.record_success(SERVERS[0], 0.01)
+    assert selector.order(SERVERS)[-1] == SERVERS[0]
+
+
+def test_fastest_server_is_preferred():
+    selector = _selector()
+    selector.record_success(SERVERS[0], 0.3)
+    selector.record_success(SERVERS[1], 0.01)
+    selector.record_success(SERVERS[2], 0.1)
+    assert selector.order(SERVERS) == [SERVERS[1], SERVERS[2], SERVERS[0]]
+    assert selector.select(SERVERS) == SERVERS[1]
+
+
+def test_errors_raise_score():
+    selector = _selector()
+    selector.record_success(SERVERS[0], 0.01)
+    selector.record_success(SERVERS[1], 0.02)
+    selector.record_failure(SERVERS[0])
+    assert selector.order(SERVERS[:2]) == [SERVERS[1], SERVERS[0]]
+
+
+def test_server_with_only_failures_ranks_last():
+    selector = _selector(eject_threshold=3)
+    for _ in range(5):
+        selector.record_success(SERVERS[1], 0.005)
+    selector.record_failure(SERVERS[0])
+    selector.record_failure(SERVERS[0])
+    assert selector.order(SERVERS[:2]) == [SERVERS[1], SERVERS[0]]
+
+    # 摘除到期后仍然排在成功过的服务端之后，第一次成功后按实际延迟参与排序
+    selector.record_failure(SERVERS[0])
+    selector.stats[SERVERS[0]].ejected_until = 0
+    assert selector.order(SERVERS[:2]) == [SERVERS[1], SERVERS[0]]
+    selector.record_success(SERVERS[0], 0.001)
+    assert selector.stats[SERVERS[0]].latency == 0.001
+
+
+def test_consecutive_failures_eject_server():
+    selector = _selector(eject_threshold=2, eject_base_time=60)
+    for server in SERVERS:
+        selector.record_success(server, 0.01)
+    selector.record_failure(SERVERS[0])
+    assert not selector.get_scores()[SERVERS[0]]["ejected"]
+    selector.record_failure(SERVERS[0])
+    assert selector.get_scores()[SERVERS[0]]["ejected"]
+    assert selector.order(SERVERS)[-1] == SERVERS[0]
+
+
+def test_eject_time_doubles_up_to_max():
+    selector = _selector(eject_threshold=1, eject_base_time=5, eject_max_time=20)
+    remaining = []
+    for _ in range(5):
+        selector.record_failure(SERVERS[0])
+        remaining.append(selector.get_scores()[SERVERS[0]]["ejected_remaining"])
+    assert [round(r) for r in remaining] == [5, 10, 20, 20, 20]
+
+
+
+def test_long_failing_server_does_not_overflow():
+    selector = _selector(eject_threshold=1, eject_base_time=0.5, eject_max_time=20)
+    for _ in range(2000):
+        selector.record_failure(SERVERS[0])
+    assert round(selector.get_scores()[SERVERS[0]]["ejected_remaining"]) == 20
+
+
+def test_all_ejected_picks_earliest_expiry():
+    selector = _selector(eject_threshold=1, eject_base_time=5, eject_max_time=300)
+    selector.record_failure(SERVERS[0])
+    selector.record_failure(SERVERS[0])
+    selector.record_failure(SERVERS[1])
+    assert selector.order(SERVERS[:2]) == [SERVERS[1], SERVERS[0]]
+
+
+def test_create_server_selector():
+    config = SimpleNamespace(server_selector_strategy="round_robin", server_eject_base_time=5,
+                             server_eject_max_time=300)
+    assert isinstance(create_server_selector(config), RoundRobinSelector)
+    config.server_selector_strategy = "latency"
+    assert isinstance(create_server_selector(config), LatencyAwareSelector)
@@ -33,6 +33,13 @@ class GrpcUtils:
         if class_type is not None:
             byte_string = payload.body
             obj = json.loads(byte_string)
+            if isinstance(obj, dict):
+                # 还原为注册的类型，服务端推送的请求按类型分派给处理器
+                data = obj
+                obj = class_type()
+                obj.__dict__.update(data)
+                if "requestId" in data:
+                    obj.request_id = data["requestId"]
             if isinstance(obj, Request):
                 obj.headers = payload.metadata.headers
             return obj
@@ -0,0 +1,108 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
+
+DEFAULT_TICK_DURATION = 0.1  # second
+
+DEFAULT_WHEEL_SIZE = 512
+
+DEFAULT_WORKER_NUM = 2
+
+
+class TimerTask:
+    def __init__(self, timer, fn, args, remaining_rounds):
+        self.timer = timer
+        self.fn = fn
+        self.args = args
+        self.remaining_rounds = remaining_rounds
+        self.bucket = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.timer._remove(self)
+
+
+class HashedWheelTimer:
+    """单线程驱动的时间轮，到期任务交给固定大小的线程池执行，新增和取消任务都是O(1)"""
+
+    def __init__(self, name, tick_duration=DEFAULT_TICK_DURATION, wheel_size=DEFAULT_WHEEL_SIZE,
+                 worker_num=DEFAULT_WORKER_NUM):
+        self.logger = logging.getLogger(name)
+        self.name = name
+        self.tick_duration = tick_duration
+        self.wheel: List[Set[TimerTask]] = [set() for _ in range(wheel_size)]
+        self.executor = ThreadPoolExecutor(max_workers=worker_num, thread_name_prefix=name + "-worker")
+        self.lock = threading.Lock()
+        self.tick = 0
+        self.start_time = None
+        self.stop_event = threading.Event()
+        self.worker_thread = None
+
+    def start(self):
+        with self.lock:
+            if self.worker_thread is not None:
+                return
+            self.start_time = time.monotonic()
+            self.worker_thread = threading.Thread(target=self._run, name=self.name + "-ticker", daemon=True)
+            self.worker_thread.start()
+
+    def schedule(self, delay, fn, *args) -> TimerTask:
+        self.start()
+        wheel_size = len(self.wheel)
+        with self.lock:
+            # 以当前已处理到的tick为基准计算落在哪个槽以及还需要转几圈
+            elapsed_ticks = max(1, math.ceil((time.monotonic() - self.start_time + delay) / self.tick_duration))
+            ticks = max(1, elapsed_ticks - self.tick)
+            task = TimerTask(self, fn, args, (ticks - 1) // wheel_size)
+            bucket = self.wheel[(self.tick + ticks) % wheel_size]
+            bucket.add(task)
+            task.bucket = bucket
+        return task
+
+    def _remove(self, task: TimerTask):
+        with self.lock:
+            if task.bucket is not None:
+                task.bucket.discard(task)
+                task.bucket = None
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            next_tick_time = self.start_time + (self.tick + 1) * self.tick_duration
+            sleep_time = next_tick_time - time.monotonic()
+            if sleep_time > 0 and self.stop_event.wait(sleep_time):
+                break
+
+            expired = []
+            with self.lock:
+                self.tick += 1
+                bucket = self.wheel[self.tick % len(self.wheel)]
+                for task in list(bucket):
+                    if task.remaining_rounds > 0:
+                        task.remaining_rounds -= 1
+                        continue
+                    bucket.discard(task)
+                    task.bucket = None
+                    expired.append(task)
+
+            for task in expired:
+                if task.cancelled:
+                    continue
+                try:
+                    self.executor.submit(task.fn, *task.args)
+                except RuntimeError:
+                    # 线程池已关闭
+                    return
+
+    def stop(self):
+        self.stop_event.set()
+        with self.lock:
+            for bucket in self.wheel:
+                for task in bucket:
+                    task.cancelled = True
+                    task.bucket = None
+                bucket.clear()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from v2.nacos.util.hashed_wheel_timer import HashedWheelTimer
+
+
+def test_task_runs_after_delay():
+    timer = HashedWheelTimer("test-timer", tick_duration=0.01, wheel_size=8)
+    fired = threading.Event()
+    fired_at = []
+    try:
+        start = time.monotonic()
+        timer.schedule(0.05, lambda arg: (fired_at.append(time.monotonic() - start), fired.set()), "x")
+        assert fired.wait(5)
+    finally:
+        timer.stop()
+    assert fired_at[0] >= 0.05
+
+
+def test_delay_longer_than_one_round():
+    # 8个槽每圈0.08秒，0.2秒的任务要多转两圈
+    timer = HashedWheelTimer("test-timer", tick_duration=0.01, wheel_size=8)
+    fired = threading.Event()
+    try:
+        start = time.monotonic()
+        timer.schedule(0.2, fired.set)
+        assert fired.wait(5)
+        assert time.monotonic() - start >= 0.2
+    finally:
+        timer.stop()
+
+
+def test_cancelled_task_does_not_run():
+    timer = HashedWheelTimer("test-timer", tick_duration=0.01, wheel_size=8)
+    cancelled = threading.Event()
+    fired = threading.Event()
+    try:
+        timer.schedule(0.05, cancelled.set).cancel()
+        timer.schedule(0.1, fired.set)
+        assert fired.wait(5)
+    finally:
+        timer.stop()
+    assert not cancelled.is_set()
+    assert all(not bucket for bucket in timer.wheel)
+
+
+def test_stop_drops_pending_tasks():
+    timer = HashedWheelTimer("test-timer", tick_duration=0.01, wheel_size=8)
+    fired = threading.Event()
+    task = timer.schedule(0.05, fired.set)
+    timer.stop()
+    assert task.cancelled
+    assert not fired.wait(0.2)